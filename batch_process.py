@@ -8,6 +8,7 @@ import os
 import sys
 import time
 import glob
+import argparse
 import warnings
 
 # 경고 메시지 숨기기
@@ -26,9 +27,11 @@ import logging
 logging.getLogger('transformers').setLevel(logging.ERROR)
 logging.getLogger('transformers.modeling_utils').setLevel(logging.ERROR)
 
-# ⚡ Lazy import: 필요한 시점에만 로드
-# from src.detector import AbusiveDetector  # 주석 처리
+# src 패키지는 torch/transformers를 모델 생성 시점에만 로드하므로 시작은 즉시 끝남
+from src.detector import AbusiveDetector
+from src.metrics import QUEUE_DEPTH, PIPELINE_ITEMS
 from src.utils import load_config, save_result, create_output_filename
+from src.profiling import add_profile_argument
 
 
 def print_header():
@@ -76,9 +79,20 @@ def print_result_summary(results):
     print()
 
 
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(
+        description="KcBERT 배치 처리 (data/samples의 모든 txt 파일)"
+    )
+    add_profile_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """메인 실행 함수"""
     
+    args = parse_args()
+    
     print_header()
     
     # 설정 로드
@@ -120,14 +134,20 @@ def main():
     print("─" * 70)
     print()
     
-    # ⚡ Lazy import: 실제 필요한 시점에 로드
-    print("📥 모델 모듈 로딩 중... (최초 1회, 약 40초 소요)")
-    from src.detector import AbusiveDetector
-    print("✅ 모듈 로딩 완료!")
-    print()
+    # 메트릭 엔드포인트 (config.yaml의 metrics.enabled)
+    metrics_config = config.get('metrics', {})
+    if metrics_config.get('enabled'):
+        from src.metrics import start_metrics_server
+        start_metrics_server(
+            port=metrics_config.get('port', 9100),
+            host=metrics_config.get('host', '127.0.0.1')
+        )
+        print()
     
-    # 감지 엔진 초기화 (한 번만)
-    print("🤖 KcBERT 모델 초기화 중...")
+    QUEUE_DEPTH.set(len(txt_files), pipeline="batch_process")
+    
+    # 감지 엔진 초기화 (한 번만, torch/transformers 로드 포함 약 40초)
+    print("🤖 KcBERT 모델 초기화 중... (최초 1회, 약 40초 소요)")
     print()
     
     init_start = time.time()
@@ -148,7 +168,10 @@ def main():
             model_name=config['model']['name'],
             cache_dir=config['model']['cache_dir'],
             threshold=config['detection']['threshold'],
-            max_length=config['model']['max_length']
+            max_length=config['model']['max_length'],
+            rule_first=config['detection'].get('rule_first', False),
+            early_exit=config['detection'].get('early_exit', False),
+            exit_entropy=config['detection'].get('exit_entropy', 0.2)
         )
     
     init_time = time.time() - init_start
@@ -162,6 +185,18 @@ def main():
     _ = detector.predict(warmup_text)
     print("✅ 워밍업 완료!")
     print()
+    
+    # 프로파일링 (샘플 파일을 순환하며 N회 분석)
+    if args.profile:
+        from src.profiling import profile_calls
+        profile_calls(
+            lambda i: detector.predict_file(txt_files[i % len(txt_files)]),
+            n_calls=args.profile,
+            detector=detector,
+            name="batch_process",
+            output_dir=args.profile_dir
+        )
+    
     print("=" * 70)
     print()
     
@@ -183,6 +218,10 @@ def main():
             print(f"   결과: {status}")
             print(f"   공격성 점수: {result['abusive_score']:.4f}")
             print(f"   신뢰도: {result['confidence']:.4f}")
+            if result.get('decided_by') == 'rules':
+                print("   판정 근거: 규칙 (모델 추론 생략)")
+            if 'exit_layer' in result:
+                print(f"   종료 레이어: {result['exit_layer']}")
             print(f"   처리 시간: {result['processing_time']:.3f}초")
             
             # 결과 저장
@@ -190,9 +229,13 @@ def main():
                 output_path = create_output_filename(filepath, config['output']['results_dir'])
                 save_result(result, output_path)
             
+            PIPELINE_ITEMS.inc(pipeline="batch_process", status="ok")
+            
         except Exception as e:
             print(f"   ❌ 오류 발생: {e}")
+            PIPELINE_ITEMS.inc(pipeline="batch_process", status="error")
         
+        QUEUE_DEPTH.set(len(txt_files) - i, pipeline="batch_process")
         print()
     
     # 전체 결과 요약
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+sLLM logprob 모드 보정
+레이블된 CSV로 온도/편향(Platt scaling)을 학습해 모델 파일 옆에 저장
+(SLLMAbusiveDetector(output_mode="logprob")가 생성 시 자동으로 로드)
+
+사용법:
+    python calibrate_sllm_logprob.py
+    python calibrate_sllm_logprob.py --data data/training/sample_data.csv --model-path models/other.gguf
+"""
+
+import sys
+import os
+import argparse
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from src.detector_sllm import SLLMAbusiveDetector
+
+
+DEFAULT_DATA = [
+    "data/training/issue_cases_training.csv",
+    "data/training/sample_data.csv",
+]
+
+# 정상으로 보는 레이블 값 (그 외는 부적절)
+NORMAL_LABELS = ("정상", "normal", "0")
+
+
+def parse_args():
+    """명령행 인자"""
+    parser = argparse.ArgumentParser(description="sLLM logprob 모드 보정값 학습")
+    parser.add_argument(
+        '--data',
+        type=str,
+        nargs='+',
+        default=DEFAULT_DATA,
+        help='text,label 열이 있는 CSV (여러 개 가능)'
+    )
+    parser.add_argument(
+        '--model-path',
+        type=str,
+        default="./models/Midm-2.0-Mini-Instruct-Q4_K_M.gguf",
+        help='GGUF 모델 파일'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='보정 파일 경로 (기본: <모델 파일명>.logprob_calibration.json)'
+    )
+    return parser.parse_args()
+
+
+def load_labeled_texts(paths):
+    """CSV들에서 (텍스트 리스트, 0/1 레이블 리스트)"""
+    import pandas as pd
+
+    texts, labels = [], []
+    for path in paths:
+        df = pd.read_csv(path)
+        texts.extend(df["text"].astype(str).tolist())
+        labels.extend(0 if str(label).strip() in NORMAL_LABELS else 1 for label in df["label"])
+    return texts, labels
+
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+
+    missing = [path for path in args.data if not os.path.exists(path)]
+    if missing:
+        print(f"❌ 데이터 파일이 없습니다: {', '.join(missing)}")
+        return
+
+    texts, labels = load_labeled_texts(args.data)
+    print(f"📊 보정 데이터: {len(texts)}개 (부적절 {sum(labels)}, 정상 {len(labels) - sum(labels)})")
+
+    detector = SLLMAbusiveDetector(
+        model_path=args.model_path,
+        output_mode="logprob",
+        logprob_calibration_path=args.output,
+        use_prompt_cache=True
+    )
+    calibration = detector.fit_logprob_calibration(texts, labels)
+
+    print()
+    print(f"  📐 온도 T = {calibration['temperature']:.4f}")
+    print(f"  📐 편향 b = {calibration['bias']:.4f}")
+    print(f"  💾 {detector.logprob_calibration_path}")
+    print()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  사용자에 의해 중단되었습니다.")
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+캐스케이드 모드 비교 스크립트
+sLLM 단독 vs KcBERT 1차 필터 + sLLM 재검증 (캐스케이드)
+"""
+
+import sys
+import os
+import argparse
+import warnings
+import time
+from datetime import datetime
+import json
+from pathlib import Path
+
+warnings.filterwarnings('ignore')
+os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import logging
+logging.getLogger('transformers').setLevel(logging.ERROR)
+
+from src.utils import load_config
+from src.ground_truth import GROUND_TRUTH, calculate_accuracy, calculate_score_error
+
+
+def print_header(title):
+    """헤더 출력"""
+    print("\n" + "=" * 80)
+    print(f"  {title}")
+    print("=" * 80 + "\n")
+
+
+def parse_args(cascade_config):
+    """명령행 인자 파싱 (기본값은 config.yaml의 cascade 섹션)"""
+    band = cascade_config.get('escalation_band', [0.3, 0.7])
+
+    parser = argparse.ArgumentParser(
+        description="sLLM 단독 vs 캐스케이드(KcBERT → sLLM) 비교"
+    )
+    parser.add_argument(
+        '--prefilter',
+        choices=['improved', 'multi'],
+        default=cascade_config.get('prefilter', 'improved'),
+        help='1차 필터 감지기'
+    )
+    parser.add_argument(
+        '--band-low',
+        type=float,
+        default=band[0],
+        help='sLLM 재검증 구간 하한'
+    )
+    parser.add_argument(
+        '--band-high',
+        type=float,
+        default=band[1],
+        help='sLLM 재검증 구간 상한'
+    )
+    parser.add_argument(
+        '--min-confidence',
+        type=float,
+        default=cascade_config.get('min_confidence'),
+        help='1차 신뢰도가 이 값 미만이면 sLLM으로 재검증'
+    )
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    try:
+        config = load_config('config.yaml')
+    except FileNotFoundError:
+        config = {}
+    cascade_config = config.get('cascade', {}) or {}
+
+    args = parse_args(cascade_config)
+
+    print_header("🔬 sLLM 단독 vs 캐스케이드 비교 테스트")
+
+    print("📝 테스트 개요")
+    print("-" * 80)
+    print(f"  ├─ 1차 필터: {args.prefilter}")
+    print(f"  ├─ 재검증 구간: [{args.band_low:.2f}, {args.band_high:.2f})")
+    print(f"  ├─ 최소 신뢰도: {args.min_confidence if args.min_confidence is not None else '사용 안함'}")
+    print("  └─ 비교 대상: sLLM 단독 vs 캐스케이드")
+    print()
+
+    # 테스트 파일 확인
+    samples_dir = Path("data/samples")
+    test_files = sorted([f for f in samples_dir.glob("test_*.txt")])
+
+    if not test_files:
+        print("❌ 테스트 파일을 찾을 수 없습니다.")
+        return
+
+    print(f"✅ 테스트 파일 {len(test_files)}개 발견")
+    print()
+
+    texts = {}
+    for test_file in test_files:
+        with open(test_file, 'r', encoding='utf-8') as f:
+            texts[test_file.name] = f.read().strip()
+
+    # 모델 로딩
+    print_header("1️⃣ 모델 로딩")
+    from src.detector_sllm import SLLMAbusiveDetector
+    from src.detector_cascade import CascadeDetector
+
+    # sLLM은 한 번만 로드해서 단독 실행과 캐스케이드가 공유
+    sllm_detector = SLLMAbusiveDetector(verbose=False)
+    cascade_detector = CascadeDetector(
+        prefilter=args.prefilter,
+        escalation_band=(args.band_low, args.band_high),
+        min_confidence=args.min_confidence,
+        sllm_detector=sllm_detector
+    )
+
+    # 워밍업 실행 (모델 초기화 시간 제외)
+    print_header("2️⃣ 모델 워밍업")
+    warmup_text = "안녕하세요. 테스트입니다."
+
+    print("  🔵 KcBERT 워밍업...", end=" ", flush=True)
+    _ = cascade_detector._get_prefilter().predict(warmup_text)
+    print("완료")
+
+    print("  🟢 sLLM 워밍업...", end=" ", flush=True)
+    _ = sllm_detector.predict(warmup_text)
+    print("완료")
+    print()
+
+    # sLLM 단독
+    print_header("3️⃣ sLLM 단독 실행")
+
+    sllm_results = {}
+    sllm_start = time.time()
+    for i, (filename, text) in enumerate(texts.items(), 1):
+        result = sllm_detector.predict(text)
+        sllm_results[filename] = {
+            'score': result['abusive_score'],
+            'is_abusive': result['is_abusive'],
+            'time': result['processing_time']
+        }
+        print(f"  [{i:2d}/{len(texts)}] {filename:<40} {result['abusive_score']:.3f} "
+              f"({result['processing_time']:.2f}초)")
+    sllm_total_time = time.time() - sllm_start
+
+    # 캐스케이드
+    print_header("4️⃣ 캐스케이드 실행")
+
+    cascade_results = {}
+    prefilter_results = {}
+    cascade_start = time.time()
+    for i, (filename, text) in enumerate(texts.items(), 1):
+        result = cascade_detector.predict(text)
+        cascade_results[filename] = {
+            'score': result['abusive_score'],
+            'is_abusive': result['is_abusive'],
+            'decided_by': result['decided_by'],
+            'time': result['processing_time']
+        }
+        prefilter_results[filename] = {
+            'score': result['stages']['prefilter']['score']
+        }
+        stage = "🟢 sLLM" if result['escalated'] else "🔵 KcBERT"
+        print(f"  [{i:2d}/{len(texts)}] {filename:<40} {result['abusive_score']:.3f} "
+              f"{stage} ({result['processing_time']:.2f}초)")
+    cascade_total_time = time.time() - cascade_start
+
+    # 통계 계산
+    print_header("5️⃣ 비교 결과")
+
+    escalated_count = sum(1 for r in cascade_results.values() if r['decided_by'] == 'sllm')
+    escalation_rate = escalated_count / len(texts) * 100
+
+    sllm_throughput = len(texts) / sllm_total_time if sllm_total_time > 0 else 0
+    cascade_throughput = len(texts) / cascade_total_time if cascade_total_time > 0 else 0
+    speedup = sllm_total_time / cascade_total_time if cascade_total_time > 0 else 0
+
+    sllm_accuracy = calculate_accuracy(sllm_results, GROUND_TRUTH)
+    cascade_accuracy = calculate_accuracy(cascade_results, GROUND_TRUTH)
+    prefilter_accuracy = calculate_accuracy(prefilter_results, GROUND_TRUTH)
+
+    sllm_mae = calculate_score_error(sllm_results, GROUND_TRUTH)
+    cascade_mae = calculate_score_error(cascade_results, GROUND_TRUTH)
+
+    print("  🔀 재검증 비율")
+    print(f"     sLLM 재검증: {escalated_count}/{len(texts)}건 ({escalation_rate:.1f}%)")
+    print(f"     KcBERT 단독 판정: {len(texts) - escalated_count}건")
+    print()
+
+    print("  ⏱️  처리량 비교")
+    print(f"     sLLM 단독: {sllm_total_time:.2f}초 ({sllm_throughput:.2f}건/초)")
+    print(f"     캐스케이드: {cascade_total_time:.2f}초 ({cascade_throughput:.2f}건/초)")
+    print(f"     향상:      {speedup:.1f}x")
+    print()
+
+    print("  🎯 정확도 비교")
+    print(f"     sLLM 단독:   {sllm_accuracy:.1f}% (MAE {sllm_mae:.3f})")
+    print(f"     캐스케이드:  {cascade_accuracy:.1f}% (MAE {cascade_mae:.3f})")
+    print(f"     KcBERT 단독: {prefilter_accuracy:.1f}%")
+    print(f"     차이:        {cascade_accuracy - sllm_accuracy:+.1f}%p (캐스케이드 - sLLM)")
+    print()
+
+    # 결과 저장
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    result_file = f"data/results/comparison_cascade_{timestamp}.json"
+
+    comparison_result = {
+        "timestamp": timestamp,
+        "test_count": len(texts),
+        "config": {
+            "prefilter": args.prefilter,
+            "escalation_band": [args.band_low, args.band_high],
+            "min_confidence": args.min_confidence
+        },
+        "summary": {
+            "escalation_rate": escalation_rate,
+            "escalated_count": escalated_count,
+            "speedup": speedup,
+            "sllm": {
+                "total_time": sllm_total_time,
+                "throughput": sllm_throughput,
+                "accuracy": sllm_accuracy,
+                "mae": sllm_mae
+            },
+            "cascade": {
+                "total_time": cascade_total_time,
+                "throughput": cascade_throughput,
+                "accuracy": cascade_accuracy,
+                "mae": cascade_mae
+            },
+            "prefilter_only": {
+                "accuracy": prefilter_accuracy
+            }
+        },
+        "sllm_results": sllm_results,
+        "cascade_results": cascade_results,
+        "ground_truth": GROUND_TRUTH
+    }
+
+    os.makedirs("data/results", exist_ok=True)
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(comparison_result, f, ensure_ascii=False, indent=2, default=str)
+
+    print(f"💾 결과 저장: {result_file}")
+    print()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  사용자에 의해 중단되었습니다.")
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""
+지식 증류(Knowledge Distillation) 스크립트
+fine-tuned KcBERT(teacher)의 soft logits로 작은 student 모델을 학습
+
+- student: teacher의 레이어 일부(기본 6층)를 골라 초기화하거나, --hidden-size로 더 좁은 모델을 새로 초기화
+- 학습 데이터: 학습 CSV(정답 있음) + data/samples 통화 텍스트(정답 없음, teacher 로짓만 사용)
+- 검증 데이터: teacher 학습 CSV는 teacher와 같은 분할의 검증 20%만 사용 (teacher 학습 데이터 제외)
+- 손실: KL(student/T ‖ teacher/T) × T² + alpha × CE(정답이 있는 텍스트)
+- 출력: ModelLoader로 바로 로드할 수 있는 모델 디렉토리 + 속도/정확도 비교 리포트
+
+사용법:
+    python distill_student.py --teacher models/kcbert-finetuned-issue-cases --layers 4
+"""
+
+import sys
+import os
+import argparse
+import json
+import warnings
+
+warnings.filterwarnings('ignore')
+os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import logging
+logging.getLogger('transformers').setLevel(logging.ERROR)
+
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+DEFAULT_TRAIN_CSVS = "data/training/issue_cases_training.csv,data/training/sample_data.csv"
+
+# sample_data.csv처럼 문자열 라벨을 쓰는 CSV용
+NORMAL_LABELS = ("정상", "normal", "0")
+
+# teacher(finetune_issue_cases.py)의 학습 CSV와 검증 분할 시드
+# 이 CSV는 teacher와 같은 분할의 검증 20%만 검증에 사용 (teacher 학습 데이터로 검증하지 않음)
+TEACHER_TRAIN_CSV = "data/training/issue_cases_training.csv"
+TEACHER_SPLIT_SEED = 42
+
+# BERT 어텐션 헤드 크기 (student hidden size는 이 값의 배수)
+ATTENTION_HEAD_SIZE = 64
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="KcBERT 지식 증류 (teacher → student)")
+    parser.add_argument(
+        '--teacher',
+        type=str,
+        default="models/kcbert-finetuned-issue-cases",
+        help='fine-tuned teacher 모델 디렉토리'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=None,
+        help='student 저장 디렉토리 (기본: models/kcbert-student-L<층수>[-H<hidden>])'
+    )
+    parser.add_argument(
+        '--layers',
+        type=int,
+        default=6,
+        help='student 인코더 레이어 수 (4 또는 6 권장)'
+    )
+    parser.add_argument(
+        '--hidden-size',
+        type=int,
+        default=None,
+        help='student hidden size (지정 시 teacher 가중치 없이 새로 초기화, 예: 384)'
+    )
+    parser.add_argument(
+        '--train-csv',
+        type=str,
+        default=DEFAULT_TRAIN_CSVS,
+        help='정답이 있는 학습 CSV (쉼표 구분, text/label 컬럼)'
+    )
+    parser.add_argument(
+        '--teacher-csv',
+        type=str,
+        default=TEACHER_TRAIN_CSV,
+        help='teacher fine-tuning에 쓴 CSV (teacher와 같은 80:20 분할로 검증 데이터 선택)'
+    )
+    parser.add_argument(
+        '--unlabeled-dir',
+        type=str,
+        default="data/samples",
+        help='정답 없는 통화 텍스트(*.txt) 디렉토리 (없으면 사용 안함)'
+    )
+    parser.add_argument('--epochs', type=int, default=10, help='학습 에폭')
+    parser.add_argument('--batch-size', type=int, default=8, help='배치 크기')
+    parser.add_argument(
+        '--learning-rate',
+        type=float,
+        default=None,
+        help='학습률 (기본: teacher 가중치로 초기화 시 5e-5, 새로 초기화 시 2e-4)'
+    )
+    parser.add_argument('--temperature', type=float, default=2.0, help='증류 온도 T')
+    parser.add_argument('--alpha', type=float, default=0.5, help='정답 CE 손실 가중치')
+    parser.add_argument('--max-length', type=int, default=300, help='최대 토큰 길이')
+    parser.add_argument(
+        '--bench-batch-size',
+        type=int,
+        default=8,
+        help='속도 비교 배치 크기 (감지기 predict_batch 기준)'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='랜덤 시드 (teacher가 보지 않은 CSV 분할)')
+    return parser.parse_args()
+
+
+def print_header(title):
+    """헤더 출력"""
+    print("\n" + "=" * 70)
+    print(f"  {title}")
+    print("=" * 70 + "\n")
+
+
+def parse_label(value):
+    """정수 라벨은 그대로, 문자열 라벨은 정상=0 / 나머지=1"""
+    text = str(value).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    return 0 if text in NORMAL_LABELS else 1
+
+
+def load_labeled_texts(csv_paths):
+    """학습 CSV들에서 (텍스트, 라벨) 로드"""
+    import pandas as pd
+
+    texts, labels = [], []
+    for path in csv_paths:
+        if not os.path.exists(path):
+            print(f"  ⚠️  파일 없음 (건너뜀): {path}")
+            continue
+        df = pd.read_csv(path)
+        texts.extend(str(text) for text in df['text'])
+        labels.extend(parse_label(label) for label in df['label'])
+        print(f"  ├─ {path}: {len(df)}개")
+    return texts, labels
+
+
+def split_labeled(csv_paths, teacher_csv, seed):
+    """
+    학습/검증 분할
+
+    teacher 학습 CSV는 finetune_issue_cases.py와 같은 분할(random_state=42, 층화)을 그대로 써서
+    teacher가 학습한 80%는 학습에만, 나머지 20%는 검증에만 넣는다.
+    teacher가 보지 않은 CSV는 seed로 80:20 층화 분할한다.
+
+    Returns:
+        (train_texts, train_labels, val_texts, val_labels)
+    """
+    import numpy as np
+    from sklearn.model_selection import train_test_split
+
+    teacher_csv = os.path.normpath(teacher_csv) if teacher_csv else None
+    train_texts, train_labels, val_texts, val_labels = [], [], [], []
+
+    for path in csv_paths:
+        texts, labels = load_labeled_texts([path])
+        if not texts:
+            continue
+
+        if os.path.normpath(path) == teacher_csv:
+            split_seed = TEACHER_SPLIT_SEED
+        elif len(set(labels)) < 2 or min(labels.count(0), labels.count(1)) < 2:
+            # 층화 분할이 불가능할 만큼 작으면 학습에만 사용
+            train_texts.extend(texts)
+            train_labels.extend(labels)
+            continue
+        else:
+            split_seed = seed
+
+        train_idx, val_idx = train_test_split(
+            np.arange(len(texts)), test_size=0.2, random_state=split_seed, stratify=labels
+        )
+        train_texts.extend(texts[i] for i in train_idx)
+        train_labels.extend(labels[i] for i in train_idx)
+        val_texts.extend(texts[i] for i in val_idx)
+        val_labels.extend(labels[i] for i in val_idx)
+
+    return train_texts, train_labels, val_texts, val_labels
+
+
+def student_attention_heads(hidden_size):
+    """
+    student hidden size의 어텐션 헤드 수 (헤드 크기 64 유지)
+
+    Raises:
+        ValueError: hidden size가 64의 배수가 아닌 경우
+    """
+    if hidden_size <= 0 or hidden_size % ATTENTION_HEAD_SIZE:
+        raise ValueError(
+            f"--hidden-size는 {ATTENTION_HEAD_SIZE}의 배수여야 합니다 "
+            f"(헤드 크기 {ATTENTION_HEAD_SIZE}): {hidden_size}, 예: 256, 384, 512"
+        )
+    return hidden_size // ATTENTION_HEAD_SIZE
+
+
+def load_unlabeled_texts(directory):
+    """통화 텍스트 파일 전체와 각 발화(줄)를 정답 없는 학습 텍스트로 사용"""
+    if not directory or not os.path.isdir(directory):
+        return []
+
+    texts = []
+    for file_path in sorted(Path(directory).glob("*.txt")):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        if not content:
+            continue
+        texts.append(content)
+        texts.extend(line.strip() for line in content.splitlines() if len(line.strip()) > 5)
+    return texts
+
+
+def select_teacher_layers(teacher_layers, student_layers):
+    """
+    student 레이어별로 복사할 teacher 레이어 (균등 간격, 마지막 레이어 포함)
+
+    예: 12 → 4: [2, 5, 8, 11], 12 → 6: [1, 3, 5, 7, 9, 11] (0부터)
+    """
+    return [round((i + 1) * teacher_layers / student_layers) - 1 for i in range(student_layers)]
+
+
+def build_student(teacher, num_layers, hidden_size=None):
+    """
+    student 생성
+
+    hidden size가 같으면 임베딩/선택한 레이어/pooler/classifier를 teacher에서 복사하고,
+    다르면 같은 구조의 좁은 모델을 새로 초기화한다.
+
+    Returns:
+        (student, 복사한 teacher 레이어 리스트 또는 None)
+    """
+    import copy
+    from transformers import BertForSequenceClassification
+
+    config = copy.deepcopy(teacher.config)
+    config.num_hidden_layers = num_layers
+
+    if hidden_size and hidden_size != teacher.config.hidden_size:
+        config.hidden_size = hidden_size
+        config.num_attention_heads = student_attention_heads(hidden_size)
+        config.intermediate_size = hidden_size * 4
+        return BertForSequenceClassification(config), None
+
+    student = BertForSequenceClassification(config)
+    layer_map = select_teacher_layers(teacher.config.num_hidden_layers, num_layers)
+
+    teacher_state = teacher.state_dict()
+    student_state = {}
+    for name in student.state_dict():
+        source = name
+        if ".encoder.layer." in name:
+            prefix, rest = name.split(".encoder.layer.", 1)
+            index, suffix = rest.split(".", 1)
+            source = f"{prefix}.encoder.layer.{layer_map[int(index)]}.{suffix}"
+        if source in teacher_state:
+            student_state[name] = teacher_state[source]
+    student.load_state_dict(student_state, strict=False)
+    return student, layer_map
+
+
+def tokenize_texts(tokenizer, texts, max_length):
+    """패딩 없이 토큰화 (배치마다 가장 긴 길이로 패딩)"""
+    encoded = tokenizer(texts, max_length=max_length, truncation=True)
+    return [
+        {key: encoded[key][i] for key in encoded.keys()}
+        for i in range(len(texts))
+    ]
+
+
+def iterate_batches(tokenizer, features, indices, batch_size, device):
+    """features에서 indices 순서로 배치 구성"""
+    for i in range(0, len(indices), batch_size):
+        batch_indices = indices[i:i + batch_size]
+        batch = tokenizer.pad([features[j] for j in batch_indices], return_tensors="pt")
+        yield batch_indices, {k: v.to(device) for k, v in batch.items()}
+
+
+def compute_logits(model, tokenizer, features, batch_size, device):
+    """전체 텍스트의 로짓 [N, 2]"""
+    import torch
+
+    model.eval()
+    logits = []
+    with torch.no_grad():
+        for _, batch in iterate_batches(tokenizer, features, list(range(len(features))),
+                                        batch_size, device):
+            logits.append(model(**batch).logits.float().cpu())
+    return torch.cat(logits)
+
+
+def distill(student, tokenizer, features, teacher_logits, labels, args, device):
+    """
+    student 학습
+
+    Args:
+        features: 토큰화된 학습 텍스트
+        teacher_logits: teacher 로짓 [N, 2] (미리 계산)
+        labels: 정답 (정답 없는 텍스트는 -100)
+    """
+    import torch
+    import torch.nn.functional as F
+    from transformers import get_linear_schedule_with_warmup
+
+    T = args.temperature
+    lr = args.learning_rate or (2e-4 if args.hidden_size else 5e-5)
+    targets = torch.as_tensor(labels, dtype=torch.long)
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr, weight_decay=0.01)
+    steps = args.epochs * ((len(features) + args.batch_size - 1) // args.batch_size)
+    scheduler = get_linear_schedule_with_warmup(optimizer, int(steps * 0.1), steps)
+
+    history = []
+    student.train()
+    for epoch in range(1, args.epochs + 1):
+        order = torch.randperm(len(features)).tolist()
+        total_loss = 0.0
+        for batch_indices, batch in iterate_batches(tokenizer, features, order,
+                                                    args.batch_size, device):
+            logits = student(**batch).logits
+            soft_targets = F.softmax(teacher_logits[batch_indices].to(device) / T, dim=-1)
+            kd_loss = F.kl_div(
+                F.log_softmax(logits / T, dim=-1), soft_targets, reduction="batchmean"
+            ) * T * T
+
+            batch_targets = targets[batch_indices].to(device)
+            loss = kd_loss
+            if (batch_targets != -100).any():
+                loss = loss + args.alpha * F.cross_entropy(logits, batch_targets, ignore_index=-100)
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            total_loss += loss.item() * len(batch_indices)
+
+        epoch_loss = total_loss / len(features)
+        history.append(epoch_loss)
+        print(f"  에폭 {epoch}/{args.epochs}: loss {epoch_loss:.4f}")
+
+    student.eval()
+    return history
+
+
+def classification_metrics(logits, labels):
+    """로짓과 정답으로 정확도/F1"""
+    from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+    preds = logits.argmax(-1).tolist()
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        labels, preds, average='binary', zero_division=0
+    )
+    return {
+        "accuracy": float(accuracy_score(labels, preds)),
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1": float(f1),
+    }
+
+
+def measure_speed(model_dir, texts, batch_size):
+    """감지기(ModelLoader 경로)로 predict_batch 속도 측정"""
+    from src.benchmark import run_point
+    from src.detector import AbusiveDetector
+
+    with AbusiveDetector(model_name=model_dir) as detector:
+        detector.load_model()
+        point = run_point(lambda batch: detector.predict_batch(batch, batch_size=batch_size),
+                          texts, batch_size, warmup=2, repeat=10)
+    return {
+        "per_item_p50_ms": point["per_item_p50_ms"],
+        "throughput_items_per_sec": point["throughput_items_per_sec"],
+        "latency_ms": point["latency_ms"],
+    }
+
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    torch.manual_seed(args.seed)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    output_dir = args.output_dir or (
+        f"models/kcbert-student-L{args.layers}"
+        + (f"-H{args.hidden_size}" if args.hidden_size else "")
+    )
+
+    if args.hidden_size:
+        try:
+            student_attention_heads(args.hidden_size)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+
+    print_header("🎓 KcBERT 지식 증류")
+
+    # 1. 데이터
+    print_header("1️⃣ 데이터 로드")
+    if not os.path.isdir(args.teacher):
+        print(f"❌ teacher 모델이 없습니다: {args.teacher}")
+        print("   먼저 python finetune_issue_cases.py 로 fine-tuning 하세요")
+        return
+
+    train_texts, train_labels, val_texts, val_labels = split_labeled(
+        [path.strip() for path in args.train_csv.split(",") if path.strip()],
+        args.teacher_csv, args.seed
+    )
+    if len(set(train_labels)) < 2 or len(set(val_labels)) < 2:
+        print("❌ 학습/검증 모두 정상/부적절 라벨이 있는 데이터가 필요합니다")
+        return
+
+    unlabeled_texts = load_unlabeled_texts(args.unlabeled_dir)
+
+    texts = list(train_texts) + unlabeled_texts
+    labels = list(train_labels) + [-100] * len(unlabeled_texts)
+    print(f"  ├─ 학습 (정답 있음): {len(train_texts)}개")
+    print(f"  ├─ 학습 (정답 없음, {args.unlabeled_dir}): {len(unlabeled_texts)}개")
+    print(f"  └─ 검증: {len(val_texts)}개 ({args.teacher_csv}는 teacher 검증 분할만 사용)")
+
+    # 2. teacher 로짓
+    print_header("2️⃣ Teacher 로짓 계산")
+    tokenizer = AutoTokenizer.from_pretrained(args.teacher)
+    teacher = AutoModelForSequenceClassification.from_pretrained(args.teacher).to(device)
+
+    features = tokenize_texts(tokenizer, texts, args.max_length)
+    val_features = tokenize_texts(tokenizer, list(val_texts), args.max_length)
+    teacher_logits = compute_logits(teacher, tokenizer, features, args.batch_size, device)
+    teacher_val_logits = compute_logits(teacher, tokenizer, val_features, args.batch_size, device)
+    print(f"✅ {len(features) + len(val_features)}개 텍스트 로짓 계산 완료 (teacher {args.teacher})")
+
+    # 3. student 생성 및 학습
+    print_header("3️⃣ Student 학습")
+    student, layer_map = build_student(teacher, args.layers, args.hidden_size)
+    student.to(device)
+    teacher_params = sum(p.numel() for p in teacher.parameters())
+    student_params = sum(p.numel() for p in student.parameters())
+    print(f"  ├─ 구조: {args.layers}층, hidden {student.config.hidden_size}")
+    print(f"  ├─ 파라미터: {student_params / 1e6:.1f}M (teacher {teacher_params / 1e6:.1f}M)")
+    if layer_map is not None:
+        print(f"  ├─ 초기화: teacher 레이어 {layer_map} 복사")
+    else:
+        print("  ├─ 초기화: 새로 초기화 (hidden size가 달라 teacher 가중치 사용 불가)")
+    print(f"  └─ 손실: KL(T={args.temperature}) + {args.alpha} × CE")
+    print()
+
+    train_start = time.time()
+    history = distill(student, tokenizer, features, teacher_logits, labels, args, device)
+    train_time = time.time() - train_start
+
+    # 4. 저장 (ModelLoader로 바로 로드 가능한 형식)
+    print_header("4️⃣ Student 저장")
+    student.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ 저장 완료: {output_dir}")
+
+    # 5. 비교
+    print_header("5️⃣ Teacher / Student 비교")
+    student_val_logits = compute_logits(student, tokenizer, val_features, args.batch_size, device)
+    student_train_logits = compute_logits(student, tokenizer, features, args.batch_size, device)
+    agreement = (student_train_logits.argmax(-1) == teacher_logits.argmax(-1)).float().mean().item()
+
+    del teacher, student
+    bench_texts = load_unlabeled_texts(args.unlabeled_dir) or list(val_texts)
+    teacher_speed = measure_speed(args.teacher, bench_texts, args.bench_batch_size)
+    student_speed = measure_speed(output_dir, bench_texts, args.bench_batch_size)
+
+    report = {
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "teacher": {
+            "path": args.teacher,
+            "parameters": teacher_params,
+            "validation": classification_metrics(teacher_val_logits, val_labels),
+            "speed": teacher_speed,
+        },
+        "student": {
+            "path": output_dir,
+            "layers": args.layers,
+            "hidden_size": args.hidden_size,
+            "initialized_from_layers": layer_map,
+            "parameters": student_params,
+            "validation": classification_metrics(student_val_logits, val_labels),
+            "speed": student_speed,
+            "teacher_agreement": agreement,
+        },
+        "speedup": (student_speed["throughput_items_per_sec"]
+                    / max(teacher_speed["throughput_items_per_sec"], 1e-9)),
+        "training": {
+            "labeled": len(train_texts),
+            "unlabeled": len(unlabeled_texts),
+            "validation": len(val_texts),
+            "teacher_split_csv": args.teacher_csv,
+            "epochs": args.epochs,
+            "temperature": args.temperature,
+            "alpha": args.alpha,
+            "loss_history": history,
+            "train_time_sec": train_time,
+        },
+    }
+
+    print(f"  {'':10} | {'정확도':>6} | {'F1':>6} | {'건당 p50':>10} | {'처리량':>12}")
+    for name in ("teacher", "student"):
+        entry = report[name]
+        print(f"  {name:10} | {entry['validation']['accuracy']:>6.3f} | "
+              f"{entry['validation']['f1']:>6.3f} | "
+              f"{entry['speed']['per_item_p50_ms']:>8.1f}ms | "
+              f"{entry['speed']['throughput_items_per_sec']:>8.1f}건/초")
+    print()
+    print(f"  ├─ 속도 향상: {report['speedup']:.2f}배 (배치 {args.bench_batch_size})")
+    print(f"  └─ teacher 예측 일치율 (학습 텍스트): {agreement * 100:.1f}%")
+    print()
+
+    with open(os.path.join(output_dir, "distillation_report.json"), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.makedirs("data/results", exist_ok=True)
+    result_file = f"data/results/distillation_result_{report['timestamp']}.json"
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 리포트 저장: {result_file}")
+    print()
+
+    print("  🎯 사용법:")
+    print(f"  └─ AbusiveDetector(model_name=\"{output_dir}\")")
+    print()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  사용자에 의해 중단되었습니다.")
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
@@ -2,10 +2,15 @@
 """
 Fine-tuned 모델 평가 스크립트
 원본 KcBERT vs Fine-tuned KcBERT 성능 비교
+
+사용법:
+    python evaluate_finetuned_model.py                                        # fine-tuning 출력 디렉토리
+    python evaluate_finetuned_model.py --model models/bundles/kcbert-issue-cases  # 서빙 번들
 """
 
 import sys
 import os
+import argparse
 import warnings
 import time
 from pathlib import Path
@@ -22,6 +27,8 @@ if sys.platform == 'win32':
 import logging
 logging.getLogger('transformers').setLevel(logging.ERROR)
 
+from src.ground_truth import GROUND_TRUTH, calculate_accuracy, calculate_score_error
+
 
 def print_header(title):
     """헤더 출력"""
@@ -30,76 +37,22 @@ def print_header(title):
     print("=" * 80 + "\n")
 
 
-def classify_result(score, threshold=0.5):
-    """점수로 레이블 분류"""
-    if score < 0.3:
-        return "정상"
-    elif score < 0.6:
-        return "경계선"
-    else:
-        return "부적절"
-
-
-def calculate_accuracy(predictions, ground_truth):
-    """정확도 계산"""
-    correct = 0
-    total = len(predictions)
-    
-    for filename, pred in predictions.items():
-        if filename not in ground_truth:
-            continue
-        
-        gt = ground_truth[filename]
-        pred_label = classify_result(pred['score'])
-        
-        if pred_label == gt['label']:
-            correct += 1
-    
-    return (correct / total * 100) if total > 0 else 0
-
-
-def calculate_score_error(predictions, ground_truth):
-    """평균 점수 오차 계산 (MAE)"""
-    errors = []
-    
-    for filename, pred in predictions.items():
-        if filename not in ground_truth:
-            continue
-        
-        gt = ground_truth[filename]
-        error = abs(pred['score'] - gt['score'])
-        errors.append(error)
-    
-    return sum(errors) / len(errors) if errors else 0
-
-
-# Ground Truth (실제 정답)
-GROUND_TRUTH = {
-    "test_01_normal_service.txt": {"label": "정상", "score": 0.1, "category": "없음"},
-    "test_02_strong_complaint.txt": {"label": "경계선", "score": 0.4, "category": "불만"},
-    "test_03_explicit_profanity.txt": {"label": "부적절", "score": 0.95, "category": "욕설"},
-    "test_04_insult_no_swear.txt": {"label": "부적절", "score": 0.85, "category": "모욕"},
-    "test_05_direct_threat.txt": {"label": "부적절", "score": 0.9, "category": "위협"},
-    "test_06_sexual_harassment_direct.txt": {"label": "부적절", "score": 0.95, "category": "성희롱"},
-    "test_07_sexual_harassment_subtle.txt": {"label": "부적절", "score": 0.75, "category": "성희롱"},
-    "test_08_sarcastic_insult.txt": {"label": "부적절", "score": 0.7, "category": "모욕"},
-    "test_09_borderline_angry.txt": {"label": "경계선", "score": 0.45, "category": "불만"},
-    "test_10_borderline_frustrated.txt": {"label": "경계선", "score": 0.5, "category": "불만"},
-    "test_11_threat_legal.txt": {"label": "경계선", "score": 0.55, "category": "위협"},
-    "test_12_mixed_profanity_threat.txt": {"label": "부적절", "score": 0.98, "category": "복합"},
-    "test_13_profanity_sexual.txt": {"label": "부적절", "score": 0.98, "category": "복합"},
-    "test_14_polite_complaint.txt": {"label": "정상", "score": 0.2, "category": "없음"},
-    "test_15_urgent_request.txt": {"label": "정상", "score": 0.1, "category": "없음"},
-    "test_16_passive_aggressive.txt": {"label": "부적절", "score": 0.65, "category": "모욕"},
-    "test_17_mild_insult.txt": {"label": "부적절", "score": 0.6, "category": "모욕"},
-    "test_18_explicit_threat.txt": {"label": "부적절", "score": 0.95, "category": "위협"},
-    "test_19_emotional_outburst.txt": {"label": "경계선", "score": 0.5, "category": "불만"},
-    "test_20_appreciation.txt": {"label": "정상", "score": 0.0, "category": "없음"},
-}
+def parse_args():
+    """명령행 인자"""
+    parser = argparse.ArgumentParser(description="원본 KcBERT vs Fine-tuned KcBERT 비교")
+    parser.add_argument(
+        '--model',
+        type=str,
+        default="models/kcbert-finetuned-issue-cases",
+        help='Fine-tuned 모델 디렉토리 또는 서빙 번들 (export_serving_bundle.py)'
+    )
+    return parser.parse_args()
 
 
 def main():
     """메인 함수"""
+    args = parse_args()
+    
     print_header("🔬 Fine-tuned 모델 평가")
     
     print("📝 평가 개요")
@@ -110,7 +63,7 @@ def main():
     print()
     
     # Fine-tuned 모델 확인
-    finetuned_model_path = "models/kcbert-finetuned-issue-cases"
+    finetuned_model_path = args.model
     if not os.path.exists(finetuned_model_path):
         print(f"❌ Fine-tuned 모델이 없습니다: {finetuned_model_path}")
         print("   먼저 'python finetune_issue_cases.py'를 실행하세요.")
@@ -132,6 +85,7 @@ def main():
     
     # 모델 로딩
     print_header("1️⃣ 원본 KcBERT 모델 로딩")
+    from src.detector import AbusiveDetector
     from src.detector_multi import MultiCategoryDetector
     
     original_detector = MultiCategoryDetector()
@@ -139,19 +93,9 @@ def main():
     
     print_header("2️⃣ Fine-tuned KcBERT 모델 로딩")
     
-    # Fine-tuned 모델 로더 (임시로 원본 사용, 모델 경로만 변경)
-    import torch
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
-    
-    tokenizer = AutoTokenizer.from_pretrained(finetuned_model_path)
-    model = AutoModelForSequenceClassification.from_pretrained(
-        finetuned_model_path,
-        ignore_mismatched_sizes=True
-    )
-    
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    model.to(device)
-    model.eval()
+    # 서비스와 같은 경로(ModelLoader → 감지기)로 로드 (서빙 번들도 그대로 로드)
+    finetuned_detector = AbusiveDetector(model_name=finetuned_model_path)
+    finetuned_detector.load_model()
     
     print("✅ Fine-tuned 모델 로딩 완료")
     print()
@@ -168,17 +112,7 @@ def main():
     print("완료")
     
     print("  🟢 Fine-tuned KcBERT 워밍업...", end=" ", flush=True)
-    warmup_inputs = tokenizer(
-        warmup_text,
-        add_special_tokens=True,
-        max_length=300,
-        padding='max_length',
-        truncation=True,
-        return_tensors='pt'
-    ).to(device)
-    
-    with torch.no_grad():
-        _ = model(**warmup_inputs)
+    _ = finetuned_detector.predict(warmup_text)
     print("완료")
     
     print()
@@ -227,23 +161,10 @@ def main():
         print("  🟢 Fine-tuned KcBERT 분석 중...", end=" ", flush=True)
         start_time = time.time()
         
-        # 토큰화
-        inputs = tokenizer(
-            text,
-            add_special_tokens=True,
-            max_length=300,
-            padding='max_length',
-            truncation=True,
-            return_tensors='pt'
-        ).to(device)
-        
-        # 추론
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=1)
-            score = probs[0][1].item()  # 부적절 확률
-            is_abusive = score >= 0.5
+        # 모델 점수만 비교 (규칙 기반 점수와 결합하기 전 부적절 확률)
+        finetuned_result = finetuned_detector.predict(text)
+        score = finetuned_result['model_score']
+        is_abusive = score >= 0.5
         
         finetuned_time = time.time() - start_time
         finetuned_total_time += finetuned_time
@@ -338,6 +259,7 @@ def main():
     
     evaluation_result = {
         "timestamp": timestamp,
+        "finetuned_model": finetuned_model_path,
         "test_count": len(test_files),
         "summary": {
             "original": {
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+서빙 번들 내보내기
+fine-tuning 결과(가장 좋은 체크포인트)를 양자화/ONNX 모델 + 토크나이저 + 규칙 사전 + manifest로 묶음
+
+사용법:
+    python export_serving_bundle.py                                    # int8 번들 (기본)
+    python export_serving_bundle.py --format onnx                      # ONNX Runtime 번들
+    python export_serving_bundle.py --checkpoint models/kcbert-student-L6 --output models/bundles/student-L6
+
+번들은 ModelLoader/감지기에서 모델 경로로 바로 사용:
+    AbusiveDetector(model_name="models/bundles/kcbert-issue-cases")
+"""
+
+import sys
+import os
+import argparse
+import warnings
+
+warnings.filterwarnings('ignore')
+os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import logging
+logging.getLogger('transformers').setLevel(logging.ERROR)
+
+from src.serving_bundle import BUNDLE_FORMATS, export_bundle
+
+
+DEFAULT_CHECKPOINT = "models/kcbert-finetuned-issue-cases"
+DEFAULT_OUTPUT = "models/bundles/kcbert-issue-cases"
+
+
+def parse_args():
+    """명령행 인자"""
+    parser = argparse.ArgumentParser(description="KcBERT 서빙 번들 내보내기")
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default=DEFAULT_CHECKPOINT,
+        help='fine-tuning 출력 디렉토리 (checkpoint-* 중 가장 좋은 체크포인트 사용)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=DEFAULT_OUTPUT,
+        help='번들 디렉토리'
+    )
+    parser.add_argument(
+        '--format',
+        type=str,
+        choices=BUNDLE_FORMATS,
+        default="int8",
+        help='모델 형식 (fp32: 가중치만, int8: 동적 양자화, onnx: ONNX Runtime)'
+    )
+    parser.add_argument(
+        '--lexicon-dir',
+        type=str,
+        default=None,
+        help='번들에 포함할 규칙 사전 디렉토리 (기본: data/lexicon)'
+    )
+    parser.add_argument(
+        '--no-benchmark',
+        action='store_true',
+        help='원본 대비 지연시간/점수 일치율 측정 생략'
+    )
+    return parser.parse_args()
+
+
+def print_manifest_summary(manifest):
+    """manifest 요약 출력"""
+    print()
+    print("  📦 번들 요약")
+    print(f"  ├─ 형식: {manifest['format']} ({manifest['model_file']})")
+    print(f"  ├─ 원본: {manifest['source_checkpoint']}")
+    if manifest.get("best_metric") is not None:
+        print(f"  ├─ 최고 검증 지표: {manifest['best_metric']:.4f}")
+    versions = ", ".join(f"{name} v{version}" for name, version in manifest["lexicon_versions"].items())
+    print(f"  └─ 규칙 사전: {versions or '없음'}")
+
+    benchmark = manifest.get("benchmark")
+    if benchmark:
+        print()
+        print("  ⏱️  원본 대비 (AbusiveDetector.predict_batch)")
+        for batch_size, points in benchmark["batch_sizes"].items():
+            print(f"  ├─ 배치 {batch_size}: 건당 p50 "
+                  f"{points['source']['per_item_p50_ms']:.1f}ms → {points['bundle']['per_item_p50_ms']:.1f}ms "
+                  f"({points['speedup']:.2f}배)")
+        agreement = benchmark["agreement"]
+        print(f"  └─ 점수 차이 최대 {agreement['max_score_diff']:.4f}, "
+              f"판정 일치율 {agreement['label_agreement']*100:.1f}% ({agreement['texts']}개 텍스트)")
+    print()
+
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+
+    if not os.path.isdir(args.checkpoint):
+        print(f"❌ 체크포인트가 없습니다: {args.checkpoint}")
+        print("   먼저 'python finetune_issue_cases.py'를 실행하세요.")
+        return
+
+    manifest = export_bundle(
+        args.checkpoint,
+        args.output,
+        bundle_format=args.format,
+        lexicon_dir=args.lexicon_dir,
+        benchmark=not args.no_benchmark
+    )
+    print_manifest_summary(manifest)
+
+    print("  💻 사용법")
+    print(f"  ├─ AbusiveDetector(model_name=\"{args.output}\")")
+    print(f"  └─ config.yaml: model.name: \"{args.output}\"")
+    print()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  사용자에 의해 중단되었습니다.")
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
@@ -2,27 +2,55 @@
 """
 이슈 케이스 Fine-tuning 스크립트
 KcBERT 모델을 이슈 케이스로 재학습
+
+사용법:
+    python finetune_issue_cases.py                     # 전체 fine-tuning
+    python finetune_issue_cases.py --early-exit        # fine-tuning 후 조기 종료 분류기 학습
+    python finetune_issue_cases.py --exits-only        # 저장된 모델에 조기 종료 분류기만 학습
+    python finetune_issue_cases.py --fast-train        # 인코더 고정, 캐시한 임베딩으로 분류 헤드만 학습
+    python finetune_issue_cases.py --group-by-length   # 비슷한 길이끼리 배치 구성
+    python finetune_issue_cases.py --packing           # 짧은 예제를 한 시퀀스로 패킹
+    python finetune_issue_cases.py --lora              # LoRA 어댑터만 학습 (models/adapters/issue_cases)
+    python finetune_issue_cases.py --nproc 4           # 로컬 프로세스 4개로 DDP(gloo) 학습
+    python finetune_issue_cases.py --bf16 --gradient-checkpointing  # 학습 메모리/시간 절감
+    python finetune_issue_cases.py --export-bundle     # 학습 후 서빙 번들(int8) 생성
 """
 
 import sys
 import os
+import argparse
 import warnings
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 import torch
-from torch.utils.data import Dataset, DataLoader
 from transformers import (
     AutoTokenizer, 
     AutoModelForSequenceClassification,
     TrainingArguments,
     Trainer,
+    TrainerCallback,
     EarlyStoppingCallback
 )
 from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from src.dataset_cache import load_tokenized_csv, DynamicPaddingCollator
+from src.batching import (
+    LengthGroupedBatchSampler, PackedDataset, PackedCollator, packed_logits, TokenThroughput
+)
+from src.benchmark import cpu_bf16_support, get_peak_rss_mb
+from src.distributed import (
+    launch, is_main_process, all_reduce_throughput, find_baseline, scaling_report
+)
 import json
 from datetime import datetime
 
+DEFAULT_OUTPUT_DIR = "models/kcbert-finetuned-issue-cases"
+DEFAULT_ADAPTER_DIR = "models/adapters/issue_cases"
+DEFAULT_FAST_TRAIN_DIR = "models/kcbert-fast-head-issue-cases"
+
+# --fast-train 저장 디렉토리에 기록하는 고정 인코더 정보 (다른 인코더의 모델을 덮어쓰지 않도록 확인)
+FAST_TRAIN_MARKER = "fast_train.json"
+
 warnings.filterwarnings('ignore')
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 
@@ -34,38 +62,6 @@ import logging
 logging.getLogger('transformers').setLevel(logging.ERROR)
 
 
-class AbusiveDataset(Dataset):
-    """욕설/폭언 감지 데이터셋"""
-    
-    def __init__(self, texts, labels, tokenizer, max_length=300):
-        self.texts = texts
-        self.labels = labels
-        self.tokenizer = tokenizer
-        self.max_length = max_length
-    
-    def __len__(self):
-        return len(self.texts)
-    
-    def __getitem__(self, idx):
-        text = str(self.texts[idx])
-        label = int(self.labels[idx])
-        
-        encoding = self.tokenizer(
-            text,
-            add_special_tokens=True,
-            max_length=self.max_length,
-            padding='max_length',
-            truncation=True,
-            return_tensors='pt'
-        )
-        
-        return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long)
-        }
-
-
 def compute_metrics(pred):
     """평가 지표 계산"""
     labels = pred.label_ids
@@ -84,6 +80,91 @@ def compute_metrics(pred):
     }
 
 
+class BatchingTrainer(Trainer):
+    """
+    학습 배치 구성(길이 그룹 / 패킹)을 바꾼 Trainer
+
+    검증은 기존처럼 예제 단위 동적 패딩(data_collator)으로 하고,
+    학습 배치만 train_batch_sampler / train_collator로 만든다.
+    """
+
+    def __init__(self, *args, train_batch_sampler=None, train_collator=None,
+                 throughput=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.train_batch_sampler = train_batch_sampler
+        self.train_collator = train_collator
+        self.throughput = throughput
+
+    def get_train_dataloader(self):
+        if self.train_batch_sampler is None and self.train_collator is None:
+            return super().get_train_dataloader()
+
+        from torch.utils.data import DataLoader
+
+        collate_fn = self.train_collator or self.data_collator
+        if self.train_batch_sampler is not None:
+            loader = DataLoader(self.train_dataset, batch_sampler=self.train_batch_sampler,
+                                collate_fn=collate_fn)
+        else:
+            loader = DataLoader(self.train_dataset, batch_size=self._train_batch_size,
+                                shuffle=True, collate_fn=collate_fn)
+        return self.accelerator.prepare(loader)
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        if model.training and self.throughput is not None:
+            self.throughput.observe(inputs)
+
+        if "cls_positions" not in inputs:
+            return super().compute_loss(model, inputs, return_outputs=return_outputs, **kwargs)
+
+        # 인코더를 직접 호출하므로 bf16 autocast를 명시적으로 적용
+        with self.accelerator.autocast():
+            logits = packed_logits(model, inputs)
+        loss = torch.nn.functional.cross_entropy(logits, inputs["labels"])
+        return (loss, {"logits": logits}) if return_outputs else loss
+
+
+class ThroughputCallback(TrainerCallback):
+    """학습 스텝 시간 기록 (검증/저장 시간 제외)"""
+
+    def __init__(self, throughput: TokenThroughput):
+        self.throughput = throughput
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self.throughput.step_begin()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        self.throughput.step_end()
+
+
+def compare_training_options(seconds_per_step, peak_memory_mb, f1, baseline):
+    """
+    기본 학습(fp32, checkpointing 없음) 대비 스텝 시간/최대 메모리/F1 비교 출력
+
+    Returns:
+        비교 결과 딕셔너리 (기준 결과가 없으면 None)
+    """
+    print("  기본 학습(fp32) 대비:")
+    if baseline is None:
+        print("  └─ 비교할 기본 학습 결과 없음 (같은 설정으로 옵션 없이 먼저 실행하세요)")
+        print()
+        return None
+    
+    report = {
+        "baseline": baseline["path"],
+        "step_time_ratio": seconds_per_step / baseline["seconds_per_step"],
+        "peak_memory_ratio": peak_memory_mb / baseline["peak_memory_mb"],
+        "f1_delta": f1 - baseline["eval_result"]["f1"],
+    }
+    print(f"  ├─ 스텝 시간: {seconds_per_step*1000:.0f}ms "
+          f"(기본 {baseline['seconds_per_step']*1000:.0f}ms, {report['step_time_ratio']:.2f}배)")
+    print(f"  ├─ 최대 메모리: {peak_memory_mb:,.0f}MB "
+          f"(기본 {baseline['peak_memory_mb']:,.0f}MB, {report['peak_memory_ratio']:.2f}배)")
+    print(f"  └─ F1: {f1:.4f} (기본 {baseline['eval_result']['f1']:.4f}, {report['f1_delta']:+.4f})")
+    print()
+    return report
+
+
 def print_header(title):
     """헤더 출력"""
     print("\n" + "=" * 70)
@@ -91,8 +172,415 @@ def print_header(title):
     print("=" * 70 + "\n")
 
 
+def parse_args():
+    """명령행 인자"""
+    parser = argparse.ArgumentParser(description="KcBERT 이슈 케이스 Fine-tuning")
+    parser.add_argument(
+        '--data',
+        type=str,
+        default="data/training/issue_cases_training.csv",
+        help='학습 데이터 CSV (text, label 컬럼)'
+    )
+    parser.add_argument(
+        '--model-name',
+        type=str,
+        default="beomi/kcbert-base",
+        help='시작 모델'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=DEFAULT_OUTPUT_DIR,
+        help=f'모델 저장 디렉토리 (--lora 기본값: {DEFAULT_ADAPTER_DIR}, '
+             f'--fast-train 기본값: {DEFAULT_FAST_TRAIN_DIR})'
+    )
+    parser.add_argument(
+        '--epochs',
+        type=int,
+        default=10,
+        help='학습 에폭 (소량 데이터이므로 많은 에폭)'
+    )
+    parser.add_argument(
+        '--early-exit',
+        action='store_true',
+        help='fine-tuning 후 중간 레이어 조기 종료 분류기 학습 (output-dir/exits.pt)'
+    )
+    parser.add_argument(
+        '--exits-only',
+        action='store_true',
+        help='fine-tuning 없이 output-dir의 모델로 조기 종료 분류기만 학습'
+    )
+    parser.add_argument(
+        '--exit-layers',
+        type=str,
+        default="2,4,6,8,10",
+        help='조기 종료 분류기를 붙일 레이어 (쉼표 구분, 1부터)'
+    )
+    parser.add_argument(
+        '--dataset-cache-dir',
+        type=str,
+        default="./models/cache/datasets",
+        help='토큰화 데이터셋 캐시 디렉토리 (CSV와 토크나이저가 같으면 재사용)'
+    )
+    parser.add_argument(
+        '--group-by-length',
+        action='store_true',
+        help='비슷한 길이의 예제끼리 학습 배치 구성 (패딩 감소)'
+    )
+    parser.add_argument(
+        '--packing',
+        action='store_true',
+        help='짧은 예제 여러 개를 300토큰 시퀀스에 패킹 (예제끼리는 attention 분리, --nproc 1 전용)'
+    )
+    parser.add_argument(
+        '--lora',
+        action='store_true',
+        help='기본 모델은 고정하고 LoRA 어댑터만 학습/저장 (peft 필요, requirements_lora.txt)'
+    )
+    parser.add_argument(
+        '--lora-r',
+        type=int,
+        default=8,
+        help='LoRA 랭크'
+    )
+    parser.add_argument(
+        '--lora-alpha',
+        type=int,
+        default=16,
+        help='LoRA alpha (스케일 = alpha / r)'
+    )
+    parser.add_argument(
+        '--nproc',
+        type=int,
+        default=1,
+        help='로컬 프로세스 수 (2 이상이면 gloo 백엔드 DDP, 프로세스당 배치 4)'
+    )
+    parser.add_argument(
+        '--threads-per-proc',
+        type=int,
+        default=None,
+        help='--nproc 프로세스당 스레드 수 (기본: 코어 수 / nproc)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=4,
+        help='학습 배치 크기 (--nproc이면 프로세스당)'
+    )
+    parser.add_argument(
+        '--bf16',
+        action='store_true',
+        help='bf16 autocast 학습 (CPU가 지원할 때만, 미지원이면 fp32로 진행)'
+    )
+    parser.add_argument(
+        '--gradient-checkpointing',
+        action='store_true',
+        help='레이어 activation을 저장하지 않고 역전파 때 다시 계산 (메모리 감소, 스텝 시간 증가)'
+    )
+    parser.add_argument(
+        '--export-bundle',
+        type=str,
+        nargs='?',
+        const="models/bundles/kcbert-issue-cases",
+        default=None,
+        help='학습 후 가장 좋은 체크포인트로 서빙 번들 생성 (기본 위치: models/bundles/kcbert-issue-cases)'
+    )
+    parser.add_argument(
+        '--bundle-format',
+        type=str,
+        choices=("fp32", "int8", "onnx"),
+        default="int8",
+        help='--export-bundle 모델 형식'
+    )
+    parser.add_argument(
+        '--fast-train',
+        action='store_true',
+        help='인코더를 고정하고 캐시한 pooled 임베딩으로 분류 헤드만 학습 (수 초)'
+    )
+    parser.add_argument(
+        '--head-epochs',
+        type=int,
+        default=200,
+        help='--fast-train 헤드 학습 에폭'
+    )
+    parser.add_argument(
+        '--head-name',
+        type=str,
+        default=None,
+        help='--fast-train 결과를 멀티 헤드 파일(heads.pt)에 이 이름으로 저장 (예: threat, insult)'
+    )
+    parser.add_argument(
+        '--heads-path',
+        type=str,
+        default=None,
+        help='--head-name 저장 경로 (기본: 모델 디렉토리 또는 ./models/kcbert의 heads.pt)'
+    )
+    parser.add_argument(
+        '--embedding-cache-dir',
+        type=str,
+        default="./models/cache/embeddings",
+        help='pooled 임베딩 캐시 디렉토리 (텍스트가 같으면 다음 실행에서 재사용)'
+    )
+    return parser.parse_args()
+
+
+def train_early_exit(model, tokenizer, train_texts, train_labels, val_texts, val_labels,
+                     exit_layers, output_dir):
+    """
+    조기 종료 분류기 학습 및 저장 (인코더는 고정)
+    
+    레이어별 [CLS] 표현을 한 번만 계산해 두고 분류기만 학습하므로 CPU에서도 금방 끝난다.
+    
+    Returns:
+        엔트로피 기준별 검증 정확도/평균 종료 레이어 리스트
+    """
+    from src.early_exit import (
+        collect_exit_states, train_exits, evaluate_exits, save_exits, EXITS_FILENAME
+    )
+    
+    device = next(model.parameters()).device
+    num_layers = model.config.num_hidden_layers
+    invalid = [layer for layer in exit_layers if not 1 <= layer < num_layers]
+    if invalid:
+        raise ValueError(f"조기 종료 레이어는 1 ~ {num_layers - 1} 사이여야 합니다: {invalid}")
+    
+    print(f"  종료 분류기 레이어: {exit_layers} (전체 {num_layers}층)")
+    print("  ⏳ 레이어별 [CLS] 표현 계산 중...")
+    train_states, _ = collect_exit_states(
+        model, tokenizer, list(train_texts), exit_layers, device=device
+    )
+    val_states, val_final_logits = collect_exit_states(
+        model, tokenizer, list(val_texts), exit_layers, device=device
+    )
+    
+    exits = train_exits(train_states, train_labels)
+    exits_path = os.path.join(output_dir, EXITS_FILENAME)
+    save_exits(exits_path, exits, model.config.hidden_size)
+    print(f"✅ 종료 분류기 저장: {exits_path}")
+    print()
+    
+    report = evaluate_exits(exits, val_states, val_final_logits, val_labels, num_layers)
+    final_accuracy = (val_final_logits.argmax(-1).numpy() == np.asarray(val_labels)).mean()
+    
+    print("  검증 데이터 (엔트로피 기준별):")
+    print(f"  {'기준':>6} | {'정확도':>6} | {'평균 레이어':>10} | {'인코더 비용':>10}")
+    print(f"  {'전체':>6} | {final_accuracy:>6.3f} | {num_layers:>10.2f} | {1.0:>10.0%}")
+    for row in report:
+        print(f"  {row['threshold']:>6.2f} | {row['accuracy']:>6.3f} | "
+              f"{row['avg_exit_layer']:>10.2f} | {row['layer_ratio']:>10.0%}")
+    print()
+    print("  💡 정확도가 유지되는 가장 큰 기준을 config.yaml의 detection.exit_entropy로 사용")
+    print()
+    
+    return report
+
+
+def train_head(embeddings, labels, epochs, learning_rate=1e-3, batch_size=16, seed=42):
+    """
+    캐시한 pooled 임베딩으로 분류 헤드(Linear(hidden, 2))만 학습
+    
+    Returns:
+        학습한 torch.nn.Linear
+    """
+    torch.manual_seed(seed)
+    features = torch.from_numpy(np.asarray(embeddings, dtype=np.float32))
+    targets = torch.as_tensor(np.asarray(labels), dtype=torch.long)
+    
+    head = torch.nn.Linear(features.size(1), 2)
+    optimizer = torch.optim.AdamW(head.parameters(), lr=learning_rate, weight_decay=0.01)
+    for _ in range(epochs):
+        order = torch.randperm(len(targets))
+        for i in range(0, len(order), batch_size):
+            batch = order[i:i + batch_size]
+            loss = torch.nn.functional.cross_entropy(head(features[batch]), targets[batch])
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    head.eval()
+    return head
+
+
+def check_fast_train_output(output_dir, model_name):
+    """
+    --fast-train 저장 가능 여부 (불가하면 오류 메시지)
+
+    비어 있거나, 같은 인코더로 --fast-train한 디렉토리만 덮어쓴다.
+    (전체 fine-tuning 모델을 고정 인코더 모델로 덮어쓰지 않도록)
+    """
+    if not os.path.exists(os.path.join(output_dir, "config.json")):
+        return None
+    # 고정 인코더를 읽어 온 디렉토리에 저장하면 인코더는 그대로이고 분류 헤드만 바뀜
+    if os.path.isdir(model_name) and os.path.samefile(output_dir, model_name):
+        return None
+
+    marker_path = os.path.join(output_dir, FAST_TRAIN_MARKER)
+    encoder = None
+    if os.path.exists(marker_path):
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            encoder = json.load(f).get("encoder")
+
+    if encoder == model_name:
+        return None
+    if encoder is None:
+        return f"{output_dir}에 --fast-train으로 만들지 않은 모델이 있습니다"
+    return f"{output_dir}는 다른 인코더({encoder})로 학습한 모델입니다"
+
+
+def fast_train(args, train_texts, val_texts, train_labels, val_labels):
+    """
+    인코더를 고정하고 분류 헤드만 학습 (--fast-train)
+    
+    pooled 임베딩은 디스크 캐시(memmap)에서 재사용하므로 텍스트가 바뀌지 않았으면
+    인코더를 전혀 실행하지 않고, 케이스를 추가했으면 새 텍스트만 계산한다.
+    """
+    import time
+    from src.embedding_cache import EmbeddingCache, model_fingerprint, pooled_encoder
+    
+    save_to_model = not (args.head_name and args.head_name != "abuse")
+    if save_to_model:
+        error = check_fast_train_output(args.output_dir, args.model_name)
+        if error:
+            print(f"❌ {error}")
+            print("   다른 --output-dir를 지정하거나 기존 디렉토리를 옮기세요.")
+            return
+    
+    print(f"  모델 (고정): {args.model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        args.model_name,
+        num_labels=2,
+        problem_type="single_label_classification",
+        ignore_mismatched_sizes=True
+    )
+    model.eval()
+    hidden_size = model.config.hidden_size
+    
+    # 1. pooled 임베딩 (캐시에 없는 텍스트만 계산)
+    cache = EmbeddingCache(
+        args.embedding_cache_dir, model_fingerprint(args.model_name, max_length=300), hidden_size
+    )
+    texts = [str(text) for text in list(train_texts) + list(val_texts)]
+    missing = len(cache.missing(texts))
+    print(f"  임베딩 캐시: {cache.directory} ({len(texts) - missing}개 재사용, {missing}개 계산)")
+    
+    embed_start = time.time()
+    embeddings = cache.get_or_compute(texts, pooled_encoder(model, tokenizer, max_length=300))
+    embed_time = time.time() - embed_start
+    train_embeddings, val_embeddings = embeddings[:len(train_texts)], embeddings[len(train_texts):]
+    print(f"✅ 임베딩 준비 완료: {embed_time:.2f}초")
+    print()
+    
+    # 2. 헤드 학습
+    train_start = time.time()
+    head = train_head(train_embeddings, train_labels, args.head_epochs)
+    train_time = time.time() - train_start
+    print(f"✅ 헤드 학습 완료: {args.head_epochs} 에폭, {train_time:.2f}초")
+    print()
+    
+    # 3. 평가
+    with torch.no_grad():
+        val_logits = head(torch.from_numpy(np.asarray(val_embeddings, dtype=np.float32)))
+    preds = val_logits.argmax(-1).numpy()
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        val_labels, preds, average='binary', zero_division=0
+    )
+    eval_result = {
+        "accuracy": float(accuracy_score(val_labels, preds)),
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1": float(f1)
+    }
+    print("  검증 데이터 평가 결과:")
+    print(f"  ├─ Accuracy:  {eval_result['accuracy']:.4f}")
+    print(f"  ├─ Precision: {eval_result['precision']:.4f}")
+    print(f"  ├─ Recall:    {eval_result['recall']:.4f}")
+    print(f"  └─ F1 Score:  {eval_result['f1']:.4f}")
+    print()
+    
+    # 4. 저장 (욕설/폭언 헤드는 모델 classifier로, 그 외는 heads.pt에 추가)
+    if not save_to_model:
+        from src.multi_head import save_heads, default_heads_path
+        
+        saved_to = args.heads_path or default_heads_path(args.model_name, "./models/kcbert")
+        save_heads(saved_to, {args.head_name: head}, hidden_size)
+        print(f"✅ '{args.head_name}' 헤드 저장: {saved_to}")
+    else:
+        model.classifier.load_state_dict(head.state_dict())
+        model.save_pretrained(args.output_dir)
+        tokenizer.save_pretrained(args.output_dir)
+        with open(os.path.join(args.output_dir, FAST_TRAIN_MARKER), 'w', encoding='utf-8') as f:
+            json.dump({"encoder": args.model_name, "timestamp": datetime.now().isoformat()},
+                      f, ensure_ascii=False, indent=2)
+        saved_to = args.output_dir
+        print(f"✅ 모델 저장 완료: {saved_to} (인코더는 {args.model_name}와 동일)")
+    print()
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    result_file = f"data/results/fast_train_result_{timestamp}.json"
+    result = {
+        "timestamp": timestamp,
+        "mode": "fast_train",
+        "model": args.model_name,
+        "head_name": args.head_name or "abuse",
+        "saved_to": saved_to,
+        "training_data_size": len(train_texts),
+        "validation_data_size": len(val_texts),
+        "head_epochs": args.head_epochs,
+        "embedding_cache": {
+            "directory": cache.directory,
+            "reused": len(texts) - missing,
+            "computed": missing,
+            "seconds": embed_time
+        },
+        "train_seconds": train_time,
+        "eval_result": eval_result
+    }
+    os.makedirs("data/results", exist_ok=True)
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"✅ 학습 기록 저장: {result_file}")
+    print()
+
+
+def warm_dataset_cache(args):
+    """
+    분산 학습 전에 토큰화 캐시 생성
+
+    프로세스마다 같은 캐시를 동시에 만들지 않도록 부모 프로세스에서 한 번 토큰화한다.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    tokenized = load_tokenized_csv(
+        args.data, tokenizer, max_length=300, cache_dir=args.dataset_cache_dir
+    )
+    print(f"✅ 토큰화 캐시: {tokenized.directory}")
+
+
 def main():
     """메인 함수"""
+    args = parse_args()
+    
+    if args.packing and args.nproc > 1 and not (args.exits_only or args.fast_train):
+        # 패킹 배치는 인코더/분류기를 직접 호출하므로 DDP forward(그래디언트 동기화)를 거치지 않음
+        print("❌ --packing은 --nproc 1에서만 사용할 수 있습니다 (DDP는 --group-by-length를 사용하세요)")
+        return
+
+    if args.nproc > 1 and not (args.exits_only or args.fast_train):
+        if not os.path.exists(args.data):
+            print(f"❌ 데이터 파일이 없습니다: {args.data}")
+            return
+        warm_dataset_cache(args)
+        launch(run, args.nproc, args, threads=args.threads_per_proc)
+    else:
+        if args.nproc > 1:
+            print("⚠️  --exits-only/--fast-train은 단일 프로세스로 실행합니다")
+            args.nproc = 1
+        run(args)
+
+
+def run(args):
+    """학습 실행 (--nproc이면 프로세스마다 실행)"""
+    exit_layers = [int(layer) for layer in args.exit_layers.split(",") if layer.strip()]
+    
     print_header("🔧 이슈 케이스 Fine-tuning")
     
     print("📝 작업 개요")
@@ -106,7 +594,7 @@ def main():
     # 1. 데이터 로드
     print_header("1️⃣ 데이터 로드")
     
-    data_path = "data/training/issue_cases_training.csv"
+    data_path = args.data
     if not os.path.exists(data_path):
         print(f"❌ 데이터 파일이 없습니다: {data_path}")
         return
@@ -123,23 +611,48 @@ def main():
     # 2. 데이터 분할
     print_header("2️⃣ 데이터 분할")
     
-    # 데이터가 적으므로 80:20 분할
-    train_texts, val_texts, train_labels, val_labels = train_test_split(
-        df['text'].values,
-        df['label'].values,
+    # 데이터가 적으므로 80:20 분할 (토큰화 캐시에서 같은 예제를 고르도록 번호로 분할)
+    train_idx, val_idx = train_test_split(
+        np.arange(len(df)),
         test_size=0.2,
         random_state=42,
         stratify=df['label'].values
     )
+    train_texts, val_texts = df['text'].values[train_idx], df['text'].values[val_idx]
+    train_labels, val_labels = df['label'].values[train_idx], df['label'].values[val_idx]
     
     print(f"  ├─ 학습 데이터: {len(train_texts)}개")
     print(f"  └─ 검증 데이터: {len(val_texts)}개")
     print()
     
+    # 저장된 모델에 조기 종료 분류기만 추가
+    if args.exits_only:
+        print_header("🚪 조기 종료 분류기 학습")
+        
+        if not os.path.isdir(args.output_dir):
+            print(f"❌ 모델 디렉토리가 없습니다: {args.output_dir}")
+            return
+        
+        tokenizer = AutoTokenizer.from_pretrained(args.output_dir)
+        model = AutoModelForSequenceClassification.from_pretrained(args.output_dir)
+        train_early_exit(model, tokenizer, train_texts, train_labels, val_texts, val_labels,
+                         exit_layers, args.output_dir)
+        return
+    
+    # 인코더 고정, 분류 헤드만 학습
+    if args.fast_train:
+        if args.output_dir == DEFAULT_OUTPUT_DIR:
+            args.output_dir = DEFAULT_FAST_TRAIN_DIR
+        print_header("⚡ 분류 헤드 빠른 학습")
+        fast_train(args, train_texts, val_texts, train_labels, val_labels)
+        return
+    
     # 3. 토크나이저 및 모델 로드
     print_header("3️⃣ 모델 로드")
     
-    model_name = "beomi/kcbert-base"
+    model_name = args.model_name
+    if args.lora and args.output_dir == DEFAULT_OUTPUT_DIR:
+        args.output_dir = DEFAULT_ADAPTER_DIR
     print(f"  모델: {model_name}")
     print()
     
@@ -152,27 +665,70 @@ def main():
     )
     
     print("✅ 모델 로드 완료")
+    
+    lora_info = None
+    if args.lora:
+        from src.adapters import apply_lora
+        
+        model = apply_lora(model, r=args.lora_r, alpha=args.lora_alpha)
+        trainable = sum(p.numel() for p in model.parameters() if p.requires_grad)
+        total = sum(p.numel() for p in model.parameters())
+        lora_info = {"r": args.lora_r, "alpha": args.lora_alpha, "trainable_params": trainable}
+        print(f"✅ LoRA 어댑터: 학습 파라미터 {trainable:,}개 / 전체 {total:,}개 "
+              f"({trainable / total * 100:.2f}%)")
     print()
     
     # 4. 데이터셋 생성
     print_header("4️⃣ 데이터셋 생성")
     
-    train_dataset = AbusiveDataset(train_texts, train_labels, tokenizer)
-    val_dataset = AbusiveDataset(val_texts, val_labels, tokenizer)
+    # CSV 전체를 한 번만 토큰화해 캐시 (다음 실행은 토큰화 없이 memmap 로드)
+    tokenized = load_tokenized_csv(
+        data_path, tokenizer, max_length=300, cache_dir=args.dataset_cache_dir
+    )
+    train_dataset = tokenized.subset(train_idx)
+    val_dataset = tokenized.subset(val_idx)
+    data_collator = DynamicPaddingCollator(tokenizer.pad_token_id)
     
-    print(f"✅ 학습 데이터셋: {len(train_dataset)}개")
+    print(f"✅ 토큰화 캐시: {tokenized.directory}")
+    print(f"✅ 학습 데이터셋: {len(train_dataset)}개 (평균 {train_dataset.lengths.mean():.0f}토큰)")
     print(f"✅ 검증 데이터셋: {len(val_dataset)}개")
+    print("   배치마다 가장 긴 예제 길이로 패딩 (고정 300토큰 패딩 없음)")
+    
+    # 학습 배치 구성 (검증 배치는 그대로)
+    batch_size = args.batch_size
+    train_batch_sampler = None
+    train_collator = None
+    if args.packing:
+        train_dataset = PackedDataset(train_dataset, max_length=300)
+        train_collator = PackedCollator(tokenizer.pad_token_id)
+        print(f"✅ 패킹: {len(train_dataset)}개 시퀀스 "
+              f"(시퀀스당 평균 {train_dataset.examples_per_sequence:.1f}개 예제)")
+    elif args.group_by_length:
+        train_batch_sampler = LengthGroupedBatchSampler(train_dataset.lengths, batch_size)
+        print("✅ 길이 그룹 배치: 비슷한 길이의 예제끼리 배치 구성")
+    throughput = TokenThroughput(max_length=300)
     print()
     
     # 5. 학습 설정
     print_header("5️⃣ 학습 설정")
     
-    output_dir = "models/kcbert-finetuned-issue-cases"
+    output_dir = args.output_dir
+    
+    use_bf16 = False
+    if args.bf16:
+        bf16 = cpu_bf16_support() if not torch.cuda.is_available() else {"supported": True, "native": True}
+        if not bf16["supported"]:
+            print("⚠️  이 CPU는 bf16을 지원하지 않아 fp32로 학습합니다")
+        else:
+            use_bf16 = True
+            if not bf16["native"]:
+                print("⚠️  bf16 전용 명령어(AVX512_BF16/AMX)가 없어 fp32보다 느릴 수 있습니다")
+    precision = "bf16" if use_bf16 else "fp32"
     
     training_args = TrainingArguments(
         output_dir=output_dir,
-        num_train_epochs=10,  # 소량 데이터이므로 많은 에폭
-        per_device_train_batch_size=4,
+        num_train_epochs=args.epochs,
+        per_device_train_batch_size=batch_size,
         per_device_eval_batch_size=4,
         warmup_steps=50,
         weight_decay=0.01,
@@ -184,24 +740,36 @@ def main():
         metric_for_best_model="f1",
         greater_is_better=True,
         save_total_limit=2,
-        report_to="none"
+        report_to="none",
+        ddp_backend="gloo" if args.nproc > 1 else None,
+        bf16=use_bf16,
+        gradient_checkpointing=args.gradient_checkpointing,
+        # 비재진입 방식은 입력에 requires_grad가 없어도 동작 (LoRA처럼 임베딩이 고정된 경우)
+        gradient_checkpointing_kwargs={"use_reentrant": False} if args.gradient_checkpointing else None
     )
     
     print("  학습 설정:")
     print(f"  ├─ 에폭: {training_args.num_train_epochs}")
-    print(f"  ├─ 배치 크기: {training_args.per_device_train_batch_size}")
+    print(f"  ├─ 배치 크기: {training_args.per_device_train_batch_size}"
+          + (f" × 프로세스 {args.nproc}개" if args.nproc > 1 else ""))
     print(f"  ├─ Learning Rate: {training_args.learning_rate}")
+    print(f"  ├─ 정밀도: {precision}"
+          + (" + gradient checkpointing" if args.gradient_checkpointing else ""))
     print(f"  └─ 출력 디렉토리: {output_dir}")
     print()
     
     # 6. Trainer 생성
-    trainer = Trainer(
+    trainer = BatchingTrainer(
         model=model,
         args=training_args,
         train_dataset=train_dataset,
         eval_dataset=val_dataset,
+        data_collator=data_collator,
         compute_metrics=compute_metrics,
-        callbacks=[EarlyStoppingCallback(early_stopping_patience=3)]
+        callbacks=[EarlyStoppingCallback(early_stopping_patience=3), ThroughputCallback(throughput)],
+        train_batch_sampler=train_batch_sampler,
+        train_collator=train_collator,
+        throughput=throughput
     )
     
     # 7. Fine-tuning 시작
@@ -216,13 +784,61 @@ def main():
     print("✅ Fine-tuning 완료!")
     print()
     
+    token_stats = all_reduce_throughput(throughput).summary()
+    samples_per_sec = token_stats["examples"] / max(token_stats["train_step_seconds"], 1e-9)
+    print("  학습 토큰 처리량" + (f" (프로세스 {args.nproc}개 합계):" if args.nproc > 1 else ":"))
+    print(f"  ├─ 실제 토큰/초:      {token_stats['effective_tokens_per_sec']:,.0f}")
+    print(f"  ├─ 패딩 포함 토큰/초: {token_stats['padded_tokens_per_sec']:,.0f}")
+    print(f"  ├─ 패딩 비율:         {token_stats['padding_ratio']*100:.1f}%")
+    print(f"  └─ 고정 300토큰 대비 연산: {token_stats['compute_ratio_vs_fixed']*100:.1f}%")
+    print()
+    
+    peak_memory_mb = get_peak_rss_mb()
+    print(f"  스텝 시간: {token_stats['seconds_per_step']*1000:.0f}ms, 최대 메모리(RSS): {peak_memory_mb:,.0f}MB")
+    print()
+    
+    # 단일 프로세스 결과와 비교한 확장 효율 (같은 모델/배치 구성의 최근 --nproc 1 결과)
+    batching = "packing" if args.packing else ("group_by_length" if args.group_by_length else "random")
+    run_config = {
+        "model": model_name,
+        "batching": batching,
+        "batch_size": training_args.per_device_train_batch_size,
+    }
+    distributed_info = {
+        "nproc": args.nproc,
+        "threads_per_process": torch.get_num_threads(),
+        "train_samples_per_sec": samples_per_sec,
+    }
+    if args.nproc > 1:
+        baseline = find_baseline("data/results", {
+            **run_config, "precision": precision, "gradient_checkpointing": args.gradient_checkpointing
+        })
+        distributed_info.update(scaling_report(args.nproc, samples_per_sec, baseline))
+        
+        print("  확장 효율:")
+        print(f"  ├─ 처리량: {samples_per_sec:.1f} 예제/초 (프로세스 {args.nproc}개)")
+        if baseline is None:
+            print("  └─ 비교할 단일 프로세스 결과 없음 (같은 설정으로 --nproc 1을 먼저 실행하세요)")
+        else:
+            print(f"  ├─ 단일 프로세스: {distributed_info['baseline_samples_per_sec']:.1f} 예제/초")
+            print(f"  ├─ 속도 향상: {distributed_info['speedup']:.2f}배")
+            print(f"  └─ 확장 효율: {distributed_info['scaling_efficiency']*100:.1f}%")
+        print()
+    
     # 8. 모델 저장
     print_header("7️⃣ 모델 저장")
     
     trainer.save_model(output_dir)
-    tokenizer.save_pretrained(output_dir)
+    if is_main_process():
+        tokenizer.save_pretrained(output_dir)
     
     print(f"✅ 모델 저장 완료: {output_dir}")
+    if lora_info is not None and is_main_process():
+        from src.adapters import adapter_size
+        
+        lora_info["adapter_bytes"] = adapter_size(output_dir)
+        print(f"   어댑터 크기: {lora_info['adapter_bytes'] / 1024 / 1024:.1f}MB "
+              f"(기본 모델 {model_name}는 저장하지 않음)")
     print()
     
     # 9. 평가
@@ -237,6 +853,39 @@ def main():
     print(f"  └─ F1 Score:  {eval_result['eval_f1']:.4f}")
     print()
     
+    # 분산 학습이면 이후 단계(조기 종료 학습, 기록 저장)는 rank 0만
+    if not is_main_process():
+        return
+    
+    # bf16 / gradient checkpointing이면 같은 설정의 fp32 기본 학습과 비교
+    options_report = None
+    if use_bf16 or args.gradient_checkpointing:
+        baseline = find_baseline("data/results", {
+            **run_config, "precision": "fp32", "gradient_checkpointing": False
+        })
+        options_report = compare_training_options(
+            token_stats["seconds_per_step"], peak_memory_mb, eval_result['eval_f1'], baseline
+        )
+    
+    early_exit_report = None
+    if args.early_exit and args.lora:
+        print("⚠️  --lora에서는 조기 종료 분류기를 학습하지 않습니다 (어댑터별 인코더가 다름)")
+    elif args.early_exit:
+        print_header("🚪 조기 종료 분류기 학습")
+        early_exit_report = train_early_exit(
+            trainer.model, tokenizer, train_texts, train_labels, val_texts, val_labels,
+            exit_layers, output_dir
+        )
+    
+    bundle_manifest = None
+    if args.export_bundle and args.lora:
+        print("⚠️  --lora 결과는 어댑터만 있으므로 서빙 번들을 만들지 않습니다 (docs/guides/lora_adapters.md)")
+    elif args.export_bundle:
+        print_header("📦 서빙 번들 생성")
+        from src.serving_bundle import export_bundle
+        
+        bundle_manifest = export_bundle(output_dir, args.export_bundle, bundle_format=args.bundle_format)
+    
     # 10. 학습 기록 저장
     print_header("9️⃣ 학습 기록 저장")
     
@@ -251,6 +900,13 @@ def main():
         "validation_data_size": len(val_texts),
         "epochs": training_args.num_train_epochs,
         "batch_size": training_args.per_device_train_batch_size,
+        "batching": batching,
+        "precision": precision,
+        "gradient_checkpointing": args.gradient_checkpointing,
+        "seconds_per_step": token_stats["seconds_per_step"],
+        "peak_memory_mb": peak_memory_mb,
+        "token_throughput": token_stats,
+        "distributed": distributed_info,
         "train_result": {
             "train_loss": float(train_result.training_loss),
             "train_runtime": train_result.metrics['train_runtime'],
@@ -264,6 +920,18 @@ def main():
             "loss": float(eval_result['eval_loss'])
         }
     }
+    if options_report is not None:
+        result["baseline_comparison"] = options_report
+    if bundle_manifest is not None:
+        result["serving_bundle"] = {
+            "path": args.export_bundle,
+            "format": bundle_manifest["format"],
+            "benchmark": bundle_manifest["benchmark"],
+        }
+    if lora_info is not None:
+        result["lora"] = lora_info
+    if early_exit_report is not None:
+        result["early_exit"] = {"layers": exit_layers, "validation": early_exit_report}
     
     os.makedirs("data/results", exist_ok=True)
     with open(result_file, 'w', encoding='utf-8') as f:
@@ -278,7 +946,9 @@ def main():
     print("  📊 최종 결과:")
     print(f"  ├─ 정확도: {eval_result['eval_accuracy']*100:.1f}%")
     print(f"  ├─ F1 Score: {eval_result['eval_f1']:.4f}")
-    print(f"  └─ 모델 위치: {output_dir}")
+    print(f"  {'├' if bundle_manifest else '└'}─ 모델 위치: {output_dir}")
+    if bundle_manifest is not None:
+        print(f"  └─ 서빙 번들: {args.export_bundle} ({bundle_manifest['format']})")
     print()
     
     print("  🎯 다음 단계:")
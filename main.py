@@ -24,9 +24,10 @@ import logging
 logging.getLogger('transformers').setLevel(logging.ERROR)
 logging.getLogger('transformers.modeling_utils').setLevel(logging.ERROR)
 
-# ⚡ Lazy import: 필요한 시점에만 로드 (프로그램 시작 속도 2분 → 즉시)
-# from src.detector import AbusiveDetector  # 주석 처리
+# src 패키지는 torch/transformers를 모델 생성 시점에만 로드하므로 --help/인자 검증은 즉시 끝남
+from src.detector import AbusiveDetector
 from src.utils import load_config, save_result, format_result_text, create_output_filename
+from src.profiling import add_profile_argument
 
 
 def main():
@@ -65,6 +66,17 @@ def main():
         action='store_true',
         help='결과 저장 안함'
     )
+    parser.add_argument(
+        '--rule-first',
+        action='store_true',
+        help='규칙만으로 판정이 확정되면 모델 추론 생략 (config.yaml의 detection.rule_first)'
+    )
+    parser.add_argument(
+        '--early-exit',
+        action='store_true',
+        help='중간 레이어에서 확신이 충분하면 남은 레이어 생략 (config.yaml의 detection.early_exit)'
+    )
+    add_profile_argument(parser)
     
     args = parser.parse_args()
     
@@ -95,6 +107,8 @@ def main():
     
     # 임계값 설정 (명령행 인자가 우선)
     threshold = args.threshold if args.threshold is not None else config['detection']['threshold']
+    rule_first = args.rule_first or config['detection'].get('rule_first', False)
+    early_exit = args.early_exit or config['detection'].get('early_exit', False)
     
     print("\n" + "🚀 " * 20)
     print("    KcBERT 욕설/폭언 감지 시스템")
@@ -104,16 +118,16 @@ def main():
     print(f"🎚️  감지 임계값: {threshold}")
     print(f"🤖 모델: {config['model']['name']}")
     
-    # ⚡ Lazy import: 실제 필요한 시점에 로드
+    # 감지 엔진 초기화 (torch/transformers 로드)
     print("\n📥 모델 모듈 로딩 중... (최초 1회, 약 40초 소요)")
-    from src.detector import AbusiveDetector
-    
-    # 감지 엔진 초기화
     detector = AbusiveDetector(
         model_name=config['model']['name'],
         cache_dir=config['model']['cache_dir'],
         threshold=threshold,
-        max_length=config['model']['max_length']
+        max_length=config['model']['max_length'],
+        rule_first=rule_first,
+        early_exit=early_exit,
+        exit_entropy=config['detection'].get('exit_entropy', 0.2)
     )
     
     # 예측 실행
@@ -123,6 +137,17 @@ def main():
     
     result = detector.predict_file(args.input)
     
+    # 프로파일링 (첫 호출은 워밍업으로 위에서 끝남)
+    if args.profile:
+        from src.profiling import profile_calls
+        profile_calls(
+            lambda i: detector.predict_file(args.input),
+            n_calls=args.profile,
+            detector=detector,
+            name="main",
+            output_dir=args.profile_dir
+        )
+    
     # 결과 출력
     print("\n" + format_result_text(result))
     
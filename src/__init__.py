@@ -1,16 +1,39 @@
 """
 KcBERT 기반 욕설/폭언 감지 시스템
+
+패키지 import 시에는 아무것도 로드하지 않고, 속성에 처음 접근할 때 해당 모듈을 로드한다.
+torch/transformers는 모델을 실제로 로드하는 시점(ModelLoader)에만 import된다.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "KcBERT Team"
 
-from .detector import AbusiveDetector
-from .preprocessor import TextPreprocessor
-from .model_loader import ModelLoader
+# 공개 이름 → 정의된 모듈
+_LAZY_EXPORTS = {
+    "AbusiveDetector": ".detector",
+    "ImprovedAbusiveDetector": ".detector_improved",
+    "MultiCategoryDetector": ".detector_multi",
+    "SLLMAbusiveDetector": ".detector_sllm",
+    "CascadeDetector": ".detector_cascade",
+    "LoraDetector": ".detector_lora",
+    "TextPreprocessor": ".preprocessor",
+    "ModelLoader": ".model_loader",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # 다음 접근부터는 일반 속성으로 조회
+    return value
+
 
-__all__ = [
-    "AbusiveDetector",
-    "TextPreprocessor", 
-    "ModelLoader",
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
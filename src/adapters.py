@@ -0,0 +1,134 @@
+"""
+LoRA 어댑터 모듈
+기본 KcBERT 가중치는 고정하고 attention의 query/value에 저랭크 행렬(LoRA)과 classifier만 학습
+
+- 어댑터 하나 = adapter_config.json + adapter_model.safetensors (수 MB, 전체 모델은 약 440MB)
+- 서빙 시 기본 모델 1개만 메모리에 두고 어댑터 여러 개를 올려 요청별로 선택
+- 한 배치 안에서 텍스트마다 다른 어댑터를 사용할 수 있음 (peft mixed adapter batch)
+- 학습은 finetune_issue_cases.py --lora, 서빙은 src/detector_lora.py
+
+peft가 필요하다: pip install -r requirements_lora.txt
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+
+ADAPTER_CONFIG_FILENAME = "adapter_config.json"
+
+# 어댑터를 주입할 모듈 (BERT self-attention)
+DEFAULT_LORA_TARGETS = ("query", "value")
+
+# 어댑터 없이 기본 모델로 추론할 때 peft에 넘기는 이름
+BASE_ADAPTER = "__base__"
+
+
+def _import_peft():
+    """peft 지연 import (설치 안내 포함)"""
+    try:
+        import peft
+    except ImportError:
+        raise ImportError(
+            "peft가 설치되지 않았습니다.\n"
+            "설치: pip install -r requirements_lora.txt"
+        )
+    return peft
+
+
+def is_adapter_dir(path: str) -> bool:
+    """LoRA 어댑터 디렉토리인지 확인"""
+    return os.path.isfile(os.path.join(path, ADAPTER_CONFIG_FILENAME))
+
+
+def adapter_base_model(path: str) -> Optional[str]:
+    """어댑터를 학습한 기본 모델명 (adapter_config.json의 base_model_name_or_path)"""
+    with open(os.path.join(path, ADAPTER_CONFIG_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f).get("base_model_name_or_path")
+
+
+def adapter_size(path: str) -> int:
+    """어댑터 디렉토리 크기 (바이트)"""
+    return sum(
+        os.path.getsize(os.path.join(path, filename))
+        for filename in os.listdir(path)
+        if os.path.isfile(os.path.join(path, filename))
+    )
+
+
+def discover_adapters(directory: str) -> Dict[str, str]:
+    """
+    디렉토리 아래의 어댑터 찾기 (하위 디렉토리 이름 = 어댑터 이름)
+
+    Returns:
+        {어댑터 이름: 경로}
+    """
+    if not os.path.isdir(directory):
+        return {}
+    return {
+        name: os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if is_adapter_dir(os.path.join(directory, name))
+    }
+
+
+def apply_lora(model,
+               r: int = 8,
+               alpha: int = 16,
+               dropout: float = 0.1,
+               target_modules: Sequence[str] = DEFAULT_LORA_TARGETS):
+    """
+    학습용 LoRA 모델 생성 (기본 가중치 고정, LoRA 행렬과 classifier만 학습)
+
+    Returns:
+        PeftModel (save_pretrained하면 어댑터만 저장)
+    """
+    peft = _import_peft()
+    config = peft.LoraConfig(
+        task_type=peft.TaskType.SEQ_CLS,
+        r=r,
+        lora_alpha=alpha,
+        lora_dropout=dropout,
+        target_modules=list(target_modules),
+        modules_to_save=["classifier"],
+    )
+    return peft.get_peft_model(model, config)
+
+
+def attach_adapters(model, adapters: Dict[str, str]):
+    """
+    기본 모델에 어댑터 추가 (이미 올라간 어댑터는 건너뜀)
+
+    처음 호출하면 모델을 PeftModel로 감싸고, 이후에는 같은 PeftModel에 어댑터만 추가한다.
+    같은 이름으로 다른 경로의 어댑터를 올리려 하면 ValueError.
+
+    Args:
+        model: BertForSequenceClassification 또는 attach_adapters가 반환한 PeftModel
+        adapters: {어댑터 이름: 경로}
+
+    Returns:
+        PeftModel
+    """
+    peft = _import_peft()
+
+    for name, path in adapters.items():
+        if isinstance(model, peft.PeftModel) and name in model.peft_config:
+            loaded_path = getattr(model.peft_config[name], "adapter_path", None)
+            if loaded_path and os.path.abspath(loaded_path) != os.path.abspath(path):
+                raise ValueError(f"어댑터 이름 중복: {name} ({loaded_path}, {path})")
+            continue
+
+        if isinstance(model, peft.PeftModel):
+            model.load_adapter(path, adapter_name=name, is_trainable=False)
+        else:
+            model = peft.PeftModel.from_pretrained(model, path, adapter_name=name, is_trainable=False)
+        # 중복 확인용으로 경로 기록 (저장되는 설정에는 영향 없음)
+        model.peft_config[name].adapter_path = path
+
+    model.eval()
+    return model
+
+
+def adapter_names(names: Sequence[Optional[str]]) -> List[str]:
+    """텍스트별 어댑터 이름 → peft forward 인자 (None은 기본 모델)"""
+    return [BASE_ADAPTER if name is None else name for name in names]
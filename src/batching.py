@@ -0,0 +1,235 @@
+"""
+학습 배치 구성 모듈
+패딩에 쓰이는 연산을 줄이기 위한 길이 그룹 배치와 시퀀스 패킹, 토큰 처리량 측정
+
+- LengthGroupedBatchSampler: 비슷한 길이끼리 배치를 구성 (배치 순서는 무작위)
+- 패킹: 짧은 예제 여러 개를 한 시퀀스(최대 max_length)에 이어 붙이고,
+  블록 대각 attention mask로 예제끼리 서로 보지 못하게 함 (position id도 예제마다 0부터)
+- TokenThroughput: 실제 토큰/초와 패딩 포함 토큰/초 비교
+
+예제는 dataset_cache.TokenizedDataset 형식({'input_ids': 배열, 'labels': int})을 사용한다.
+"""
+
+import random
+import time
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+
+class LengthGroupedBatchSampler:
+    """
+    길이 그룹 배치 샘플러
+
+    에폭마다 전체를 섞은 뒤 batch_size × megabatch_mult개 단위(메가배치)로 나누고,
+    메가배치 안에서 길이순으로 정렬해 배치를 만든다. 배치 순서는 다시 섞는다.
+    완전 정렬보다 무작위성이 남아 학습이 한쪽 길이에 치우치지 않는다.
+    """
+
+    def __init__(self,
+                 lengths: Sequence[int],
+                 batch_size: int,
+                 megabatch_mult: int = 50,
+                 seed: int = 42,
+                 drop_last: bool = False):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.megabatch_size = batch_size * megabatch_mult
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+
+        indices = list(range(len(self.lengths)))
+        rng.shuffle(indices)
+
+        batches = []
+        for start in range(0, len(indices), self.megabatch_size):
+            megabatch = sorted(indices[start:start + self.megabatch_size],
+                               key=lambda i: self.lengths[i], reverse=True)
+            for i in range(0, len(megabatch), self.batch_size):
+                batch = megabatch[i:i + self.batch_size]
+                if len(batch) == self.batch_size or not self.drop_last:
+                    batches.append(batch)
+
+        rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def pack_examples(lengths: Sequence[int], max_length: int) -> List[List[int]]:
+    """
+    예제 번호를 max_length 토큰 이하의 묶음으로 패킹 (First-Fit Decreasing)
+
+    Returns:
+        묶음별 예제 번호 리스트
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    bins: List[List[int]] = []
+    free: List[int] = []
+
+    for i in order:
+        length = min(int(lengths[i]), max_length)
+        for b, space in enumerate(free):
+            if length <= space:
+                bins[b].append(i)
+                free[b] -= length
+                break
+        else:
+            bins.append([i])
+            free.append(max_length - length)
+    return bins
+
+
+class PackedDataset:
+    """패킹한 묶음 데이터셋 (항목 하나 = 예제 리스트)"""
+
+    def __init__(self, dataset, max_length: int):
+        self.dataset = dataset
+        self.bins = pack_examples(dataset.lengths, max_length)
+
+    def __len__(self) -> int:
+        return len(self.bins)
+
+    def __getitem__(self, idx: int) -> List[Dict[str, Any]]:
+        return [self.dataset[i] for i in self.bins[idx]]
+
+    @property
+    def examples_per_sequence(self) -> float:
+        return len(self.dataset) / max(len(self.bins), 1)
+
+
+class PackedCollator:
+    """
+    패킹 묶음 → 배치
+
+    Returns:
+        input_ids, token_type_ids, position_ids [batch, seq]
+        attention_mask [batch, seq, seq] (같은 예제 안에서만 1)
+        cls_positions [예제 수, 2] (배치 행, [CLS] 위치)
+        labels [예제 수]
+    """
+
+    def __init__(self, pad_token_id: int = 0):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, packs: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        import torch
+
+        max_len = max(sum(len(f["input_ids"]) for f in pack) for pack in packs)
+        batch_size = len(packs)
+
+        input_ids = torch.full((batch_size, max_len), self.pad_token_id, dtype=torch.long)
+        position_ids = torch.zeros((batch_size, max_len), dtype=torch.long)
+        attention_mask = torch.zeros((batch_size, max_len, max_len), dtype=torch.long)
+        cls_positions = []
+        labels = []
+
+        for row, pack in enumerate(packs):
+            start = 0
+            for f in pack:
+                n = len(f["input_ids"])
+                end = start + n
+                input_ids[row, start:end] = torch.as_tensor(f["input_ids"], dtype=torch.long)
+                position_ids[row, start:end] = torch.arange(n)
+                attention_mask[row, start:end, start:end] = 1
+                cls_positions.append((row, start))
+                labels.append(f["labels"])
+                start = end
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": torch.zeros_like(input_ids),
+            "position_ids": position_ids,
+            "cls_positions": torch.tensor(cls_positions, dtype=torch.long),
+            "labels": torch.tensor(labels, dtype=torch.long),
+        }
+
+
+def packed_logits(model, inputs: Dict[str, Any]):
+    """
+    패킹 배치의 예제별 로짓 [예제 수, num_labels]
+
+    BertForSequenceClassification과 같은 계산(pooler → dropout → classifier)을
+    각 예제의 [CLS] 위치에 적용한다.
+    DDP로 감싼 모델은 forward를 거치지 않아 그래디언트가 동기화되지 않으므로
+    단일 프로세스 학습에서만 사용한다.
+    """
+    encoder = getattr(model, model.base_model_prefix)
+    hidden = encoder(
+        input_ids=inputs["input_ids"],
+        attention_mask=inputs["attention_mask"],
+        token_type_ids=inputs["token_type_ids"],
+        position_ids=inputs["position_ids"],
+    ).last_hidden_state
+
+    rows, cols = inputs["cls_positions"][:, 0], inputs["cls_positions"][:, 1]
+    cls_states = hidden[rows, cols]
+    pooled = encoder.pooler.activation(encoder.pooler.dense(cls_states))
+    return model.classifier(model.dropout(pooled))
+
+
+class TokenThroughput:
+    """
+    학습 토큰 처리량
+
+    - effective: 실제 토큰 (패딩 제외)
+    - padded: 모델에 들어간 전체 위치 (패딩 포함)
+    - fixed: 모든 예제를 max_length로 고정 패딩했다면 처리했을 토큰
+    """
+
+    def __init__(self, max_length: int = 300):
+        self.max_length = max_length
+        self.effective_tokens = 0
+        self.padded_tokens = 0
+        self.examples = 0
+        self.steps = 0
+        self.seconds = 0.0
+        self._step_start = None
+
+    def observe(self, inputs: Dict[str, Any]):
+        """배치 하나 기록"""
+        mask = inputs["attention_mask"]
+        if mask.dim() == 3:
+            mask = mask.diagonal(dim1=1, dim2=2)
+        self.effective_tokens += int(mask.sum())
+        self.padded_tokens += mask.numel()
+        self.examples += len(inputs["labels"])
+
+    def step_begin(self):
+        self._step_start = time.perf_counter()
+
+    def step_end(self):
+        if self._step_start is not None:
+            self.seconds += time.perf_counter() - self._step_start
+            self.steps += 1
+            self._step_start = None
+
+    def summary(self) -> Dict[str, float]:
+        seconds = max(self.seconds, 1e-9)
+        fixed_tokens = self.examples * self.max_length
+        return {
+            "train_step_seconds": self.seconds,
+            "steps": self.steps,
+            "seconds_per_step": self.seconds / max(self.steps, 1),
+            "examples": self.examples,
+            "effective_tokens": self.effective_tokens,
+            "padded_tokens": self.padded_tokens,
+            "effective_tokens_per_sec": self.effective_tokens / seconds,
+            "padded_tokens_per_sec": self.padded_tokens / seconds,
+            "padding_ratio": 1 - self.effective_tokens / max(self.padded_tokens, 1),
+            "fixed_padding_tokens": fixed_tokens,
+            # 고정 패딩 대비 모델에 넣은 토큰 비율 (작을수록 패딩 연산 절감)
+            "compute_ratio_vs_fixed": self.padded_tokens / max(fixed_tokens, 1),
+        }
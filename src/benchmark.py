@@ -0,0 +1,286 @@
+"""
+벤치마크 측정 유틸리티
+워밍업/반복 측정, 지연시간 백분위수, 메모리(RSS) 측정
+"""
+
+import os
+import sys
+import time
+import platform
+import subprocess
+from typing import Callable, Dict, Any, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    백분위수 계산 (선형 보간)
+
+    Args:
+        values: 측정값 리스트
+        q: 백분위 (0 ~ 100)
+
+    Returns:
+        백분위수 값
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+
+    pos = (len(ordered) - 1) * q / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = pos - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    지연시간(초) 리스트를 ms 단위 통계로 요약
+
+    Returns:
+        {'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'min_ms', 'max_ms'}
+    """
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0,
+                "mean_ms": 0.0, "min_ms": 0.0, "max_ms": 0.0}
+
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def measure(fn: Callable[[], Any], warmup: int = 3, repeat: int = 20) -> List[float]:
+    """
+    함수 실행 시간 반복 측정
+
+    Args:
+        fn: 측정할 함수 (인자 없음)
+        warmup: 측정 전 버리는 실행 횟수
+        repeat: 측정 횟수
+
+    Returns:
+        실행 시간 리스트 (초, perf_counter 기준)
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def get_rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 ** 2)
+    except ImportError:
+        pass
+
+    # psutil이 없으면 Linux /proc에서 직접 읽음
+    try:
+        with open(f"/proc/{os.getpid()}/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 ** 2)
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def get_peak_rss_mb() -> float:
+    """프로세스 시작 이후 최대 RSS (MB)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux는 KB, macOS는 byte 단위
+        if sys.platform == "darwin":
+            return peak / (1024 ** 2)
+        return peak / 1024
+    except ImportError:
+        # Windows: psutil의 peak_wset 사용
+        try:
+            import psutil
+            return psutil.Process(os.getpid()).memory_info().peak_wset / (1024 ** 2)
+        except (ImportError, AttributeError):
+            return get_rss_mb()
+
+
+def get_system_info() -> Dict[str, Any]:
+    """시스템 정보 수집"""
+    info = {
+        "os": platform.system(),
+        "os_version": platform.version(),
+        "processor": platform.processor(),
+        "machine": platform.machine(),
+        "hostname": platform.node(),
+        "python": platform.python_version(),
+        "cpu_cores_logical": os.cpu_count(),
+    }
+
+    try:
+        import psutil
+        freq = psutil.cpu_freq()
+        info.update({
+            "cpu_cores_physical": psutil.cpu_count(logical=False),
+            "cpu_freq_max": freq.max if freq else None,
+            "ram_total_gb": round(psutil.virtual_memory().total / (1024 ** 3), 2),
+        })
+    except ImportError:
+        pass
+
+    return info
+
+
+def get_cpu_flags() -> set:
+    """CPU 명령어 확장 플래그 (Linux /proc/cpuinfo, 읽을 수 없으면 빈 집합)"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def cpu_bf16_support() -> Dict[str, bool]:
+    """
+    CPU bf16 지원 여부
+
+    Returns:
+        {'supported': PyTorch(oneDNN)가 CPU bf16 연산을 지원 (AVX-512 이상),
+         'native': 하드웨어 bf16 명령어(AVX512_BF16/AMX) 있음 — 없으면 변환 비용 때문에 느려질 수 있음}
+    """
+    flags = get_cpu_flags()
+    native = bool(flags & {"avx512_bf16", "amx_bf16"})
+
+    try:
+        import torch
+        supported = bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (ImportError, AttributeError, RuntimeError):
+        supported = native
+
+    return {"supported": supported, "native": native}
+
+
+def get_git_revision() -> Optional[str]:
+    """현재 git 커밋 해시 (커밋 간 결과 비교용, git이 없으면 None)"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        )
+        if output.returncode == 0:
+            return output.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def run_point(predict_batch: Callable[[List[str]], Any],
+              texts: List[str],
+              batch_size: int,
+              warmup: int = 3,
+              repeat: int = 20) -> Dict[str, Any]:
+    """
+    한 측정 지점(배치 크기 고정) 벤치마크
+
+    Args:
+        predict_batch: 텍스트 리스트를 받아 한 번에 처리하는 함수
+        texts: 입력 텍스트 풀 (배치 크기만큼 순환 사용)
+        batch_size: 배치 크기
+        warmup: 워밍업 횟수
+        repeat: 측정 횟수
+
+    Returns:
+        지연시간 통계, 건당 지연시간, 처리량, 메모리
+    """
+    batch = [texts[i % len(texts)] for i in range(batch_size)]
+    latencies = measure(lambda: predict_batch(batch), warmup=warmup, repeat=repeat)
+
+    summary = summarize_latencies(latencies)
+    mean_sec = summary["mean_ms"] / 1000
+
+    return {
+        "latency_ms": summary,
+        "per_item_p50_ms": summary["p50_ms"] / batch_size,
+        "throughput_items_per_sec": batch_size / mean_sec if mean_sec > 0 else 0.0,
+        "rss_mb": get_rss_mb(),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "repeat": repeat,
+        "warmup": warmup,
+    }
+
+
+def create_kcbert_detector(backend: str = "kcbert"):
+    """
+    벤치마크용 KcBERT 계열 감지기 생성
+
+    Args:
+        backend: 'kcbert' (AbusiveDetector), 'improved', 'multi',
+            'multihead' (MultiCategoryDetector, 인코더 1회 + 카테고리 헤드),
+            'earlyexit' (AbusiveDetector, 중간 레이어 조기 종료)
+    """
+    if backend == "improved":
+        from .detector_improved import ImprovedAbusiveDetector
+        return ImprovedAbusiveDetector()
+    if backend == "multi":
+        from .detector_multi import MultiCategoryDetector
+        return MultiCategoryDetector()
+    if backend == "multihead":
+        from .detector_multi import MultiCategoryDetector
+        return MultiCategoryDetector(multi_head=True)
+    if backend == "earlyexit":
+        from .detector import AbusiveDetector
+        return AbusiveDetector(early_exit=True)
+
+    from .detector import AbusiveDetector
+    return AbusiveDetector()
+
+
+def point_key(point: Dict[str, Any]) -> str:
+    """측정 지점 식별 키 (보고서 간 비교용)"""
+    return (f"{point['backend']}|bs={point['batch_size']}|"
+            f"seq={point.get('seq_len')}|threads={point.get('threads')}")
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    두 벤치마크 보고서의 같은 측정 지점끼리 p50/처리량 비교
+
+    Returns:
+        [{'key', 'old_p50_ms', 'new_p50_ms', 'p50_change_pct',
+          'old_throughput', 'new_throughput'}, ...]
+    """
+    old_points = {point_key(p): p for p in old.get("results", [])}
+    rows = []
+
+    for point in new.get("results", []):
+        key = point_key(point)
+        if key not in old_points:
+            continue
+
+        before = old_points[key]
+        old_p50 = before["latency_ms"]["p50_ms"]
+        new_p50 = point["latency_ms"]["p50_ms"]
+        rows.append({
+            "key": key,
+            "old_p50_ms": old_p50,
+            "new_p50_ms": new_p50,
+            "p50_change_pct": (new_p50 - old_p50) / old_p50 * 100 if old_p50 > 0 else 0.0,
+            "old_throughput": before["throughput_items_per_sec"],
+            "new_throughput": point["throughput_items_per_sec"],
+        })
+
+    return rows
@@ -0,0 +1,204 @@
+"""
+토큰화 데이터셋 캐시
+학습 CSV를 한 번만 토큰화(fast 토크나이저 배치 모드)해 NumPy memmap 파일로 저장하고,
+학습 시에는 배치 안에서 가장 긴 길이로만 패딩
+
+- 캐시 키: CSV 파일 내용 해시 + 토크나이저 지문(어휘/설정) + max_length
+- input_ids는 패딩 없이 이어 붙인 1차원 배열 + 문장별 시작 위치(offsets)로 저장
+- 이후 실행은 토큰화 없이 np.load(mmap_mode='r')로 바로 사용
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .metrics import CACHE_REQUESTS
+
+
+DEFAULT_DATASET_CACHE_DIR = "./models/cache/datasets"
+
+INPUT_IDS_FILENAME = "input_ids.npy"
+OFFSETS_FILENAME = "offsets.npy"
+LABELS_FILENAME = "labels.npy"
+META_FILENAME = "meta.json"
+
+
+def file_hash(path: str) -> str:
+    """파일 내용 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """
+    토크나이저 지문 (어휘, 정규화/분리 규칙, 특수 토큰)
+
+    fast 토크나이저는 전체 설정 JSON을, 그 외에는 어휘와 초기화 인자를 해시한다.
+    """
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        source = backend.to_str()
+    else:
+        source = json.dumps(sorted(tokenizer.get_vocab().items()), ensure_ascii=False)
+        source += json.dumps(getattr(tokenizer, "init_kwargs", {}), sort_keys=True, default=str)
+    source += json.dumps(tokenizer.all_special_ids)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class TokenizedDataset:
+    """
+    토큰화된 예제 묶음 (Trainer/DataLoader용 map-style 데이터셋)
+
+    예제는 {'input_ids': int 배열 (패딩 없음), 'labels': int} 딕셔너리이며
+    DynamicPaddingCollator로 배치를 만든다.
+    """
+
+    def __init__(self, source: "TokenizedCSV", indices: Sequence[int]):
+        self.source = source
+        self.indices = [int(i) for i in indices]
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        return self.source.example(self.indices[idx])
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """예제별 토큰 수"""
+        return self.source.lengths[self.indices]
+
+
+class TokenizedCSV:
+    """캐시 디렉토리의 토큰화 결과 (memmap)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.input_ids = np.load(os.path.join(directory, INPUT_IDS_FILENAME), mmap_mode='r')
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILENAME))
+        self.labels = np.load(os.path.join(directory, LABELS_FILENAME))
+        with open(os.path.join(directory, META_FILENAME), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.lengths = np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def example(self, i: int) -> Dict[str, Any]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return {
+            "input_ids": np.asarray(self.input_ids[start:end], dtype=np.int64),
+            "labels": int(self.labels[i]),
+        }
+
+    def subset(self, indices: Sequence[int]) -> TokenizedDataset:
+        """일부 예제 (학습/검증 분할)"""
+        return TokenizedDataset(self, indices)
+
+
+def load_tokenized_csv(csv_path: str,
+                       tokenizer,
+                       max_length: int = 300,
+                       cache_dir: str = DEFAULT_DATASET_CACHE_DIR,
+                       text_column: str = "text",
+                       label_column: str = "label",
+                       label_fn: Callable[[Any], int] = int) -> TokenizedCSV:
+    """
+    CSV 토큰화 결과 로드 (캐시가 없으면 한 번 토큰화해서 저장)
+
+    fast 토크나이저에 전체 텍스트를 한 번에 넘기므로 Rust 토크나이저가 여러 코어로 처리한다.
+
+    Args:
+        csv_path: 학습 CSV
+        tokenizer: 토크나이저
+        max_length: 최대 토큰 길이 (자르기만 하고 패딩하지 않음)
+        cache_dir: 캐시 디렉토리
+        label_fn: 라벨 변환 함수 (문자열 라벨 CSV용)
+    """
+    key_source = "\n".join([
+        file_hash(csv_path),
+        tokenizer_fingerprint(tokenizer),
+        str(max_length),
+        text_column,
+        label_column,
+    ])
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    directory = os.path.join(cache_dir, f"{name}.{key}")
+
+    if os.path.exists(os.path.join(directory, META_FILENAME)):
+        CACHE_REQUESTS.inc(cache="datasets", result="hit")
+        return TokenizedCSV(directory)
+
+    CACHE_REQUESTS.inc(cache="datasets", result="miss")
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    texts = [str(text) for text in df[text_column]]
+    labels = np.asarray([label_fn(label) for label in df[label_column]], dtype=np.int64)
+
+    encoded = tokenizer(texts, truncation=True, max_length=max_length,
+                        return_attention_mask=False, return_token_type_ids=False)["input_ids"]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(ids) for ids in encoded])
+    input_ids = np.fromiter((token for ids in encoded for token in ids),
+                            dtype=np.int32, count=int(offsets[-1]))
+
+    # 임시 디렉토리에 모두 쓴 뒤 이름을 바꿔, 중간에 종료돼도 불완전한 캐시가 남지 않게 함
+    tmp_directory = directory + ".tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+    np.save(os.path.join(tmp_directory, INPUT_IDS_FILENAME), input_ids)
+    np.save(os.path.join(tmp_directory, OFFSETS_FILENAME), offsets)
+    np.save(os.path.join(tmp_directory, LABELS_FILENAME), labels)
+    with open(os.path.join(tmp_directory, META_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump({
+            "source": os.path.abspath(csv_path),
+            "count": len(texts),
+            "tokens": int(offsets[-1]),
+            "max_length": max_length,
+            "tokenizer": getattr(tokenizer, "name_or_path", ""),
+        }, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+    return TokenizedCSV(directory)
+
+
+class DynamicPaddingCollator:
+    """배치 안에서 가장 긴 예제 길이로만 패딩 (고정 300토큰 패딩 대신)"""
+
+    def __init__(self, pad_token_id: int = 0, pad_to_multiple_of: Optional[int] = None):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, Any]:
+        import torch
+
+        max_len = max(len(f["input_ids"]) for f in features)
+        if self.pad_to_multiple_of:
+            multiple = self.pad_to_multiple_of
+            max_len = (max_len + multiple - 1) // multiple * multiple
+
+        input_ids = torch.full((len(features), max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(features), max_len), dtype=torch.long)
+        for i, f in enumerate(features):
+            n = len(f["input_ids"])
+            input_ids[i, :n] = torch.as_tensor(f["input_ids"], dtype=torch.long)
+            attention_mask[i, :n] = 1
+
+        batch = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": torch.zeros_like(input_ids),
+        }
+        if "labels" in features[0]:
+            batch["labels"] = torch.tensor([f["labels"] for f in features], dtype=torch.long)
+        return batch
@@ -3,10 +3,11 @@
 """
 
 import time
-import torch
-import numpy as np
-from typing import Dict, List, Any
-from .model_loader import ModelLoader
+from typing import Dict, List, Any, Optional, Tuple
+from .timing import StageTimer, NULL_TIMER, TimingAggregator
+from .metrics import observe_predictions, observe_stage_timings
+from .lexicon import get_lexicon
+from .model_registry import acquire_model, release_model
 
 
 class AbusiveDetector:
@@ -16,34 +17,62 @@ class AbusiveDetector:
                  model_name: str = "beomi/kcbert-base",
                  cache_dir: str = "./models/kcbert",
                  threshold: float = 0.5,
-                 max_length: int = 300):  # KcBERT 최대 길이는 300
+                 max_length: int = 300,  # KcBERT 최대 길이는 300
+                 profile_stages: bool = False,
+                 lexicon_dir: str = None,
+                 rule_first: bool = False,
+                 revision: str = None,
+                 dtype: str = None,
+                 early_exit: bool = False,
+                 exit_entropy: float = 0.2,
+                 exits_path: str = None):
         """
         Args:
             model_name: 모델명
             cache_dir: 캐시 디렉토리
             threshold: 감지 임계값 (0.0 ~ 1.0)
             max_length: 최대 토큰 길이 (KcBERT는 300이 최대)
+            profile_stages: 단계별 처리 시간 측정 여부 (결과에 timings 추가)
+            lexicon_dir: 규칙 사전 디렉토리 (기본: data/lexicon)
+            rule_first: 규칙만으로 판정이 확정되면 모델 추론 생략
+            revision: 모델 revision (Hugging Face 브랜치/태그/커밋)
+            dtype: 가중치 dtype ('float32', 'float16', 'bfloat16')
+            early_exit: 중간 레이어 분류기로 확신이 충분하면 남은 레이어 생략 (결과에 exit_layer 추가)
+            exit_entropy: 조기 종료 기준 예측 엔트로피 (낮을수록 보수적, 0이면 항상 끝까지)
+            exits_path: 종료 분류기 파일 (기본: 모델 디렉토리 또는 cache_dir의 exits.pt)
         """
         self.threshold = threshold
         self.max_length = max_length
+        self.rule_first = rule_first
         
-        # 모델 로더 초기화
+        # 조기 종료 (모델 로드 시 종료 분류기 구성)
+        self.early_exit = early_exit
+        self.exit_entropy = exit_entropy
+        self.exits_path = exits_path
+        self.exit_model = None
+        
+        # 단계별 처리 시간 (profile_stages=True일 때만 누적)
+        self.profile_stages = profile_stages
+        self.timing_stats = TimingAggregator()
+        
+        # 모델 로더 초기화 (torch/transformers는 이 시점에 로드)
+        from .model_loader import ModelLoader
         self.loader = ModelLoader(
             model_name=model_name,
-            cache_dir=cache_dir
+            cache_dir=cache_dir,
+            revision=revision,
+            dtype=dtype
         )
         
         # 모델과 토크나이저는 지연 로딩
         self.tokenizer = None
         self.model = None
         self.device = None
+        self._model_handle = None
         
-        # 간단한 규칙 기반 욕설 패턴 (보조 기능)
-        # 실제로는 더 정교한 사전이 필요하지만, 예제용으로 간단히 구성
-        self.abusive_patterns = [
-            '시발', '씨발', '병신', '개새', '좆', '니미', 
-            '지랄', '엿먹', '꺼져', 'ㅅㅂ', 'ㅂㅅ', '미친'
-        ]
+        # 규칙 기반 욕설 사전 (보조 기능, data/lexicon/abusive.yaml의 basic 단계)
+        # 파일이 바뀌면 자동으로 다시 컴파일되며 다른 감지기와 공유
+        self.lexicon = get_lexicon("abusive", lexicon_dir)
     
     def load_model(self):
         """모델 로드 (지연 로딩)"""
@@ -52,13 +81,76 @@ class AbusiveDetector:
             print("🤖 KcBERT 모델 초기화 중...")
             print("="*60 + "\n")
             
-            self.tokenizer, self.model = self.loader.load()
-            self.device = self.loader.get_device()
+            # 같은 모델(이름, revision, dtype, 백엔드, 디바이스)은 프로세스 안에서 한 번만 로드
+            self._model_handle = acquire_model(self.loader)
+            self.tokenizer = self._model_handle.tokenizer
+            self.model = self._model_handle.model
+            self.device = self._model_handle.device
+            
+            if self.early_exit:
+                self._load_exit_model()
             
             print("\n" + "="*60)
             print("✅ 모델 초기화 완료!")
             print("="*60 + "\n")
     
+    def _load_exit_model(self):
+        """모델 가중치를 공유하는 조기 종료 분류기 구성 (src/early_exit.py)"""
+        from .early_exit import EarlyExitClassifier, default_exits_path
+        
+        exits_path = self.exits_path or default_exits_path(
+            self.loader.model_name, self.loader.cache_dir
+        )
+        self.exit_model = EarlyExitClassifier.from_sequence_classifier(
+            self.model, exits_path, self.exit_entropy
+        )
+        self.exit_model.to(self.device)
+        self.exit_model.eval()
+        if self.exit_model.exit_layers:
+            print(f"🚪 조기 종료: 레이어 {self.exit_model.exit_layers}, 엔트로피 < {self.exit_entropy}")
+        else:
+            print(f"   ⚠️  종료 분류기 없음 ({exits_path}), 모든 레이어 실행")
+    
+    def close(self):
+        """공유 모델 참조 반납 (마지막 참조였으면 메모리 해제, 다시 predict하면 재로드)"""
+        if self._model_handle is not None:
+            release_model(self._model_handle)
+            self._model_handle = None
+        self.exit_model = None
+        self.tokenizer = None
+        self.model = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _start_timer(self):
+        """호출 단위 타이머 (측정이 꺼져 있으면 아무것도 하지 않는 타이머)"""
+        return StageTimer() if self.profile_stages else NULL_TIMER
+    
+    def _attach_timings(self, results: List[Dict[str, Any]], timer):
+        """
+        단계별 시간을 결과에 추가하고 히스토그램에 누적
+        
+        배치 처리 시 결과별 timings는 배치 시간을 건수로 나눈 값이고,
+        히스토그램에는 배치 1회 시간이 기록된다.
+        """
+        if not timer.enabled:
+            return
+        
+        timings = timer.as_dict()
+        self.timing_stats.record(timings)
+        observe_stage_timings(type(self).__name__, timings)
+        per_item = timer.as_dict(divisor=len(results))
+        for result in results:
+            result["timings"] = dict(per_item)
+    
+    def get_timing_summary(self) -> Dict[str, Dict[str, Any]]:
+        """단계별 처리 시간 요약 (호출 수, 평균, p50/p95/p99, 버킷)"""
+        return self.timing_stats.summary()
+    
     def _check_rule_based(self, text: str) -> float:
         """
         규칙 기반 욕설 체크 (보조 기능)
@@ -69,8 +161,7 @@ class AbusiveDetector:
         Returns:
             규칙 기반 점수 (0.0 ~ 1.0)
         """
-        text_lower = text.lower()
-        matches = sum(1 for pattern in self.abusive_patterns if pattern in text_lower)
+        matches = len(self.lexicon.scan(text).entries("basic"))
         
         # 매칭된 패턴 수에 따라 점수 계산
         if matches == 0:
@@ -82,56 +173,108 @@ class AbusiveDetector:
         else:
             return 0.95
     
-    def predict(self, text: str) -> Dict[str, Any]:
+    def _combine_scores(self, abusive_prob: float, rule_score: float) -> float:
+        """모델 점수와 규칙 기반 점수 결합"""
+        # 최종 점수 = (모델 점수 * 0.7) + (규칙 기반 점수 * 0.3)
+        # 모델이 제대로 fine-tuning되지 않은 경우 규칙 기반에 더 의존
+        if rule_score > 0.5:
+            return max(abusive_prob, rule_score)
+        return abusive_prob * 0.7 + rule_score * 0.3
+    
+    def _decide_by_rules(self, rule_score: float) -> Optional[bool]:
         """
-        단일 텍스트 예측
+        모델 점수와 관계없이 판정이 확정되는지 확인
+        
+        결합 점수는 모델 점수에 대해 증가하므로 모델 점수가 0일 때가 하한, 1일 때가 상한이다.
+        
+        Returns:
+            True(욕설 확정), False(정상 확정), None(모델 추론 필요)
+        """
+        if self._combine_scores(0.0, rule_score) >= self.threshold:
+            return True
+        if self._combine_scores(1.0, rule_score) < self.threshold:
+            return False
+        return None
+    
+    def _build_rule_result(self, text: str, rule_score: float, is_abusive: bool) -> Dict[str, Any]:
+        """
+        규칙만으로 판정한 결과 (모델 점수 없음)
+        
+        abusive_score는 욕설이면 가능한 최저 점수, 정상이면 가능한 최고 점수이며,
+        판정이 모델과 무관하게 확정되므로 신뢰도는 1.0이다.
+        """
+        return {
+            "text": text,
+            "is_abusive": is_abusive,
+            "confidence": 1.0,
+            "abusive_score": self._combine_scores(0.0 if is_abusive else 1.0, rule_score),
+            "model_score": None,
+            "rule_score": rule_score,
+            "threshold": self.threshold,
+            "processing_time": 0.0,
+            "decided_by": "rules"
+        }
+    
+    def _forward(self, texts: List[str], timer=NULL_TIMER) -> List[Tuple[float, float, Optional[int]]]:
+        """
+        모델 추론 (배치 단위로 한 번의 forward)
         
         Args:
-            text: 입력 텍스트
+            texts: 입력 텍스트 리스트
+            timer: 단계별 시간 측정 타이머
             
         Returns:
-            감지 결과 딕셔너리
+            [(욕설 확률, 신뢰도, 종료 레이어 (조기 종료가 꺼져 있으면 None)), ...]
         """
-        # 모델 로드 (처음 호출 시)
-        if self.model is None:
-            self.load_model()
-        
-        start_time = time.time()
+        import torch
         
         # 토큰화
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            max_length=self.max_length,
-            padding="max_length",
-            truncation=True
-        )
+        with timer.stage("tokenize"):
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="pt",
+                max_length=self.max_length,
+                padding="max_length",
+                truncation=True
+            )
         
-        # 디바이스로 이동
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        # 추론 (디바이스 이동 포함)
+        with timer.stage("forward"), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            if self.exit_model is not None:
+                logits, exit_layers = self.exit_model(**inputs)
+            else:
+                logits = self.model(**inputs).logits
+                exit_layers = [None] * len(texts)
         
-        # 추론
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            
-            # Softmax로 확률 계산
+        # Softmax로 확률 계산
+        with timer.stage("postprocess"):
             probabilities = torch.nn.functional.softmax(logits, dim=-1)
-            abusive_prob = probabilities[0][1].item()  # 욕설 클래스 확률
-            confidence = torch.max(probabilities).item()
+            abusive_probs = probabilities[:, 1].tolist()  # 욕설 클래스 확률
+            confidences = torch.max(probabilities, dim=-1).values.tolist()
         
-        # 규칙 기반 점수와 결합
-        rule_score = self._check_rule_based(text)
+        return list(zip(abusive_probs, confidences, exit_layers))
+    
+    def _build_result(self,
+                      text: str,
+                      abusive_prob: float,
+                      confidence: float,
+                      timer=NULL_TIMER,
+                      rule_score: Optional[float] = None,
+                      exit_layer: Optional[int] = None) -> Dict[str, Any]:
+        """
+        모델 점수와 규칙 기반 점수를 결합하여 결과 구성
         
-        # 최종 점수 = (모델 점수 * 0.7) + (규칙 기반 점수 * 0.3)
-        # 모델이 제대로 fine-tuning되지 않은 경우 규칙 기반에 더 의존
-        if rule_score > 0.5:
-            final_score = max(abusive_prob, rule_score)
-        else:
-            final_score = abusive_prob * 0.7 + rule_score * 0.3
+        processing_time은 호출한 쪽에서 채운다.
+        rule_score를 이미 계산했으면(rule_first) 다시 계산하지 않는다.
+        exit_layer는 조기 종료가 켜져 있을 때만 결과에 추가한다.
+        """
+        # 규칙 기반 점수와 결합
+        if rule_score is None:
+            with timer.stage("rules"):
+                rule_score = self._check_rule_based(text)
         
-        # 처리 시간 계산
-        processing_time = time.time() - start_time
+        final_score = self._combine_scores(abusive_prob, rule_score)
         
         # 결과 구성
         result = {
@@ -142,29 +285,139 @@ class AbusiveDetector:
             "model_score": abusive_prob,
             "rule_score": rule_score,
             "threshold": self.threshold,
-            "processing_time": processing_time
+            "processing_time": 0.0,
+            "decided_by": "model"
         }
+        if exit_layer is not None:
+            result["exit_layer"] = exit_layer
         
         return result
     
-    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def predict(self, text: str) -> Dict[str, Any]:
+        """
+        단일 텍스트 예측
+        
+        Args:
+            text: 입력 텍스트
+            
+        Returns:
+            감지 결과 딕셔너리
+        """
+        # 모델 로드 (처음 호출 시, rule_first면 모델이 필요할 때까지 미룸)
+        if self.model is None and not self.rule_first:
+            self.load_model()
+        
+        start_time = time.time()
+        timer = self._start_timer()
+        
+        # 규칙 우선 판정
+        rule_score = None
+        decided = None
+        if self.rule_first:
+            with timer.stage("rules"):
+                rule_score = self._check_rule_based(text)
+            decided = self._decide_by_rules(rule_score)
+        
+        if decided is None:
+            if self.model is None:
+                self.load_model()
+            abusive_prob, confidence, exit_layer = self._forward([text], timer)[0]
+            result = self._build_result(text, abusive_prob, confidence, timer, rule_score, exit_layer)
+        else:
+            result = self._build_rule_result(text, rule_score, decided)
+        
+        # 처리 시간 계산
+        result["processing_time"] = time.time() - start_time
+        self._attach_timings([result], timer)
+        observe_predictions(type(self).__name__, [result], result["processing_time"])
+        
+        return result
+    
+    def predict_batch(self, texts: List[str], batch_size: int = 8) -> List[Dict[str, Any]]:
         """
         배치 예측
         
+        batch_size개씩 묶어서 한 번의 forward로 처리한다.
+        각 결과의 processing_time은 해당 배치 시간을 건수로 나눈 값이다.
+        rule_first이면 규칙으로 확정된 텍스트를 먼저 빼고 나머지로 배치를 채운다.
+        
         Args:
             texts: 입력 텍스트 리스트
+            batch_size: 한 번에 추론할 텍스트 수
             
         Returns:
             감지 결과 리스트
         """
-        results = []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        rule_scores: List[Optional[float]] = [None] * len(texts)
+        pending = list(range(len(texts)))  # 모델 추론이 필요한 텍스트 번호
+        
+        if self.rule_first:
+            pending = self._predict_by_rules(texts, results, rule_scores)
+        
+        if pending and self.model is None:
+            self.load_model()
         
-        for text in texts:
-            result = self.predict(text)
-            results.append(result)
+        for i in range(0, len(pending), batch_size):
+            indices = pending[i:i + batch_size]
+            chunk = [texts[j] for j in indices]
+            start_time = time.time()
+            timer = self._start_timer()
+            
+            scores = self._forward(chunk, timer)
+            chunk_results = [
+                self._build_result(texts[j], abusive_prob, confidence, timer, rule_scores[j], exit_layer)
+                for j, (abusive_prob, confidence, exit_layer) in zip(indices, scores)
+            ]
+            
+            chunk_time = time.time() - start_time
+            elapsed = chunk_time / len(chunk)
+            for j, result in zip(indices, chunk_results):
+                result["processing_time"] = elapsed
+                results[j] = result
+            self._attach_timings(chunk_results, timer)
+            observe_predictions(type(self).__name__, chunk_results, chunk_time, batch_size)
         
         return results
     
+    def _predict_by_rules(self,
+                          texts: List[str],
+                          results: List[Optional[Dict[str, Any]]],
+                          rule_scores: List[Optional[float]]) -> List[int]:
+        """
+        배치 전체에 규칙을 먼저 적용 (rule_first)
+        
+        확정된 결과는 results에, 규칙 점수는 rule_scores에 채운다.
+        
+        Returns:
+            모델 추론이 필요한 텍스트 번호 리스트
+        """
+        start_time = time.time()
+        timer = self._start_timer()
+        
+        with timer.stage("rules"):
+            for j, text in enumerate(texts):
+                rule_scores[j] = self._check_rule_based(text)
+        
+        pending = []
+        decided_results = []
+        for j, rule_score in enumerate(rule_scores):
+            decided = self._decide_by_rules(rule_score)
+            if decided is None:
+                pending.append(j)
+            else:
+                results[j] = self._build_rule_result(texts[j], rule_score, decided)
+                decided_results.append(results[j])
+        
+        if decided_results:
+            rules_time = time.time() - start_time
+            for result in decided_results:
+                result["processing_time"] = rules_time / len(texts)
+            self._attach_timings(decided_results, timer)
+            observe_predictions(type(self).__name__, decided_results, rules_time, mode="rules")
+        
+        return pending
+    
     def predict_file(self, filepath: str) -> Dict[str, Any]:
         """
         파일에서 읽어서 예측
@@ -178,9 +431,16 @@ class AbusiveDetector:
         from .preprocessor import TextPreprocessor
         
         preprocessor = TextPreprocessor()
+        preprocess_start = time.perf_counter()
         text = preprocessor.preprocess_file(filepath)
+        preprocess_ms = (time.perf_counter() - preprocess_start) * 1000
         
         result = self.predict(text)
         result["source_file"] = filepath
         
+        if self.profile_stages:
+            self.timing_stats.record({"preprocess": preprocess_ms})
+            observe_stage_timings(type(self).__name__, {"preprocess": preprocess_ms})
+            result["timings"] = {"preprocess": preprocess_ms, **result["timings"]}
+        
         return result
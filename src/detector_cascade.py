@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+캐스케이드 감지기
+KcBERT 1차 필터로 대부분을 판정하고, 애매한 구간만 sLLM으로 재검증
+"""
+
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .metrics import ESCALATIONS
+
+
+class CascadeDetector:
+    """
+    KcBERT 1차 필터 + sLLM 2차 판정 캐스케이드 감지기
+
+    KcBERT(ms 단위)로 먼저 판정하고, 점수가 불확실 구간에 있거나
+    신뢰도가 낮은 경우에만 sLLM(초 단위)으로 넘겨 최종 판정한다.
+    """
+
+    PREFILTERS = ("improved", "multi")
+
+    def __init__(self,
+                 prefilter: str = "improved",
+                 model_name: str = "beomi/kcbert-base",
+                 cache_dir: str = "./models/kcbert",
+                 sllm_model_path: str = "./models/Midm-2.0-Mini-Instruct-Q4_K_M.gguf",
+                 threshold: float = 0.5,
+                 escalation_band: Tuple[float, float] = (0.3, 0.7),
+                 min_confidence: Optional[float] = None,
+                 prefilter_detector=None,
+                 sllm_detector=None):
+        """
+        Args:
+            prefilter: 1차 필터 종류 ('improved' 또는 'multi')
+            model_name: KcBERT 모델명
+            cache_dir: KcBERT 캐시 디렉토리
+            sllm_model_path: sLLM GGUF 모델 파일 경로
+            threshold: 최종 감지 임계값
+            escalation_band: sLLM으로 넘길 1차 점수 구간 [low, high)
+            min_confidence: 1차 신뢰도가 이 값 미만이면 sLLM으로 넘김 (None=사용 안함)
+            prefilter_detector: 이미 생성된 1차 감지기 (지정 시 prefilter 무시)
+            sllm_detector: 이미 생성된 sLLM 감지기 (비교 실험 시 모델 공유용)
+        """
+        if prefilter_detector is None and prefilter not in self.PREFILTERS:
+            raise ValueError(
+                f"지원하지 않는 1차 필터입니다: {prefilter} "
+                f"(지원: {', '.join(self.PREFILTERS)})"
+            )
+
+        low, high = escalation_band
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"잘못된 escalation_band입니다: {escalation_band}")
+
+        self.prefilter = prefilter
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.sllm_model_path = sllm_model_path
+        self.threshold = threshold
+        self.escalation_band = (low, high)
+        self.min_confidence = min_confidence
+
+        # 두 모델 모두 첫 사용 시점에 생성 (sLLM은 필요할 때까지 로드하지 않음)
+        self.prefilter_detector = prefilter_detector
+        self.sllm_detector = sllm_detector
+
+        # 누적 통계
+        self.stats = {"total": 0, "escalated": 0}
+
+    def _get_prefilter(self):
+        """1차 필터 감지기 반환 (지연 생성)"""
+        if self.prefilter_detector is None:
+            if self.prefilter == "multi":
+                from .detector_multi import MultiCategoryDetector
+                self.prefilter_detector = MultiCategoryDetector(
+                    model_name=self.model_name,
+                    cache_dir=self.cache_dir,
+                    threshold=self.threshold
+                )
+            else:
+                from .detector_improved import ImprovedAbusiveDetector
+                self.prefilter_detector = ImprovedAbusiveDetector(
+                    model_name=self.model_name,
+                    cache_dir=self.cache_dir,
+                    threshold=self.threshold
+                )
+        return self.prefilter_detector
+
+    def _get_sllm(self):
+        """sLLM 감지기 반환 (지연 생성)"""
+        if self.sllm_detector is None:
+            from .detector_sllm import SLLMAbusiveDetector
+            self.sllm_detector = SLLMAbusiveDetector(
+                model_path=self.sllm_model_path,
+                threshold=self.threshold
+            )
+        return self.sllm_detector
+
+    @staticmethod
+    def _summarize_prefilter(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        1차 필터 결과를 (점수, 신뢰도, 판정)으로 정리
+
+        MultiCategoryDetector는 성희롱까지 포함한 max_severity / is_inappropriate를,
+        그 외 감지기는 abusive_score / is_abusive를 사용한다.
+        """
+        return {
+            "score": result.get("max_severity", result["abusive_score"]),
+            "confidence": result.get("abusive_confidence", result.get("confidence", 1.0)),
+            "is_abusive": result.get("is_inappropriate", result["is_abusive"]),
+        }
+
+    def should_escalate(self, score: float, confidence: float) -> bool:
+        """
+        sLLM 재검증 필요 여부
+
+        Args:
+            score: 1차 필터 점수
+            confidence: 1차 필터 신뢰도
+
+        Returns:
+            불확실 구간이거나 신뢰도가 낮으면 True
+        """
+        low, high = self.escalation_band
+        if low <= score < high:
+            return True
+        if self.min_confidence is not None and confidence < self.min_confidence:
+            return True
+        return False
+
+    def _build_result(self,
+                      text: str,
+                      prefilter_result: Dict[str, Any],
+                      prefilter_time: float,
+                      sllm_result: Optional[Dict[str, Any]],
+                      sllm_time: float) -> Dict[str, Any]:
+        """단계별 결과를 하나의 결과 딕셔너리로 통합"""
+        summary = self._summarize_prefilter(prefilter_result)
+        escalated = sllm_result is not None
+
+        stages = {
+            "prefilter": {
+                "detector": type(self._get_prefilter()).__name__,
+                "score": summary["score"],
+                "confidence": summary["confidence"],
+                "is_abusive": summary["is_abusive"],
+                "processing_time": prefilter_time,
+            }
+        }
+
+        if escalated:
+            stages["sllm"] = {
+                "score": sllm_result["abusive_score"],
+                "confidence": sllm_result["confidence"],
+                "is_abusive": sllm_result["is_abusive"],
+                "category": sllm_result.get("category", "없음"),
+                "reason": sllm_result.get("reason", ""),
+                "processing_time": sllm_time,
+            }
+            final = stages["sllm"]
+        else:
+            final = stages["prefilter"]
+
+        return {
+            "text": text,
+            "is_abusive": final["is_abusive"],
+            "confidence": final["confidence"],
+            "abusive_score": final["score"],
+            "threshold": self.threshold,
+            "processing_time": prefilter_time + sllm_time,
+            "decided_by": "sllm" if escalated else "prefilter",
+            "escalated": escalated,
+            "escalation_band": list(self.escalation_band),
+            "stages": stages,
+        }
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """
+        캐스케이드 예측
+
+        Args:
+            text: 입력 텍스트
+
+        Returns:
+            최종 결과 (decided_by: 'prefilter' 또는 'sllm')
+        """
+        prefilter = self._get_prefilter()
+
+        start_time = time.time()
+        prefilter_result = prefilter.predict(text)
+        prefilter_time = time.time() - start_time
+
+        summary = self._summarize_prefilter(prefilter_result)
+
+        sllm_result = None
+        sllm_time = 0.0
+        if self.should_escalate(summary["score"], summary["confidence"]):
+            start_time = time.time()
+            sllm_result = self._get_sllm().predict(text)
+            sllm_time = time.time() - start_time
+
+        self.stats["total"] += 1
+        if sllm_result is not None:
+            self.stats["escalated"] += 1
+            ESCALATIONS.inc(prefilter=self.prefilter)
+
+        return self._build_result(text, prefilter_result, prefilter_time,
+                                  sllm_result, sllm_time)
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        배치 예측
+
+        1차 필터를 먼저 전체에 적용한 뒤, 재검증 대상만 모아서 sLLM에 넘긴다.
+        """
+        prefilter = self._get_prefilter()
+
+        prefilter_results = prefilter.predict_batch(texts)
+        prefilter_times = [r['processing_time'] for r in prefilter_results]
+
+        escalate_idx = []
+        for i, r in enumerate(prefilter_results):
+            summary = self._summarize_prefilter(r)
+            if self.should_escalate(summary["score"], summary["confidence"]):
+                escalate_idx.append(i)
+
+        sllm_results = {}
+        sllm_times = {}
+        if escalate_idx:
+            start_time = time.time()
+            escalated = self._get_sllm().predict_batch([texts[i] for i in escalate_idx])
+            elapsed = time.time() - start_time
+            for i, r in zip(escalate_idx, escalated):
+                sllm_results[i] = r
+                sllm_times[i] = elapsed / len(escalate_idx)
+
+        self.stats["total"] += len(texts)
+        self.stats["escalated"] += len(escalate_idx)
+        if escalate_idx:
+            ESCALATIONS.inc(len(escalate_idx), prefilter=self.prefilter)
+
+        return [
+            self._build_result(text, prefilter_results[i], prefilter_times[i],
+                               sllm_results.get(i), sllm_times.get(i, 0.0))
+            for i, text in enumerate(texts)
+        ]
+
+    def predict_file(self, filepath: str) -> Dict[str, Any]:
+        """파일에서 읽어서 예측"""
+        from .preprocessor import TextPreprocessor
+
+        preprocessor = TextPreprocessor()
+        text = preprocessor.preprocess_file(filepath)
+
+        result = self.predict(text)
+        result["source_file"] = filepath
+
+        return result
+
+    def get_escalation_rate(self) -> float:
+        """누적 sLLM 재검증 비율 (0.0 ~ 1.0)"""
+        if self.stats["total"] == 0:
+            return 0.0
+        return self.stats["escalated"] / self.stats["total"]
@@ -3,10 +3,11 @@
 """
 
 import time
-import torch
-import numpy as np
-from typing import Dict, List, Any
-from .model_loader import ModelLoader
+from typing import Dict, List, Any, Optional, Tuple
+from .timing import StageTimer, NULL_TIMER, TimingAggregator
+from .metrics import observe_predictions, observe_stage_timings
+from .lexicon import get_lexicon
+from .model_registry import acquire_model, release_model
 
 
 class ImprovedAbusiveDetector:
@@ -17,7 +18,15 @@ class ImprovedAbusiveDetector:
                  cache_dir: str = "./models/kcbert",
                  threshold: float = 0.5,
                  max_length: int = 300,
-                 use_dynamic_threshold: bool = True):
+                 use_dynamic_threshold: bool = True,
+                 profile_stages: bool = False,
+                 lexicon_dir: str = None,
+                 rule_first: bool = False,
+                 revision: str = None,
+                 dtype: str = None,
+                 early_exit: bool = False,
+                 exit_entropy: float = 0.2,
+                 exits_path: str = None):
         """
         Args:
             model_name: 모델명
@@ -25,47 +34,47 @@ class ImprovedAbusiveDetector:
             threshold: 기본 감지 임계값 (동적 임계값 사용 시 기준값)
             max_length: 최대 토큰 길이
             use_dynamic_threshold: 동적 임계값 사용 여부
+            profile_stages: 단계별 처리 시간 측정 여부 (결과에 timings 추가)
+            lexicon_dir: 규칙 사전 디렉토리 (기본: data/lexicon)
+            rule_first: 규칙만으로 판정이 확정되면 모델 추론 생략 (화이트리스트, 심각한 욕설)
+            revision: 모델 revision (Hugging Face 브랜치/태그/커밋)
+            dtype: 가중치 dtype ('float32', 'float16', 'bfloat16')
+            early_exit: 중간 레이어 분류기로 확신이 충분하면 남은 레이어 생략 (결과에 exit_layer 추가)
+            exit_entropy: 조기 종료 기준 예측 엔트로피 (낮을수록 보수적, 0이면 항상 끝까지)
+            exits_path: 종료 분류기 파일 (기본: 모델 디렉토리 또는 cache_dir의 exits.pt)
         """
         self.base_threshold = threshold
         self.max_length = max_length
         self.use_dynamic_threshold = use_dynamic_threshold
+        self.rule_first = rule_first
         
-        # 모델 로더 초기화
+        # 조기 종료 (모델 로드 시 종료 분류기 구성)
+        self.early_exit = early_exit
+        self.exit_entropy = exit_entropy
+        self.exits_path = exits_path
+        self.exit_model = None
+        
+        # 단계별 처리 시간 (profile_stages=True일 때만 누적)
+        self.profile_stages = profile_stages
+        self.timing_stats = TimingAggregator()
+        
+        # 모델 로더 초기화 (torch/transformers는 이 시점에 로드)
+        from .model_loader import ModelLoader
         self.loader = ModelLoader(
             model_name=model_name,
-            cache_dir=cache_dir
+            cache_dir=cache_dir,
+            revision=revision,
+            dtype=dtype
         )
         
         self.tokenizer = None
         self.model = None
         self.device = None
+        self._model_handle = None
         
-        # 강도별 욕설 패턴
-        self.severe_patterns = {
-            '씨발', '시발', 'ㅅㅂ', '병신', 'ㅂㅅ', '개새', '개새끼',
-            '좆', '좃', '니미', '니엄마', '엿먹', '개같', '개 같',
-            '미친새끼', '미친놈', '미친년', '지랄', '염병', '썅',
-            '개자식', '개년', '개놈', '쓰레기새끼', '인간쓰레기'
-        }
-        
-        self.moderate_patterns = {
-            '짜증', '빡', '열받', '꺼져', '닥쳐', '엿같',
-            '죽이고 싶', '때리고 싶', '작살', '개빡', 
-            '미친', '미쳤', '돌았', '돌아버'
-        }
-        
-        # 화이트리스트 (정상 표현)
-        self.whitelist_patterns = {
-            '답답하', '답답합니다', '아쉽', '안타깝', 
-            '불편', '개선', '미친듯이 좋', '미친듯이 빠른',
-            '죽이는 맛', '죽이는 디자인'
-        }
-        
-        # 문맥 키워드 (문장 전체를 봐야 하는 경우)
-        self.context_negative = {
-            '답답': ['정말 답답', '너무 답답', '답답해 죽'],
-            '미친': ['미친놈', '미친새끼', '미쳤어'],
-        }
+        # 강도별 욕설/화이트리스트/문맥 사전 (data/lexicon/abusive.yaml)
+        # 파일이 바뀌면 자동으로 다시 컴파일되며 다른 감지기와 공유
+        self.lexicon = get_lexicon("abusive", lexicon_dir)
     
     def load_model(self):
         """모델 로드"""
@@ -74,25 +83,83 @@ class ImprovedAbusiveDetector:
             print("🤖 KcBERT 모델 초기화 중...")
             print("="*60 + "\n")
             
-            self.tokenizer, self.model = self.loader.load()
-            self.device = self.loader.get_device()
+            # 같은 모델(이름, revision, dtype, 백엔드, 디바이스)은 프로세스 안에서 한 번만 로드
+            self._model_handle = acquire_model(self.loader)
+            self.tokenizer = self._model_handle.tokenizer
+            self.model = self._model_handle.model
+            self.device = self._model_handle.device
+            
+            if self.early_exit:
+                self._load_exit_model()
             
             print("\n" + "="*60)
             print("✅ 모델 초기화 완료!")
             print("="*60 + "\n")
     
+    def _load_exit_model(self):
+        """모델 가중치를 공유하는 조기 종료 분류기 구성 (src/early_exit.py)"""
+        from .early_exit import EarlyExitClassifier, default_exits_path
+        
+        exits_path = self.exits_path or default_exits_path(
+            self.loader.model_name, self.loader.cache_dir
+        )
+        self.exit_model = EarlyExitClassifier.from_sequence_classifier(
+            self.model, exits_path, self.exit_entropy
+        )
+        self.exit_model.to(self.device)
+        self.exit_model.eval()
+        if self.exit_model.exit_layers:
+            print(f"🚪 조기 종료: 레이어 {self.exit_model.exit_layers}, 엔트로피 < {self.exit_entropy}")
+        else:
+            print(f"   ⚠️  종료 분류기 없음 ({exits_path}), 모든 레이어 실행")
+    
+    def close(self):
+        """공유 모델 참조 반납 (마지막 참조였으면 메모리 해제, 다시 predict하면 재로드)"""
+        if self._model_handle is not None:
+            release_model(self._model_handle)
+            self._model_handle = None
+        self.exit_model = None
+        self.tokenizer = None
+        self.model = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _start_timer(self):
+        """호출 단위 타이머 (측정이 꺼져 있으면 아무것도 하지 않는 타이머)"""
+        return StageTimer() if self.profile_stages else NULL_TIMER
+    
+    def _attach_timings(self, results: List[Dict[str, Any]], timer):
+        """단계별 시간을 결과에 추가하고 히스토그램에 누적 (배치는 건당 값)"""
+        if not timer.enabled:
+            return
+        
+        timings = timer.as_dict()
+        self.timing_stats.record(timings)
+        observe_stage_timings(type(self).__name__, timings)
+        per_item = timer.as_dict(divisor=len(results))
+        for result in results:
+            result["timings"] = dict(per_item)
+    
+    def get_timing_summary(self) -> Dict[str, Dict[str, Any]]:
+        """단계별 처리 시간 요약 (호출 수, 평균, p50/p95/p99, 버킷)"""
+        return self.timing_stats.summary()
+    
     def _check_whitelist(self, text: str) -> bool:
         """화이트리스트 체크 (정상 표현인지)"""
-        text_lower = text.lower()
-        return any(pattern in text_lower for pattern in self.whitelist_patterns)
+        return self.lexicon.scan(text).has_any("whitelist")
     
-    def _check_context_negative(self, text: str, keyword: str) -> bool:
+    def _check_context_negative(self, text: str, keyword: str, context=None) -> bool:
         """문맥상 부정적인지 확인"""
-        if keyword not in self.context_negative:
+        context = context if context is not None else self.lexicon.current().context
+        if keyword not in context:
             return False
         
         text_lower = text.lower()
-        return any(pattern in text_lower for pattern in self.context_negative[keyword])
+        return any(pattern in text_lower for pattern in context[keyword])
     
     def _check_rule_based_advanced(self, text: str) -> Dict[str, Any]:
         """
@@ -106,10 +173,12 @@ class ImprovedAbusiveDetector:
                 'is_whitelist': bool
             }
         """
-        text_lower = text.lower()
+        # 모든 단계를 한 번에 탐색 (갱신 중에도 같은 버전의 사전으로 끝까지 처리)
+        lexicon = self.lexicon.current()
+        scan = lexicon.scan(text)
         
         # 화이트리스트 체크
-        if self._check_whitelist(text):
+        if scan.has_any("whitelist"):
             return {
                 'score': 0.0,
                 'severe_count': 0,
@@ -117,24 +186,18 @@ class ImprovedAbusiveDetector:
                 'is_whitelist': True
             }
         
-        severe_count = 0
-        moderate_count = 0
-        
         # 심각한 욕설 체크
-        for pattern in self.severe_patterns:
-            if pattern in text_lower:
-                severe_count += 1
+        severe_count = len(scan.entries("severe"))
         
         # 중간 욕설 체크 (문맥 고려)
-        for pattern in self.moderate_patterns:
-            if pattern in text_lower:
-                # 문맥 확인
-                base_keyword = pattern.split()[0] if ' ' in pattern else pattern
-                if base_keyword in self.context_negative:
-                    if self._check_context_negative(text, base_keyword):
-                        moderate_count += 1
-                else:
+        moderate_count = 0
+        for pattern in scan.entries("moderate"):
+            base_keyword = pattern.split()[0] if ' ' in pattern else pattern
+            if base_keyword in lexicon.context:
+                if self._check_context_negative(text, base_keyword, lexicon.context):
                     moderate_count += 1
+            else:
+                moderate_count += 1
         
         # 점수 계산
         # 심각한 욕설: 개당 0.5점
@@ -225,52 +288,131 @@ class ImprovedAbusiveDetector:
         
         return model_score * model_weight + rule_score * rule_weight
     
-    def predict(self, text: str) -> Dict[str, Any]:
+    def _decide_by_rules(self, rule_info: Dict[str, Any]) -> Optional[bool]:
         """
-        개선된 단일 텍스트 예측
-        """
-        # 모델 로드
-        if self.model is None:
-            self.load_model()
+        모델 점수와 관계없이 판정이 확정되는지 확인
         
-        start_time = time.time()
+        화이트리스트/심각한 욕설 분기는 최종 점수가 모델 점수에 대해 증가하는 선형식이므로
+        모델 점수 0/1일 때가 하한/상한이다. 임계값은 신뢰도(0.5 ~ 1.0)에 따라 달라지므로
+        가능한 가장 불리한 임계값과 비교한다. 그 외 분기는 모델 점수에 따라 식이 바뀌므로 확정하지 않는다.
+        
+        Returns:
+            True(욕설 확정), False(정상 확정), None(모델 추론 필요)
+        """
+        if not (rule_info['is_whitelist'] or rule_info['severe_count'] >= 1):
+            return None
         
-        # 1. 고급 규칙 기반 체크
-        rule_info = self._check_rule_based_advanced(text)
         rule_score = rule_info['score']
+        # 이진 분류 softmax의 최대 확률이므로 신뢰도는 0.5 이상
+        thresholds = [
+            self._calculate_dynamic_threshold(rule_score, 0.0, confidence, rule_info)
+            for confidence in (0.5, 1.0)
+        ]
+        low = self._adjust_final_score(0.0, rule_score, 1.0, rule_info)
+        high = self._adjust_final_score(1.0, rule_score, 1.0, rule_info)
+        
+        if low >= max(thresholds):
+            return True
+        if high < min(thresholds):
+            return False
+        return None
+    
+    def _build_rule_result(self,
+                           text: str,
+                           rule_info: Dict[str, Any],
+                           is_abusive: bool) -> Dict[str, Any]:
+        """
+        규칙만으로 판정한 결과 (모델 점수 없음)
         
-        # 2. 모델 예측
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            max_length=self.max_length,
-            padding="max_length",
-            truncation=True
-        )
+        abusive_score는 욕설이면 가능한 최저 점수, 정상이면 가능한 최고 점수이며,
+        임계값은 판정에 사용한 가장 불리한 값이다.
+        """
+        rule_score = rule_info['score']
+        thresholds = [
+            self._calculate_dynamic_threshold(rule_score, 0.0, confidence, rule_info)
+            for confidence in (0.5, 1.0)
+        ]
         
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        return {
+            "text": text,
+            "is_abusive": is_abusive,
+            "confidence": 1.0,
+            "abusive_score": self._adjust_final_score(
+                0.0 if is_abusive else 1.0, rule_score, 1.0, rule_info
+            ),
+            "model_score": None,
+            "rule_score": rule_score,
+            "threshold": max(thresholds) if is_abusive else min(thresholds),
+            "processing_time": 0.0,
+            "decided_by": "rules",
+            "details": {
+                "severe_words": rule_info['severe_count'],
+                "moderate_words": rule_info['moderate_count'],
+                "is_whitelist": rule_info['is_whitelist'],
+                "dynamic_threshold_used": self.use_dynamic_threshold
+            }
+        }
+    
+    def _forward(self, texts: List[str], timer=NULL_TIMER) -> List[Tuple[float, float, Optional[int]]]:
+        """
+        모델 추론 (배치 단위로 한 번의 forward)
         
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
+        Returns:
+            [(욕설 확률, 신뢰도, 종료 레이어 (조기 종료가 꺼져 있으면 None)), ...]
+        """
+        import torch
+        
+        with timer.stage("tokenize"):
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="pt",
+                max_length=self.max_length,
+                padding="max_length",
+                truncation=True
+            )
+        
+        with timer.stage("forward"), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            if self.exit_model is not None:
+                logits, exit_layers = self.exit_model(**inputs)
+            else:
+                logits = self.model(**inputs).logits
+                exit_layers = [None] * len(texts)
+        
+        with timer.stage("postprocess"):
             probabilities = torch.nn.functional.softmax(logits, dim=-1)
-            abusive_prob = probabilities[0][1].item()
-            confidence = torch.max(probabilities).item()
+            abusive_probs = probabilities[:, 1].tolist()
+            confidences = torch.max(probabilities, dim=-1).values.tolist()
         
-        # 3. 최종 점수 계산
-        final_score = self._adjust_final_score(
-            abusive_prob, rule_score, confidence, rule_info
-        )
+        return list(zip(abusive_probs, confidences, exit_layers))
+    
+    def _build_result(self,
+                      text: str,
+                      rule_info: Dict[str, Any],
+                      abusive_prob: float,
+                      confidence: float,
+                      timer=NULL_TIMER,
+                      exit_layer: Optional[int] = None) -> Dict[str, Any]:
+        """
+        규칙/모델 점수로 최종 결과 구성
         
-        # 4. 동적 임계값 계산
-        threshold = self._calculate_dynamic_threshold(
-            rule_score, abusive_prob, confidence, rule_info
-        )
+        processing_time은 호출한 쪽에서 채운다.
+        exit_layer는 조기 종료가 켜져 있을 때만 결과에 추가한다.
+        """
+        rule_score = rule_info['score']
         
-        # 5. 처리 시간
-        processing_time = time.time() - start_time
+        with timer.stage("postprocess"):
+            # 3. 최종 점수 계산
+            final_score = self._adjust_final_score(
+                abusive_prob, rule_score, confidence, rule_info
+            )
+            
+            # 4. 동적 임계값 계산
+            threshold = self._calculate_dynamic_threshold(
+                rule_score, abusive_prob, confidence, rule_info
+            )
         
-        # 6. 결과 구성
+        # 5. 결과 구성
         result = {
             "text": text,
             "is_abusive": final_score >= threshold,
@@ -279,7 +421,8 @@ class ImprovedAbusiveDetector:
             "model_score": abusive_prob,
             "rule_score": rule_score,
             "threshold": threshold,
-            "processing_time": processing_time,
+            "processing_time": 0.0,
+            "decided_by": "model",
             "details": {
                 "severe_words": rule_info['severe_count'],
                 "moderate_words": rule_info['moderate_count'],
@@ -287,25 +430,144 @@ class ImprovedAbusiveDetector:
                 "dynamic_threshold_used": self.use_dynamic_threshold
             }
         }
+        if exit_layer is not None:
+            result["exit_layer"] = exit_layer
         
         return result
     
-    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """배치 예측"""
-        results = []
-        for text in texts:
-            result = self.predict(text)
-            results.append(result)
+    def predict(self, text: str) -> Dict[str, Any]:
+        """
+        개선된 단일 텍스트 예측
+        """
+        # 모델 로드 (rule_first면 모델이 필요할 때까지 미룸)
+        if self.model is None and not self.rule_first:
+            self.load_model()
+        
+        start_time = time.time()
+        timer = self._start_timer()
+        
+        # 1. 고급 규칙 기반 체크
+        with timer.stage("rules"):
+            rule_info = self._check_rule_based_advanced(text)
+        
+        decided = self._decide_by_rules(rule_info) if self.rule_first else None
+        if decided is None:
+            # 2. 모델 예측
+            if self.model is None:
+                self.load_model()
+            abusive_prob, confidence, exit_layer = self._forward([text], timer)[0]
+            result = self._build_result(text, rule_info, abusive_prob, confidence, timer, exit_layer)
+        else:
+            result = self._build_rule_result(text, rule_info, decided)
+        
+        # 6. 처리 시간
+        result["processing_time"] = time.time() - start_time
+        self._attach_timings([result], timer)
+        observe_predictions(type(self).__name__, [result], result["processing_time"])
+        
+        return result
+    
+    def predict_batch(self, texts: List[str], batch_size: int = 8) -> List[Dict[str, Any]]:
+        """
+        배치 예측 (batch_size개씩 한 번의 forward)
+        
+        각 결과의 processing_time은 해당 배치 시간을 건수로 나눈 값이다.
+        rule_first이면 규칙으로 확정된 텍스트를 먼저 빼고 나머지로 배치를 채운다.
+        """
+        if not self.rule_first:
+            if self.model is None:
+                self.load_model()
+            
+            results = []
+            for i in range(0, len(texts), batch_size):
+                chunk = texts[i:i + batch_size]
+                start_time = time.time()
+                timer = self._start_timer()
+                
+                with timer.stage("rules"):
+                    rule_infos = [self._check_rule_based_advanced(text) for text in chunk]
+                results.extend(
+                    self._predict_chunk(chunk, rule_infos, start_time, timer, batch_size)
+                )
+            return results
+        
+        # 규칙 우선 판정
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        start_time = time.time()
+        timer = self._start_timer()
+        
+        with timer.stage("rules"):
+            rule_infos = [self._check_rule_based_advanced(text) for text in texts]
+        
+        pending = []
+        decided_results = []
+        for j, rule_info in enumerate(rule_infos):
+            decided = self._decide_by_rules(rule_info)
+            if decided is None:
+                pending.append(j)
+            else:
+                results[j] = self._build_rule_result(texts[j], rule_info, decided)
+                decided_results.append(results[j])
+        
+        if decided_results:
+            rules_time = time.time() - start_time
+            for result in decided_results:
+                result["processing_time"] = rules_time / len(texts)
+            self._attach_timings(decided_results, timer)
+            observe_predictions(type(self).__name__, decided_results, rules_time, mode="rules")
+        
+        if pending and self.model is None:
+            self.load_model()
+        
+        # 남은 텍스트로 배치 구성
+        for i in range(0, len(pending), batch_size):
+            indices = pending[i:i + batch_size]
+            chunk_results = self._predict_chunk(
+                [texts[j] for j in indices], [rule_infos[j] for j in indices],
+                time.time(), self._start_timer(), batch_size
+            )
+            for j, result in zip(indices, chunk_results):
+                results[j] = result
+        
         return results
     
+    def _predict_chunk(self,
+                       chunk: List[str],
+                       rule_infos: List[Dict[str, Any]],
+                       start_time: float,
+                       timer,
+                       batch_size: int) -> List[Dict[str, Any]]:
+        """규칙 체크가 끝난 텍스트 묶음을 한 번의 forward로 처리"""
+        scores = self._forward(chunk, timer)
+        chunk_results = [
+            self._build_result(text, rule_info, abusive_prob, confidence, timer, exit_layer)
+            for text, rule_info, (abusive_prob, confidence, exit_layer)
+            in zip(chunk, rule_infos, scores)
+        ]
+        
+        chunk_time = time.time() - start_time
+        elapsed = chunk_time / len(chunk)
+        for result in chunk_results:
+            result["processing_time"] = elapsed
+        self._attach_timings(chunk_results, timer)
+        observe_predictions(type(self).__name__, chunk_results, chunk_time, batch_size)
+        return chunk_results
+    
     def predict_file(self, filepath: str) -> Dict[str, Any]:
         """파일에서 읽어서 예측"""
         from .preprocessor import TextPreprocessor
         
         preprocessor = TextPreprocessor()
+        preprocess_start = time.perf_counter()
         text = preprocessor.preprocess_file(filepath)
+        preprocess_ms = (time.perf_counter() - preprocess_start) * 1000
         
         result = self.predict(text)
         result["source_file"] = filepath
         
+        if self.profile_stages:
+            self.timing_stats.record({"preprocess": preprocess_ms})
+            observe_stage_timings(type(self).__name__, {"preprocess": preprocess_ms})
+            result["timings"] = {"preprocess": preprocess_ms, **result["timings"]}
+        
         return result
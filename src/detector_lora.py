@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+LoRA 어댑터 감지기
+기본 KcBERT 1개를 메모리에 두고 요청마다 어댑터(테넌트/실험별 fine-tuning)를 골라 추론
+
+- 어댑터는 finetune_issue_cases.py --lora로 학습 (src/adapters.py)
+- predict_batch에 텍스트별 어댑터를 넘기면 서로 다른 어댑터도 한 번의 forward로 처리
+- 어댑터를 주입한 모델은 일반 감지기와 공유하지 않음 (레지스트리 backend='lora'),
+  같은 기본 모델을 쓰는 LoraDetector끼리는 공유
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from .detector import AbusiveDetector
+from .timing import NULL_TIMER
+from .metrics import observe_predictions
+
+
+class LoraDetector(AbusiveDetector):
+    """기본 모델 1개 + LoRA 어댑터 여러 개를 쓰는 욕설/폭언 감지기"""
+
+    def __init__(self,
+                 model_name: str = "beomi/kcbert-base",
+                 adapters: Union[str, Dict[str, str], None] = "./models/adapters",
+                 default_adapter: Optional[str] = None,
+                 cache_dir: str = "./models/kcbert",
+                 threshold: float = 0.5,
+                 max_length: int = 300,
+                 profile_stages: bool = False,
+                 lexicon_dir: str = None,
+                 rule_first: bool = False,
+                 revision: str = None,
+                 dtype: str = None):
+        """
+        Args:
+            model_name: 어댑터를 학습한 기본 모델
+            adapters: {어댑터 이름: 경로} 또는 어댑터 디렉토리들이 있는 상위 디렉토리
+            default_adapter: 어댑터를 지정하지 않은 요청에 쓸 어댑터 (None=기본 모델)
+            나머지는 AbusiveDetector와 같음 (조기 종료는 어댑터별로 학습되지 않으므로 사용 안 함)
+        """
+        super().__init__(
+            model_name=model_name,
+            cache_dir=cache_dir,
+            threshold=threshold,
+            max_length=max_length,
+            profile_stages=profile_stages,
+            lexicon_dir=lexicon_dir,
+            rule_first=rule_first,
+            revision=revision,
+            dtype=dtype
+        )
+        # 어댑터를 주입하면 모듈이 바뀌므로 일반 감지기와 다른 레지스트리 키 사용
+        self.loader.backend = "lora"
+
+        if isinstance(adapters, str):
+            from .adapters import discover_adapters
+            adapters = discover_adapters(adapters)
+        self.adapters = dict(adapters or {})
+
+        if default_adapter is not None and default_adapter not in self.adapters:
+            raise ValueError(f"알 수 없는 어댑터: {default_adapter} (사용 가능: {list(self.adapters)})")
+        self.default_adapter = default_adapter
+
+    @property
+    def adapter_names(self) -> List[str]:
+        return list(self.adapters)
+
+    def load_model(self):
+        """기본 모델 로드 후 어댑터 추가 (공유 핸들의 모델을 PeftModel로 교체)"""
+        if self.model is not None:
+            return
+
+        super().load_model()
+        from .adapters import attach_adapters, adapter_base_model
+
+        base_name = os.path.basename(os.path.normpath(self.loader.model_name))
+        for name, path in self.adapters.items():
+            trained_on = adapter_base_model(path)
+            if trained_on and os.path.basename(os.path.normpath(trained_on)) != base_name:
+                print(f"   ⚠️  어댑터 {name}은 {trained_on}에서 학습됨 (현재 기본 모델: {self.loader.model_name})")
+
+        self._model_handle.model = attach_adapters(self._model_handle.model, self.adapters)
+        self.model = self._model_handle.model
+        print(f"🔌 LoRA 어댑터: {', '.join(self.adapters) or '없음'}")
+
+    def add_adapter(self, name: str, path: str):
+        """실행 중 어댑터 추가 (기본 모델은 다시 로드하지 않음)"""
+        self.adapters[name] = path
+        if self.model is not None:
+            from .adapters import attach_adapters
+            self._model_handle.model = attach_adapters(self.model, {name: path})
+            self.model = self._model_handle.model
+
+    def _resolve_adapters(self,
+                          adapters: Union[str, Sequence[Optional[str]], None],
+                          count: int) -> List[Optional[str]]:
+        """요청 어댑터 → 텍스트별 어댑터 이름 (None=기본 모델)"""
+        if adapters is None or isinstance(adapters, str):
+            names = [adapters or self.default_adapter] * count
+        else:
+            names = list(adapters)
+            if len(names) != count:
+                raise ValueError(f"adapters 길이 불일치: {len(names)} (텍스트 {count}개)")
+
+        unknown = {name for name in names if name is not None and name not in self.adapters}
+        if unknown:
+            raise ValueError(f"알 수 없는 어댑터: {sorted(unknown)} (사용 가능: {list(self.adapters)})")
+        return names
+
+    def _forward(self, texts: List[str], timer=NULL_TIMER) -> List[Tuple[float, float, Optional[int]]]:
+        """기본 어댑터로 추론"""
+        return self._forward_adapters(texts, [self.default_adapter] * len(texts), timer)
+
+    def _forward_adapters(self,
+                          texts: List[str],
+                          names: List[Optional[str]],
+                          timer=NULL_TIMER) -> List[Tuple[float, float, Optional[int]]]:
+        """
+        텍스트별 어댑터로 한 번의 forward
+
+        Returns:
+            [(욕설 확률, 신뢰도, None), ...] (AbusiveDetector._forward와 같은 형식)
+        """
+        import torch
+        from .adapters import adapter_names
+
+        with timer.stage("tokenize"):
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="pt",
+                max_length=self.max_length,
+                padding="max_length",
+                truncation=True
+            )
+
+        with timer.stage("forward"), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            logits = self.model(**inputs, adapter_names=adapter_names(names)).logits
+
+        with timer.stage("postprocess"):
+            probabilities = torch.nn.functional.softmax(logits, dim=-1)
+            abusive_probs = probabilities[:, 1].tolist()
+            confidences = torch.max(probabilities, dim=-1).values.tolist()
+
+        return [(prob, confidence, None) for prob, confidence in zip(abusive_probs, confidences)]
+
+    def predict(self, text: str, adapter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        단일 텍스트 예측
+
+        Args:
+            text: 입력 텍스트
+            adapter: 어댑터 이름 (None=default_adapter)
+        """
+        return self.predict_batch([text], batch_size=1, adapters=adapter)[0]
+
+    def predict_batch(self,
+                      texts: List[str],
+                      batch_size: int = 8,
+                      adapters: Union[str, Sequence[Optional[str]], None] = None) -> List[Dict[str, Any]]:
+        """
+        배치 예측 (어댑터가 섞인 요청도 batch_size개씩 한 번의 forward)
+
+        Args:
+            texts: 입력 텍스트 리스트
+            batch_size: 한 번에 추론할 텍스트 수
+            adapters: 전체에 쓸 어댑터 이름 또는 텍스트별 어댑터 이름 리스트 (None=default_adapter)
+
+        Returns:
+            감지 결과 리스트 (결과마다 adapter 추가)
+        """
+        names = self._resolve_adapters(adapters, len(texts))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        rule_scores: List[Optional[float]] = [None] * len(texts)
+        pending = list(range(len(texts)))
+
+        if self.rule_first:
+            pending = self._predict_by_rules(texts, results, rule_scores)
+
+        if pending and self.model is None:
+            self.load_model()
+
+        for i in range(0, len(pending), batch_size):
+            indices = pending[i:i + batch_size]
+            start_time = time.time()
+            timer = self._start_timer()
+
+            scores = self._forward_adapters([texts[j] for j in indices], [names[j] for j in indices], timer)
+            chunk_results = [
+                self._build_result(texts[j], abusive_prob, confidence, timer, rule_scores[j])
+                for j, (abusive_prob, confidence, _) in zip(indices, scores)
+            ]
+
+            chunk_time = time.time() - start_time
+            elapsed = chunk_time / len(indices)
+            for j, result in zip(indices, chunk_results):
+                result["processing_time"] = elapsed
+                results[j] = result
+            self._attach_timings(chunk_results, timer)
+            observe_predictions(type(self).__name__, chunk_results, chunk_time, batch_size)
+
+        for result, name in zip(results, names):
+            result["adapter"] = name
+        return results
@@ -2,12 +2,16 @@
 """
 다중 카테고리 감지기
 욕설/폭언, 성희롱을 동시에 판단
+
+multi_head=True이면 인코더 1회 실행으로 모든 카테고리 헤드 점수를 계산 (src/multi_head.py)
 """
 
-import re
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from .detector import AbusiveDetector
+from .timing import StageTimer, NULL_TIMER
+from .metrics import observe_predictions, observe_stage_timings
+from .lexicon import get_lexicon
 
 
 class MultiCategoryDetector(AbusiveDetector):
@@ -20,80 +24,70 @@ class MultiCategoryDetector(AbusiveDetector):
                  model_name: str = "beomi/kcbert-base",
                  cache_dir: str = "./models/kcbert",
                  threshold: float = 0.5,
-                 max_length: int = 300):
-        """초기화"""
+                 max_length: int = 300,
+                 profile_stages: bool = False,
+                 lexicon_dir: str = None,
+                 rule_first: bool = False,
+                 multi_head: bool = False,
+                 heads_path: str = None,
+                 revision: str = None,
+                 dtype: str = None,
+                 early_exit: bool = False,
+                 exit_entropy: float = 0.2,
+                 exits_path: str = None):
+        """
+        초기화
+        
+        Args:
+            multi_head: 인코더 1회 실행으로 욕설/성희롱/협박/모욕 헤드를 함께 계산
+                (rule_first는 적용되지 않음, 한 번의 forward로 모든 카테고리를 구하므로)
+            heads_path: 추가 헤드 파일 (기본: 모델 디렉토리 또는 cache_dir의 heads.pt)
+            revision, dtype: 모델 revision과 가중치 dtype (AbusiveDetector 참고)
+            early_exit, exit_entropy, exits_path: 조기 종료 설정 (AbusiveDetector 참고,
+                multi_head이면 적용되지 않음)
+        """
         super().__init__(
             model_name=model_name,
             cache_dir=cache_dir,
             threshold=threshold,
-            max_length=max_length
+            max_length=max_length,
+            profile_stages=profile_stages,
+            lexicon_dir=lexicon_dir,
+            rule_first=rule_first,
+            revision=revision,
+            dtype=dtype,
+            early_exit=early_exit and not multi_head,
+            exit_entropy=exit_entropy,
+            exits_path=exits_path
         )
         
-        # 성희롱 패턴 정의
-        self._init_harassment_patterns()
-    
-    def _init_harassment_patterns(self):
-        """성희롱 관련 패턴 초기화"""
-        
-        # 심각한 성희롱 (즉시 높은 점수)
-        self.severe_harassment_patterns = [
-            r'강간', r'성폭행', r'성관계', r'성행위',
-            r'몸\s*만지', r'몸\s*[봐보]', r'옷\s*벗',
-            r'가슴\s*만지', r'엉덩이\s*만지',
-            r'키스\s*[하해]', r'포옹\s*[하해]'
-        ]
+        # 성희롱 사전 (data/lexicon/harassment.yaml, 자동 갱신)
+        self.harassment_lexicon = get_lexicon("harassment", lexicon_dir)
         
-        # 중간 수준 성희롱
-        self.moderate_harassment_patterns = [
-            # 성적 제안/암시
-            r'같이\s*자[자요자요]', r'호텔\s*가[자요]', r'모텔',
-            r'원나잇', r'섹스', r'잠자리', r'밤\s*같이',
-            
-            # 신체 언급
-            r'가슴', r'엉덩이', r'몸매', r'바디',
-            r'섹시하?[네다요]', r'색시하?[네다요]',
-            r'스타일\s*좋', r'몸\s*좋',
-            
-            # 외모 평가 (과도한)
-            r'이쁘?[다네요].*같이', r'예쁘?[다네요].*같이',
-            r'귀엽?[다네요].*같이',
-            
-            # 개인적 질문 (복합)
-            r'남자친구.*있[어냐니]', r'여자친구.*있[어냐니]',
-            r'혼자.*[사살]?[냐니].*같이',
-            
-            # 은어/비속어
-            r'꼬시', r'작업\s*걸', r'헌팅', r'픽업',
-            r'[따]?먹[어을]'  # 성적 의미
-        ]
+        # 멀티 헤드 (모델 로드 시 생성)
+        self.multi_head = multi_head
+        self.heads_path = heads_path
+        self.head_model = None
+    
+    def load_model(self):
+        """모델 로드 (multi_head이면 인코더를 공유하는 헤드 모델도 구성)"""
+        super().load_model()
         
-        # 경미한 성희롱 (단독으로는 낮은 점수, 복합 시 상승)
-        self.minor_harassment_patterns = [
-            # 외모 평가 (단독)
-            r'예쁘?[네다요]', r'이쁘?[네다요]', r'귀엽?[네다요]',
-            r'잘\s*생[겼기]', r'멋[있지]',
+        if self.multi_head and self.head_model is None:
+            from .multi_head import MultiHeadClassifier, default_heads_path
             
-            # 개인적 질문 (단독)
-            r'결혼.*했?[어니냐]', r'나이.*몇',
-            r'사[는니].*어디', r'집.*어디',
-            
-            # 칭찬 (과도한)
-            r'매력[적있]', r'멋[지있]', r'끌[려리]'
-        ]
-        
-        # 화이트리스트 (오탐 방지)
-        self.harassment_whitelist = [
-            r'섹시한?\s*디자인',  # 제품 설명
-            r'섹시한?\s*이미지',
-            r'섹시한?\s*컨셉',
-            r'예쁘?게\s*포장',  # 서비스 표현
-            r'예쁘?게\s*만[들들]',
-            r'예쁘?[다네]\s*제품',
-            r'예쁘?[다네]\s*상품',
-            r'귀엽?[다네]\s*디자인',
-            r'스타일\s*좋[은은].*제품',  # 제품 평가
-            r'몸매\s*좋[은은].*디자인'   # 디자인 표현
-        ]
+            heads_path = self.heads_path or default_heads_path(
+                self.loader.model_name, self.loader.cache_dir
+            )
+            self.head_model = MultiHeadClassifier.from_sequence_classifier(self.model, heads_path)
+            self.head_model.to(self.device)
+            self.head_model.eval()
+            print(f"🧩 멀티 헤드: {', '.join(self.head_model.head_names)}")
+    
+    def close(self):
+        """공유 모델 참조 반납 (헤드 모델도 함께 해제)"""
+        self.head_model = None
+        super().close()
     
     def predict(self, text: str) -> Dict[str, Any]:
         """
@@ -105,18 +99,175 @@ class MultiCategoryDetector(AbusiveDetector):
         Returns:
             욕설/폭언 + 성희롱 감지 결과
         """
+        if self.multi_head:
+            return self._predict_multi_head([text])[0]
+        
         start_time = time.time()
         
         # 기존 욕설/폭언 감지
         abusive_result = super().predict(text)
         
         # 성희롱 감지
+        harassment_start = time.perf_counter()
         harassment_result = self._detect_sexual_harassment(text)
+        harassment_time = time.perf_counter() - harassment_start
         
         # 전체 처리 시간
         total_time = time.time() - start_time
         
-        # 결과 통합
+        result = self._build_multi_result(text, abusive_result, harassment_result, total_time)
+        self._attach_harassment_timing([result], [abusive_result], harassment_time)
+        
+        return result
+    
+    def predict_batch(self, texts: List[str], batch_size: int = 8) -> List[Dict[str, Any]]:
+        """
+        다중 카테고리 배치 예측
+        
+        욕설/폭언은 batch_size개씩 한 번의 forward로 처리하고,
+        성희롱은 텍스트별 패턴 매칭으로 판단한다.
+        rule_first이면 규칙으로 확정된 텍스트를 뺀 나머지로 배치를 채우도록
+        전체 텍스트를 한 번에 넘긴다.
+        """
+        if not texts:
+            return []
+        if self.multi_head:
+            return self._predict_multi_head(texts, batch_size)
+        
+        abusive_results = super().predict_batch(texts, batch_size=batch_size)
+        harassment_start = time.perf_counter()
+        harassment_results = [self._detect_sexual_harassment(text) for text in texts]
+        harassment_time = time.perf_counter() - harassment_start
+        
+        # 건당 시간 = 욕설/폭언 건당 시간 + 성희롱 매칭 건당 시간
+        harassment_elapsed = harassment_time / len(texts)
+        results = [
+            self._build_multi_result(
+                text, abusive_result, harassment_result,
+                abusive_result['processing_time'] + harassment_elapsed
+            )
+            for text, abusive_result, harassment_result
+            in zip(texts, abusive_results, harassment_results)
+        ]
+        self._attach_harassment_timing(results, abusive_results, harassment_time)
+        
+        return results
+    
+    def _forward_heads(self, texts: List[str], timer=NULL_TIMER) -> List[Dict[str, Tuple[float, float]]]:
+        """
+        인코더 1회 실행으로 모든 헤드 점수 계산
+        
+        Returns:
+            [{헤드 이름: (양성 확률, 신뢰도)}, ...]
+        """
+        import torch
+        
+        with timer.stage("tokenize"):
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="pt",
+                max_length=self.max_length,
+                padding="max_length",
+                truncation=True
+            )
+        
+        with timer.stage("forward"), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            head_logits = self.head_model(**inputs)
+        
+        with timer.stage("postprocess"):
+            scores = [{} for _ in texts]
+            for name, logits in head_logits.items():
+                probabilities = torch.nn.functional.softmax(logits, dim=-1)
+                positive_probs = probabilities[:, 1].tolist()
+                confidences = torch.max(probabilities, dim=-1).values.tolist()
+                for score, prob, confidence in zip(scores, positive_probs, confidences):
+                    score[name] = (prob, confidence)
+        
+        return scores
+    
+    def _predict_multi_head(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        멀티 헤드 예측 (batch_size개씩 인코더 1회 실행)
+        
+        Args:
+            texts: 입력 텍스트 리스트
+            batch_size: 배치 크기 (None이면 단건 호출)
+        """
+        if self.model is None:
+            self.load_model()
+        
+        results = []
+        step = batch_size or 1
+        for i in range(0, len(texts), step):
+            chunk = texts[i:i + step]
+            start_time = time.time()
+            timer = self._start_timer()
+            
+            head_scores = self._forward_heads(chunk, timer)
+            head_probs = [{name: prob for name, (prob, _) in scores.items()} for scores in head_scores]
+            
+            abusive_results = [
+                self._build_result(text, scores["abuse"][0], scores["abuse"][1], timer)
+                for text, scores in zip(chunk, head_scores)
+            ]
+            
+            harassment_start = time.perf_counter()
+            harassment_results = [
+                self._detect_sexual_harassment(text, probs.get("harassment"))
+                for text, probs in zip(chunk, head_probs)
+            ]
+            harassment_time = time.perf_counter() - harassment_start
+            
+            chunk_time = time.time() - start_time
+            elapsed = chunk_time / len(chunk)
+            chunk_results = [
+                self._build_multi_result(text, abusive_result, harassment_result, elapsed, probs)
+                for text, abusive_result, harassment_result, probs
+                in zip(chunk, abusive_results, harassment_results, head_probs)
+            ]
+            
+            self._attach_timings(abusive_results, timer)
+            observe_predictions(type(self).__name__, abusive_results, chunk_time, batch_size)
+            self._attach_harassment_timing(chunk_results, abusive_results, harassment_time)
+            results.extend(chunk_results)
+        
+        return results
+    
+    def _attach_harassment_timing(self,
+                                  results: List[Dict[str, Any]],
+                                  abusive_results: List[Dict[str, Any]],
+                                  harassment_time: float):
+        """욕설/폭언 단계별 시간에 성희롱 패턴 매칭 시간 추가"""
+        if not self.profile_stages:
+            return
+        
+        timer = StageTimer()
+        timer.add("harassment", harassment_time)
+        timings = timer.as_dict()
+        self.timing_stats.record(timings)
+        observe_stage_timings(type(self).__name__, timings)
+        
+        per_item = timer.as_dict(divisor=len(results))
+        for result, abusive_result in zip(results, abusive_results):
+            result["timings"] = {**abusive_result.get("timings", {}), **per_item}
+    
+    def _build_multi_result(self,
+                            text: str,
+                            abusive_result: Dict[str, Any],
+                            harassment_result: Dict[str, Any],
+                            total_time: float,
+                            head_scores: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        욕설/폭언 결과와 성희롱 결과 통합
+        
+        head_scores(멀티 헤드)가 있으면 협박/모욕 등 추가 헤드도 카테고리에 반영한다.
+        """
+        extra_scores = {
+            name: prob for name, prob in (head_scores or {}).items()
+            if name not in ("abuse", "harassment")
+        }
+        
         result = {
             # 원본 텍스트
             "text": text,
@@ -134,17 +285,20 @@ class MultiCategoryDetector(AbusiveDetector):
             # 전체 부적절성
             "is_inappropriate": (
                 abusive_result['is_abusive'] or 
-                harassment_result['is_harassment']
+                harassment_result['is_harassment'] or
+                any(prob >= 0.5 for prob in extra_scores.values())
             ),
             "max_severity": max(
                 abusive_result['abusive_score'],
-                harassment_result['harassment_score']
+                harassment_result['harassment_score'],
+                *extra_scores.values()
             ),
             
             # 카테고리
             "categories": self._categorize_issues(
                 abusive_result['abusive_score'],
-                harassment_result['harassment_score']
+                harassment_result['harassment_score'],
+                extra_scores
             ),
             
             # 상세 정보
@@ -157,46 +311,43 @@ class MultiCategoryDetector(AbusiveDetector):
             
             # 기타 정보
             "threshold": self.threshold,
-            "processing_time": total_time
+            "processing_time": total_time,
+            "decided_by": abusive_result.get('decided_by', 'model')
         }
+        if "exit_layer" in abusive_result:
+            result["exit_layer"] = abusive_result["exit_layer"]
+        
+        if head_scores is not None:
+            result["head_scores"] = head_scores
+            result["details"]["harassment_model_score"] = harassment_result.get('model_score')
         
         return result
     
-    def _detect_sexual_harassment(self, text: str) -> Dict[str, Any]:
-        """성희롱 감지"""
+    def _detect_sexual_harassment(self, text: str, model_score: Optional[float] = None) -> Dict[str, Any]:
+        """
+        성희롱 감지
+        
+        Args:
+            text: 입력 텍스트
+            model_score: 성희롱 헤드 확률 (멀티 헤드, 없으면 패턴 매칭만 사용)
+        """
+        
+        # 모든 단계를 한 번에 탐색
+        scan = self.harassment_lexicon.scan(text)
         
         # 화이트리스트 체크 (정상적인 표현)
-        for pattern in self.harassment_whitelist:
-            if re.search(pattern, text, re.IGNORECASE):
-                return {
-                    "is_harassment": False,
-                    "harassment_score": 0.0,
-                    "level": "정상",
-                    "matched_words": []
-                }
-        
-        # 패턴 매칭
-        severe_matches = []
-        moderate_matches = []
-        minor_matches = []
-        
-        # 심각한 성희롱
-        for pattern in self.severe_harassment_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                severe_matches.extend(matches)
-        
-        # 중간 수준
-        for pattern in self.moderate_harassment_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                moderate_matches.extend(matches)
-        
-        # 경미한 수준
-        for pattern in self.minor_harassment_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                minor_matches.extend(matches)
+        if scan.has_any("whitelist"):
+            return {
+                "is_harassment": False,
+                "harassment_score": 0.0,
+                "level": "정상",
+                "matched_words": []
+            }
+        
+        # 패턴 매칭 (심각/중간/경미)
+        severe_matches = scan.matched_texts("severe")
+        moderate_matches = scan.matched_texts("moderate")
+        minor_matches = scan.matched_texts("minor")
         
         # 점수 계산
         score, level = self._calculate_harassment_score(
@@ -205,15 +356,38 @@ class MultiCategoryDetector(AbusiveDetector):
             len(minor_matches)
         )
         
+        # 성희롱 헤드 점수와 결합 (욕설/폭언과 같은 방식)
+        if model_score is not None:
+            score = self._combine_scores(model_score, score)
+            level = self._harassment_level(score)
+        
         # 매칭된 단어
         all_matches = severe_matches + moderate_matches + minor_matches
         
-        return {
+        result = {
             "is_harassment": score >= 0.5,
             "harassment_score": score,
             "level": level,
             "matched_words": list(set(all_matches))  # 중복 제거
         }
+        if model_score is not None:
+            result["model_score"] = model_score
+        return result
+    
+    @staticmethod
+    def _harassment_level(score: float) -> str:
+        """점수 → 성희롱 수준 (_calculate_harassment_score의 점수 구간과 동일)"""
+        if score >= 0.9:
+            return "매우 심각"
+        if score >= 0.8:
+            return "심각"
+        if score >= 0.65:
+            return "경고"
+        if score >= 0.5:
+            return "주의"
+        if score >= 0.3:
+            return "의심"
+        return "정상"
     
     def _calculate_harassment_score(
         self, 
@@ -258,9 +432,10 @@ class MultiCategoryDetector(AbusiveDetector):
     def _categorize_issues(
         self, 
         abusive_score: float, 
-        harassment_score: float
+        harassment_score: float,
+        extra_scores: Optional[Dict[str, float]] = None
     ) -> List[str]:
-        """이슈 카테고리 분류"""
+        """이슈 카테고리 분류 (extra_scores: 멀티 헤드의 추가 카테고리 확률)"""
         categories = []
         
         if abusive_score >= 0.5:
@@ -269,6 +444,12 @@ class MultiCategoryDetector(AbusiveDetector):
         if harassment_score >= 0.5:
             categories.append("성희롱")
         
+        if extra_scores:
+            from .multi_head import HEAD_LABELS
+            for name, prob in extra_scores.items():
+                if prob >= 0.5:
+                    categories.append(HEAD_LABELS.get(name, name))
+        
         if not categories:
             categories.append("정상")
         
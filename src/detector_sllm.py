@@ -5,7 +5,46 @@ GGUF 형식 모델 사용 (llama.cpp)
 
 import time
 import os
-from typing import Dict, Any, List
+import json
+import math
+import hashlib
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from .metrics import CACHE_REQUESTS, CONTEXTS_BUSY, observe_predictions
+
+
+# 구조화 출력용 GBNF 문법 (응답 형식을 강제하여 파싱 실패 제거)
+# {tail} 자리에 출력 범위에 따라 뒤따르는 필드가 들어간다.
+_RESPONSE_GRAMMAR = r'''
+root ::= "점수: " score {tail}
+score ::= "0." [0-9] [0-9]? | "1.0"
+labels ::= "\n판단: " judgment "\n카테고리: " category
+judgment ::= "부적절" | "정상"
+category ::= "욕설" | "모욕" | "성희롱" | "위협" | "복합" | "없음"
+reason ::= "\n이유: " [^\n]+
+'''
+
+# logprob 모드: assistant 응답을 이 접두사로 고정하고 다음 토큰의 판단 레이블 확률을 읽는다
+_LOGPROB_PREFIX = "판단:"
+_LOGPROB_LABELS = (" 부적절", " 정상")
+
+# 프롬프트 KV 캐시 파일 형식: 매직 + JSON 헤더 한 줄 + 원시 바이트
+# (pickle은 파일이 바뀌면 로드 시 임의 코드가 실행되므로 사용하지 않음)
+_PROMPT_CACHE_MAGIC = b"KCBERT-SLLM-KV\x01\n"
+_PROMPT_CACHE_SUFFIX = ".kvcache"
+
+# logprob 보정값 파일 (모델 파일 옆에 저장, fit_logprob_calibration → 생성자에서 로드)
+_CALIBRATION_SUFFIX = ".logprob_calibration.json"
+
+# 출력 범위별 (문법 꼬리, 최대 생성 토큰 수)
+_STRUCTURED_FIELDS = {
+    "full": ("labels reason", 256),   # 점수/판단/카테고리/이유
+    "labels": ("labels", 32),         # 이유 생략
+    "score": ("", 8),                 # 점수만 생성하고 즉시 종료
+}
 
 
 class SLLMAbusiveDetector:
@@ -19,7 +58,15 @@ class SLLMAbusiveDetector:
                  threshold: float = 0.5,
                  n_ctx: int = 2048,
                  n_threads: int = None,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 use_prompt_cache: bool = True,
+                 prompt_cache_dir: Optional[str] = "./models/cache",
+                 output_mode: str = "text",
+                 structured_fields: str = "full",
+                 n_parallel: int = 1,
+                 logprob_temperature: Optional[float] = None,
+                 logprob_bias: Optional[float] = None,
+                 logprob_calibration_path: Optional[str] = None):
         """
         Args:
             model_path: GGUF 모델 파일 경로
@@ -27,14 +74,58 @@ class SLLMAbusiveDetector:
             n_ctx: 컨텍스트 길이
             n_threads: CPU 스레드 수 (None=자동)
             verbose: 상세 로그 출력
+            use_prompt_cache: system 프롬프트 KV 캐시 재사용 여부
+            prompt_cache_dir: KV 캐시 파일 저장 디렉토리 (None=메모리에만 유지)
+            output_mode: 출력 방식 ('text'=자유 생성 후 파싱, 'grammar'=GBNF 문법으로 형식 강제,
+                'logprob'=생성 없이 판단 레이블 로그확률로 점수 산출)
+            structured_fields: grammar 모드의 출력 범위
+                ('full'=이유 포함, 'labels'=점수/판단/카테고리, 'score'=점수만)
+            n_parallel: 동시에 디코딩할 컨텍스트 수 (가중치는 mmap으로 공유,
+                스레드는 컨텍스트마다 n_threads / n_parallel 씩 배분)
+            logprob_temperature, logprob_bias: logprob 모드 보정값
+                (None이면 보정 파일 값, 파일이 없으면 1.0 / 0.0)
+            logprob_calibration_path: 보정 파일 경로
+                (None이면 <모델 파일명>.logprob_calibration.json)
         """
+        if output_mode not in ("text", "grammar", "logprob"):
+            raise ValueError(f"지원하지 않는 output_mode입니다: {output_mode}")
+        if n_parallel < 1:
+            raise ValueError(f"n_parallel은 1 이상이어야 합니다: {n_parallel}")
+        if structured_fields not in _STRUCTURED_FIELDS:
+            raise ValueError(
+                f"지원하지 않는 structured_fields입니다: {structured_fields} "
+                f"(지원: {', '.join(_STRUCTURED_FIELDS)})"
+            )
+        
         self.model_path = model_path
         self.threshold = threshold
         self.n_ctx = n_ctx
         self.n_threads = n_threads or os.cpu_count()
         self.verbose = verbose
+        self.use_prompt_cache = use_prompt_cache
+        self.prompt_cache_dir = prompt_cache_dir
+        self.output_mode = output_mode
+        self.structured_fields = structured_fields
+        self.n_parallel = n_parallel
+        self.logprob_calibration_path = logprob_calibration_path or (
+            os.path.splitext(model_path)[0] + _CALIBRATION_SUFFIX
+        )
+        self.logprob_temperature = 1.0
+        self.logprob_bias = 0.0
+        self.logprob_calibration_source = None  # 'file' / 'fit' / 'args' / None
+        self.threads_per_context = max(1, self.n_threads // n_parallel)
         
         self.llm = None
+        self._grammar = None
+        
+        # 추론 컨텍스트 풀 (각 슬롯: {'llm', 'grammar'}), load_model 시 생성
+        self._contexts = []
+        self._slots = queue.Queue()
+        
+        # system 프롬프트 KV 캐시 (load_model 시 준비)
+        self._prefix_tokens = None
+        self._prefix_state = None
+        self.prefix_cache_source = None  # 'disk' / 'eval' / None
         
         # 프롬프트 템플릿
         self.system_prompt = """당신은 고객 서비스 품질 관리 및 통화 분석 전문가입니다.
@@ -76,6 +167,13 @@ class SLLMAbusiveDetector:
 카테고리: [욕설/모욕/성희롱/위협/복합/없음]
 이유: [문맥과 의도를 고려한 구체적 판단 근거]"""
         
+        if logprob_temperature is not None or logprob_bias is not None:
+            self.logprob_temperature = 1.0 if logprob_temperature is None else logprob_temperature
+            self.logprob_bias = 0.0 if logprob_bias is None else logprob_bias
+            self.logprob_calibration_source = "args"
+        elif output_mode == "logprob":
+            self._load_logprob_calibration()
+        
     def load_model(self):
         """모델 로드"""
         if self.llm is None:
@@ -99,20 +197,460 @@ class SLLMAbusiveDetector:
             print(f"📦 모델: {os.path.basename(self.model_path)}")
             print(f"🧵 스레드: {self.n_threads}")
             print(f"📝 컨텍스트: {self.n_ctx}")
+            if self.n_parallel > 1:
+                print(f"🔀 병렬 컨텍스트: {self.n_parallel}개 "
+                      f"(컨텍스트당 {self.threads_per_context} 스레드)")
+            if self.output_mode == "logprob":
+                if self.logprob_calibration_source:
+                    print(f"📐 logprob 보정: T={self.logprob_temperature:.3f}, "
+                          f"b={self.logprob_bias:.3f} ({self.logprob_calibration_source})")
+                else:
+                    print("📐 logprob 보정 없음 (calibrate_sllm_logprob.py로 생성)")
             print()
             
-            self.llm = Llama(
-                model_path=self.model_path,
-                n_ctx=self.n_ctx,
-                n_threads=self.n_threads,
-                verbose=self.verbose,
-                n_gpu_layers=0  # CPU only (GPU 사용 시 값 조정)
-            )
+            self.llm = self._create_llm(Llama)
+            
+            if self.use_prompt_cache:
+                self._init_prefix_cache()
+            
+            self._grammar = self._create_grammar()
+            self._contexts = [{"llm": self.llm, "grammar": self._grammar}]
+            
+            # 추가 컨텍스트는 같은 GGUF 파일을 mmap하므로 가중치 메모리를 공유하고
+            # KV 캐시만 따로 가진다. system 프롬프트 KV 상태도 그대로 복사한다.
+            for _ in range(self.n_parallel - 1):
+                llm = self._create_llm(Llama)
+                if self._prefix_state is not None:
+                    llm.load_state(self._prefix_state)
+                self._contexts.append({"llm": llm, "grammar": self._create_grammar()})
+            
+            for context in self._contexts:
+                self._slots.put(context)
             
             print(f"\n{'='*60}")
             print("✅ sLLM 모델 로딩 완료!")
             print(f"{'='*60}\n")
     
+    def _create_llm(self, llama_cls):
+        """추론 컨텍스트 하나 생성"""
+        return llama_cls(
+            model_path=self.model_path,
+            n_ctx=self.n_ctx,
+            n_threads=self.threads_per_context,
+            verbose=self.verbose,
+            use_mmap=True,  # 여러 컨텍스트가 같은 가중치 페이지를 공유
+            # logprob 모드는 scores에서 마지막 토큰 로짓을 읽으므로 토큰별 로짓 보관
+            # (0.3.x는 logits_all 없이 scores를 토큰별로 채우지 않음)
+            logits_all=self.output_mode == "logprob",
+            n_gpu_layers=0  # CPU only (GPU 사용 시 값 조정)
+        )
+    
+    def _create_grammar(self):
+        """grammar 모드용 문법 객체 생성 (파싱 상태를 가지므로 컨텍스트마다 별도)"""
+        if self.output_mode != "grammar":
+            return None
+        
+        from llama_cpp import LlamaGrammar
+        return LlamaGrammar.from_string(self._build_grammar(), verbose=self.verbose)
+    
+    @contextmanager
+    def _acquire_context(self):
+        """유휴 컨텍스트를 하나 빌려서 사용 후 반납 (스레드 안전)"""
+        context = self._slots.get()
+        model_name = os.path.basename(self.model_path)
+        CONTEXTS_BUSY.inc(model=model_name)
+        try:
+            yield context
+        finally:
+            CONTEXTS_BUSY.dec(model=model_name)
+            self._slots.put(context)
+    
+    def _build_grammar(self) -> str:
+        """structured_fields에 맞는 GBNF 문법 문자열"""
+        tail, _ = _STRUCTURED_FIELDS[self.structured_fields]
+        return _RESPONSE_GRAMMAR.replace("{tail}", tail).strip()
+    
+    def _get_generation_kwargs(self, grammar=None) -> Dict[str, Any]:
+        """출력 방식에 따른 생성 파라미터"""
+        kwargs = {
+            "temperature": 0.1,  # 낮은 온도로 일관성 확보
+            "top_p": 0.9,
+            "stop": ["<|im_end|>", "\n\n\n"],
+            "echo": False,
+        }
+        
+        if self.output_mode == "grammar":
+            # 문법이 끝나면 EOS만 허용되므로 필요한 필드만 생성하고 종료
+            _, max_tokens = _STRUCTURED_FIELDS[self.structured_fields]
+            kwargs["max_tokens"] = max_tokens
+            kwargs["grammar"] = grammar
+        else:
+            kwargs["max_tokens"] = 256
+        
+        return kwargs
+    
+    def _build_system_prefix(self) -> str:
+        """고정 system 프롬프트 부분 (모든 호출에서 동일 → KV 캐시 대상)"""
+        return f"<|im_start|>system\n{self.system_prompt}<|im_end|>\n"
+    
+    def _build_user_section(self, text: str) -> str:
+        """호출마다 달라지는 user/assistant 부분"""
+        return f"""<|im_start|>user
+다음 통화 내용을 종합적으로 분석해주세요.
+명시적 표현뿐만 아니라 문맥과 의도를 깊이 파악하여 점수를 매겨주세요.
+
+통화 내용:
+"{text}"
+
+위 내용에서:
+1. 욕설, 모욕, 폭언, 성희롱 등의 부적절한 표현이 있나요?
+2. 직접적 표현이 없더라도 그러한 의도가 담겨있나요?
+3. 전체 맥락에서 발화자의 태도와 의도는 어떤가요?
+<|im_end|>
+<|im_start|>assistant
+"""
+    
+    def _build_prompt(self, text: str) -> str:
+        """전체 프롬프트 구성"""
+        return self._build_system_prefix() + self._build_user_section(text)
+    
+    def _get_prompt_cache_path(self) -> str:
+        """
+        KV 캐시 파일 경로
+        
+        모델 파일(경로/크기/수정시각), 컨텍스트 길이, system 프롬프트가
+        하나라도 바뀌면 다른 파일명이 되므로 오래된 캐시를 잘못 쓰지 않는다.
+        """
+        stat = os.stat(self.model_path)
+        key_source = "\n".join([
+            os.path.abspath(self.model_path),
+            str(stat.st_size),
+            str(int(stat.st_mtime)),
+            str(self.n_ctx),
+            self._build_system_prefix(),
+        ])
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+        model_base = os.path.splitext(os.path.basename(self.model_path))[0]
+        return os.path.join(self.prompt_cache_dir, f"{model_base}.{key}{_PROMPT_CACHE_SUFFIX}")
+    
+    @staticmethod
+    def _encode_state(state) -> bytes:
+        """
+        LlamaState → 파일 바이트
+        
+        헤더에 배열 dtype/shape, 상태 크기, 본문 SHA-256을 기록한다.
+        """
+        input_ids = state.input_ids
+        scores = state.scores
+        llama_state = bytes(state.llama_state)
+        payload = input_ids.tobytes() + scores.tobytes() + llama_state
+        header = {
+            "n_tokens": int(state.n_tokens),
+            "input_ids": {"dtype": input_ids.dtype.str, "shape": list(input_ids.shape)},
+            "scores": {"dtype": scores.dtype.str, "shape": list(scores.shape)},
+            "llama_state_size": int(state.llama_state_size),
+            "llama_state_bytes": len(llama_state),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        }
+        return _PROMPT_CACHE_MAGIC + json.dumps(header).encode("utf-8") + b"\n" + payload
+    
+    @staticmethod
+    def _decode_state(data: bytes) -> Dict[str, Any]:
+        """
+        파일 바이트 → LlamaState 생성 인자
+        
+        Raises:
+            ValueError: 형식이 다르거나 체크섬이 맞지 않는 경우
+        """
+        import numpy as np  # llama-cpp-python 의존성
+        
+        if not data.startswith(_PROMPT_CACHE_MAGIC):
+            raise ValueError("프롬프트 캐시 형식이 아닙니다")
+        header_end = data.index(b"\n", len(_PROMPT_CACHE_MAGIC))
+        header = json.loads(data[len(_PROMPT_CACHE_MAGIC):header_end].decode("utf-8"))
+        payload = memoryview(data)[header_end + 1:]
+        if hashlib.sha256(payload).hexdigest() != header["sha256"]:
+            raise ValueError("체크섬이 일치하지 않습니다")
+        
+        arrays = {}
+        offset = 0
+        for name in ("input_ids", "scores"):
+            spec = header[name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            arrays[name] = np.frombuffer(
+                payload, dtype=dtype, count=count, offset=offset
+            ).reshape(spec["shape"]).copy()
+            offset += count * dtype.itemsize
+        
+        llama_state = bytes(payload[offset:])
+        if len(llama_state) != header["llama_state_bytes"]:
+            raise ValueError("상태 크기가 헤더와 다릅니다")
+        
+        return {
+            "input_ids": arrays["input_ids"],
+            "scores": arrays["scores"],
+            "n_tokens": header["n_tokens"],
+            "llama_state": llama_state,
+            "llama_state_size": header["llama_state_size"],
+        }
+    
+    def _load_prefix_state_from_disk(self, cache_path: str):
+        """디스크의 KV 캐시 로드 (토큰이 일치하지 않으면 None)"""
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            from llama_cpp import LlamaState
+            with open(cache_path, 'rb') as f:
+                state = LlamaState(**self._decode_state(f.read()))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"   ⚠️  프롬프트 캐시 로드 실패, 다시 생성합니다: {e}")
+            return None
+        
+        n = len(self._prefix_tokens)
+        if state.n_tokens != n or state.input_ids[:n].tolist() != self._prefix_tokens:
+            return None
+        
+        return state
+    
+    def _save_prefix_state_to_disk(self, cache_path: str):
+        """KV 캐시를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self._encode_state(self._prefix_state))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"   ⚠️  프롬프트 캐시 저장 실패: {e}")
+    
+    def _init_prefix_cache(self):
+        """
+        system 프롬프트 KV 캐시 준비
+        
+        디스크 캐시가 있으면 그대로 복원하고, 없으면 system 프롬프트를
+        한 번만 평가한 뒤 KV 상태를 저장한다.
+        """
+        prefix = self._build_system_prefix()
+        self._prefix_tokens = self.llm.tokenize(
+            prefix.encode("utf-8"), add_bos=True, special=True
+        )
+        
+        cache_path = None
+        state = None
+        if self.prompt_cache_dir:
+            cache_path = self._get_prompt_cache_path()
+            state = self._load_prefix_state_from_disk(cache_path)
+        
+        if state is not None:
+            self.llm.load_state(state)
+            self._prefix_state = state
+            self.prefix_cache_source = "disk"
+            CACHE_REQUESTS.inc(cache="sllm_prompt_disk", result="hit")
+            print(f"⚡ 프롬프트 캐시 복원: {len(self._prefix_tokens)} 토큰 (평가 생략)")
+            return
+        
+        start_time = time.time()
+        self.llm.reset()
+        self.llm.eval(self._prefix_tokens)
+        state = self.llm.save_state()
+        # 접두사 뒤에는 항상 새 토큰을 평가하므로 접두사 logits는 마지막 행만 보관
+        state.scores = state.scores[-1:].copy()
+        self._prefix_state = state
+        self.prefix_cache_source = "eval"
+        if cache_path:
+            CACHE_REQUESTS.inc(cache="sllm_prompt_disk", result="miss")
+        
+        print(f"⚡ 프롬프트 캐시 생성: {len(self._prefix_tokens)} 토큰 "
+              f"({time.time() - start_time:.2f}초)")
+        
+        if cache_path:
+            self._save_prefix_state_to_disk(cache_path)
+    
+    def _restore_prefix(self, llm):
+        """
+        추론 직전 system 프롬프트 KV 상태 보장
+        
+        현재 컨텍스트가 이미 접두사로 시작하면 llama.cpp가 일치 구간을
+        그대로 재사용하므로 복원하지 않는다.
+        """
+        if self._prefix_state is None:
+            return
+        
+        n = len(self._prefix_tokens)
+        if llm.n_tokens >= n and llm.input_ids[:n].tolist() == self._prefix_tokens:
+            CACHE_REQUESTS.inc(cache="sllm_prompt_kv", result="hit")
+            return
+        
+        # 접두사 재평가 대신 저장된 상태 복원 (평가는 생략되지만 복사 비용 발생)
+        CACHE_REQUESTS.inc(cache="sllm_prompt_kv", result="restore")
+        llm.load_state(self._prefix_state)
+    
+    @staticmethod
+    def _common_prefix_length(a: List[int], b: List[int]) -> int:
+        """두 토큰 시퀀스의 공통 접두사 길이"""
+        n = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            n += 1
+        return n
+    
+    def _label_logprob_margin(self, llm, text: str) -> Dict[str, float]:
+        """
+        판단 레이블 로그확률 계산 (단일 forward)
+        
+        assistant 응답을 '판단:'으로 고정한 뒤, '부적절'과 '정상'이 갈라지는
+        첫 토큰 위치의 다음 토큰 분포에서 두 레이블의 로그확률을 읽는다.
+        
+        Returns:
+            {'margin': log p(부적절) - log p(정상), 'label_mass': 두 레이블 확률 합}
+        """
+        prompt = self._build_prompt(text) + _LOGPROB_PREFIX
+        bad_label, ok_label = _LOGPROB_LABELS
+        bad_tokens = llm.tokenize((prompt + bad_label).encode("utf-8"), add_bos=True, special=True)
+        ok_tokens = llm.tokenize((prompt + ok_label).encode("utf-8"), add_bos=True, special=True)
+        
+        n_common = self._common_prefix_length(bad_tokens, ok_tokens)
+        eval_tokens = bad_tokens[:n_common]
+        
+        # system 프롬프트 등 이미 평가된 접두사는 KV 캐시를 그대로 재사용
+        self._restore_prefix(llm)
+        n_past = self._common_prefix_length(
+            llm.input_ids[:llm.n_tokens].tolist(), eval_tokens[:-1]
+        )
+        llm.n_tokens = n_past
+        llm.eval(eval_tokens[n_past:])
+        
+        import numpy as np  # llama-cpp-python 의존성
+        
+        logits = llm.scores[llm.n_tokens - 1, :]
+        max_logit = float(logits.max())
+        log_z = max_logit + math.log(float(np.exp(logits - max_logit).sum()))
+        
+        bad_logprob = float(logits[bad_tokens[n_common]]) - log_z
+        ok_logprob = float(logits[ok_tokens[n_common]]) - log_z
+        
+        return {
+            "margin": bad_logprob - ok_logprob,
+            "label_mass": math.exp(bad_logprob) + math.exp(ok_logprob),
+        }
+    
+    def _calibrate(self, margin: float) -> float:
+        """로그확률 차이 → 보정된 부적절 확률 (Platt scaling)"""
+        z = margin / self.logprob_temperature + self.logprob_bias
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+    
+    def _calibration_key(self) -> str:
+        """보정값이 유효한 조건 (모델 파일명 + 프롬프트), 바뀌면 보정 파일을 쓰지 않음"""
+        key_source = "\n".join([
+            os.path.basename(self.model_path),
+            self._build_prompt("") + _LOGPROB_PREFIX,
+            "".join(_LOGPROB_LABELS),
+        ])
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+    
+    def _load_logprob_calibration(self) -> bool:
+        """보정 파일이 있고 현재 모델/프롬프트와 맞으면 온도/편향 적용"""
+        path = self.logprob_calibration_path
+        if not os.path.exists(path):
+            return False
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            temperature = float(data["temperature"])
+            bias = float(data["bias"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  logprob 보정 파일을 읽지 못해 기본값을 사용합니다 ({path}): {e}")
+            return False
+        
+        if data.get("key") != self._calibration_key():
+            print(f"⚠️  logprob 보정 파일이 현재 모델/프롬프트와 맞지 않아 사용하지 않습니다: {path}")
+            return False
+        if temperature <= 0:
+            print(f"⚠️  logprob 보정 온도가 올바르지 않습니다 ({temperature}): {path}")
+            return False
+        
+        self.logprob_temperature = temperature
+        self.logprob_bias = bias
+        self.logprob_calibration_source = "file"
+        return True
+    
+    def save_logprob_calibration(self, path: Optional[str] = None, **extra) -> str:
+        """현재 온도/편향을 보정 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = path or self.logprob_calibration_path
+        data = {
+            "temperature": self.logprob_temperature,
+            "bias": self.logprob_bias,
+            "model": os.path.basename(self.model_path),
+            "key": self._calibration_key(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        data.update(extra)
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+    
+    def fit_logprob_calibration(self,
+                                texts: List[str],
+                                labels: List[int],
+                                epochs: int = 500,
+                                lr: float = 0.1,
+                                save: bool = True) -> Dict[str, float]:
+        """
+        레이블된 데이터로 logprob 모드 보정값(온도, 편향) 학습
+        
+        Args:
+            texts: 입력 텍스트 리스트
+            labels: 정답 (1=부적절, 0=정상)
+            epochs: 경사하강 반복 수
+            lr: 학습률
+            save: 보정 파일로 저장 (다음 생성 시 자동 로드)
+            
+        Returns:
+            {'temperature': float, 'bias': float}
+        """
+        if self.llm is None:
+            self.load_model()
+        
+        with self._acquire_context() as context:
+            margins = [self._label_logprob_margin(context["llm"], t)["margin"] for t in texts]
+        
+        # sigmoid(a * margin + b)의 로그 손실 최소화
+        a, b = 1.0, 0.0
+        n = len(margins)
+        for _ in range(epochs):
+            grad_a = grad_b = 0.0
+            for m, y in zip(margins, labels):
+                z = a * m + b
+                p = 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+                grad_a += (p - y) * m
+                grad_b += (p - y)
+            a -= lr * grad_a / n
+            b -= lr * grad_b / n
+        
+        # 온도가 음수/0이 되지 않도록 최소값 보장
+        a = max(a, 1e-3)
+        self.logprob_temperature = 1.0 / a
+        self.logprob_bias = b
+        self.logprob_calibration_source = "fit"
+        
+        if save:
+            path = self.save_logprob_calibration(n_samples=n)
+            print(f"💾 logprob 보정값 저장: {path}")
+        
+        return {"temperature": self.logprob_temperature, "bias": self.logprob_bias}
+    
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """
         LLM 응답 파싱
@@ -129,6 +667,7 @@ class SLLMAbusiveDetector:
         is_abusive = False
         category = "없음"
         reason = ""
+        parse_ok = False
         
         for line in lines:
             line = line.strip()
@@ -139,6 +678,7 @@ class SLLMAbusiveDetector:
                     score = float(score_str)
                     # 점수가 0.5 이상이면 부적절로 판단
                     is_abusive = score >= self.threshold
+                    parse_ok = True
                 except:
                     pass
             
@@ -157,7 +697,8 @@ class SLLMAbusiveDetector:
             'score': score,
             'is_abusive': is_abusive,
             'category': category,
-            'reason': reason
+            'reason': reason,
+            'parse_ok': parse_ok
         }
     
     def predict(self, text: str) -> Dict[str, Any]:
@@ -169,33 +710,17 @@ class SLLMAbusiveDetector:
         
         start_time = time.time()
         
-        # 프롬프트 구성
-        prompt = f"""<|im_start|>system
-{self.system_prompt}<|im_end|>
-<|im_start|>user
-다음 통화 내용을 종합적으로 분석해주세요.
-명시적 표현뿐만 아니라 문맥과 의도를 깊이 파악하여 점수를 매겨주세요.
-
-통화 내용:
-"{text}"
-
-위 내용에서:
-1. 욕설, 모욕, 폭언, 성희롱 등의 부적절한 표현이 있나요?
-2. 직접적 표현이 없더라도 그러한 의도가 담겨있나요?
-3. 전체 맥락에서 발화자의 태도와 의도는 어떤가요?
-<|im_end|>
-<|im_start|>assistant
-"""
+        if self.output_mode == "logprob":
+            return self._predict_logprob(text, start_time)
         
-        # LLM 추론
-        response = self.llm(
-            prompt,
-            max_tokens=256,
-            temperature=0.1,  # 낮은 온도로 일관성 확보
-            top_p=0.9,
-            stop=["<|im_end|>", "\n\n\n"],
-            echo=False
-        )
+        # 프롬프트 구성 (system 부분은 KV 캐시에서 재사용)
+        prompt = self._build_prompt(text)
+        
+        # LLM 추론 (유휴 컨텍스트 하나를 빌려 사용)
+        with self._acquire_context() as context:
+            llm = context["llm"]
+            self._restore_prefix(llm)
+            response = llm(prompt, **self._get_generation_kwargs(context["grammar"]))
         
         response_text = response['choices'][0]['text'].strip()
         
@@ -216,18 +741,67 @@ class SLLMAbusiveDetector:
             "model_type": "sLLM",
             "model_name": os.path.basename(self.model_path),
             "reason": parsed['reason'],
-            "raw_response": response_text
+            "raw_response": response_text,
+            "output_mode": self.output_mode,
+            "parse_ok": parsed['parse_ok'],  # False면 점수는 기본값 0.5
+            "generated_tokens": response.get('usage', {}).get('completion_tokens')
         }
         
+        observe_predictions(type(self).__name__, [result], processing_time)
+        
+        return result
+    
+    def _predict_logprob(self, text: str, start_time: float) -> Dict[str, Any]:
+        """logprob 모드 예측 (텍스트 생성 없이 한 번의 forward로 점수 산출)"""
+        with self._acquire_context() as context:
+            label_info = self._label_logprob_margin(context["llm"], text)
+        
+        score = self._calibrate(label_info["margin"])
+        processing_time = time.time() - start_time
+        
+        result = {
+            "text": text,
+            "is_abusive": score >= self.threshold,
+            "confidence": max(score, 1.0 - score),  # 보정된 확률 기준 신뢰도
+            "abusive_score": score,
+            "category": "미분류",  # logprob 모드는 카테고리를 생성하지 않음
+            "threshold": self.threshold,
+            "processing_time": processing_time,
+            "model_type": "sLLM",
+            "model_name": os.path.basename(self.model_path),
+            "reason": "",
+            "raw_response": "",
+            "output_mode": self.output_mode,
+            "parse_ok": True,
+            "generated_tokens": 0,
+            "logprob_margin": label_info["margin"],
+            "label_mass": label_info["label_mass"],  # 낮으면 모델이 다른 토큰을 예상한 것
+            "calibration": self.logprob_calibration_source  # None이면 보정 전 점수
+        }
+        
+        observe_predictions(type(self).__name__, [result], processing_time)
+        
         return result
     
     def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """배치 예측"""
-        results = []
-        for text in texts:
-            result = self.predict(text)
-            results.append(result)
-        return results
+        """
+        배치 예측
+        
+        n_parallel > 1이면 컨텍스트 풀에서 여러 건을 동시에 디코딩한다.
+        llama.cpp 호출 중에는 GIL이 해제되므로 스레드로 병렬 처리된다.
+        """
+        if self.llm is None:
+            self.load_model()
+        
+        if self.n_parallel <= 1 or len(texts) <= 1:
+            results = []
+            for text in texts:
+                result = self.predict(text)
+                results.append(result)
+            return results
+        
+        with ThreadPoolExecutor(max_workers=self.n_parallel) as executor:
+            return list(executor.map(self.predict, texts))
     
     def predict_file(self, filepath: str) -> Dict[str, Any]:
         """파일에서 읽어서 예측"""
@@ -243,5 +817,6 @@ class SLLMAbusiveDetector:
     
     def __del__(self):
         """소멸자 - 모델 정리"""
-        if self.llm is not None:
+        self._contexts = []
+        if getattr(self, 'llm', None) is not None:
             del self.llm
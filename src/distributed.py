@@ -0,0 +1,154 @@
+"""
+CPU 멀티 프로세스 데이터 병렬 학습 모듈
+로컬 프로세스 N개를 gloo 백엔드 DDP로 묶어 학습 (finetune_issue_cases.py --nproc N)
+
+- torch.multiprocessing.spawn으로 프로세스를 띄우고 torchrun과 같은 환경변수
+  (RANK, LOCAL_RANK, WORLD_SIZE, MASTER_ADDR, MASTER_PORT)를 설정 → Trainer가 DDP로 실행
+- 프로세스마다 intra-op 스레드를 코어 수 / N개로 나눠 코어를 겹치지 않게 사용
+- 처리량은 전체 프로세스 합계로 집계하고, 단일 프로세스 결과와 비교해 확장 효율 계산
+"""
+
+import glob
+import json
+import os
+import socket
+import sys
+from typing import Any, Callable, Dict, Optional
+
+
+def threads_per_process(nproc: int, cpu_count: Optional[int] = None) -> int:
+    """프로세스당 intra-op 스레드 수 (코어를 프로세스 수로 나눔)"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // nproc)
+
+
+def world_size() -> int:
+    return int(os.environ.get("WORLD_SIZE", 1))
+
+
+def is_main_process() -> bool:
+    """rank 0 또는 단일 프로세스"""
+    return int(os.environ.get("RANK", 0)) == 0
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _worker(rank: int, fn: Callable, nproc: int, threads: int, args: Any):
+    """spawn된 프로세스 진입점"""
+    os.environ["RANK"] = str(rank)
+    os.environ["LOCAL_RANK"] = str(rank)
+    os.environ["WORLD_SIZE"] = str(nproc)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    from .thread_tuning import apply_thread_settings
+    apply_thread_settings(threads, 1)
+
+    # 진행 출력은 rank 0만 (오류는 stderr로 모든 rank 출력)
+    if rank != 0:
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+
+    fn(args)
+
+
+def launch(fn: Callable, nproc: int, args: Any, threads: Optional[int] = None):
+    """
+    fn(args)를 로컬 프로세스 nproc개로 실행 (모든 프로세스가 끝날 때까지 대기)
+
+    fn은 spawn된 프로세스에서 다시 import되므로 모듈 최상위 함수여야 한다.
+
+    Args:
+        fn: 학습 함수 (Trainer를 만드는 쪽, TrainingArguments(ddp_backend='gloo'))
+        nproc: 프로세스 수
+        args: fn 인자 (pickle 가능해야 함)
+        threads: 프로세스당 스레드 수 (None=코어 수 / nproc)
+    """
+    import torch.multiprocessing as mp
+
+    threads = threads or threads_per_process(nproc)
+    os.environ.setdefault("MASTER_ADDR", "127.0.0.1")
+    os.environ.setdefault("MASTER_PORT", str(_free_port()))
+
+    print(f"🚀 DDP(gloo) 학습: 프로세스 {nproc}개 × 스레드 {threads}개")
+    mp.spawn(_worker, args=(fn, nproc, threads, args), nprocs=nproc, join=True)
+
+
+def all_reduce_throughput(throughput):
+    """
+    프로세스별 TokenThroughput을 전체 합계로 집계 (분산 실행이 아니면 그대로)
+
+    예제/토큰 수는 합, 학습 시간은 가장 느린 프로세스 기준.
+    """
+    import torch.distributed as dist
+
+    if not (dist.is_available() and dist.is_initialized()):
+        return throughput
+
+    import torch
+
+    counts = torch.tensor(
+        [throughput.examples, throughput.effective_tokens, throughput.padded_tokens],
+        dtype=torch.float64
+    )
+    seconds = torch.tensor([throughput.seconds], dtype=torch.float64)
+    dist.all_reduce(counts)
+    dist.all_reduce(seconds, op=dist.ReduceOp.MAX)
+
+    throughput.examples, throughput.effective_tokens, throughput.padded_tokens = (
+        int(value) for value in counts.tolist()
+    )
+    throughput.seconds = float(seconds.item())
+    return throughput
+
+
+def find_baseline(results_dir: str, match: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    비교할 단일 프로세스 학습 결과 (가장 최근 것)
+
+    Args:
+        results_dir: 결과 JSON 디렉토리 (finetuning_result_*.json)
+        match: 같아야 하는 결과 항목 (모델, 배치 구성 등)
+
+    Returns:
+        결과 딕셔너리 (+ 'path'), 없으면 None
+    """
+    paths = sorted(glob.glob(os.path.join(results_dir, "finetuning_result_*.json")), reverse=True)
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        distributed = result.get("distributed") or {}
+        if distributed.get("nproc") != 1 or not distributed.get("train_samples_per_sec"):
+            continue
+        if all(result.get(key) == value for key, value in match.items()):
+            result["path"] = path
+            return result
+    return None
+
+
+def scaling_report(nproc: int,
+                   samples_per_sec: float,
+                   baseline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    확장 효율 = N 프로세스 처리량 / (N × 단일 프로세스 처리량)
+
+    Returns:
+        {'speedup', 'scaling_efficiency', 'baseline'} (기준 결과가 없으면 None 값)
+    """
+    if baseline is None:
+        return {"baseline": None, "speedup": None, "scaling_efficiency": None}
+
+    base = baseline["distributed"]["train_samples_per_sec"]
+    speedup = samples_per_sec / base
+    return {
+        "baseline": baseline["path"],
+        "baseline_samples_per_sec": base,
+        "speedup": speedup,
+        "scaling_efficiency": speedup / nproc,
+    }
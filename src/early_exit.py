@@ -0,0 +1,291 @@
+"""
+조기 종료(early exit) 추론 모듈
+중간 레이어에 가벼운 분류기를 붙이고, 예측 엔트로피가 기준보다 낮으면 남은 레이어를 건너뜀
+
+- 분류기는 exits.pt에서 로드 (레이어 하나 = [CLS] → Linear+tanh → Linear(hidden, 2))
+- 마지막 레이어는 기존 pooler + classifier를 그대로 사용 (끝까지 가면 기존 점수와 동일)
+- 배치에서는 종료한 문장을 빼고 남은 문장만 다음 레이어로 진행 (문장마다 종료 레이어가 다름)
+- 분류기 학습은 finetune_issue_cases.py --early-exit (인코더는 고정)
+"""
+
+import os
+import torch
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+EXITS_FILENAME = "exits.pt"
+EXITS_FORMAT_VERSION = 1
+
+# 분류기를 붙일 레이어 (1부터, kcbert-base는 12층)
+DEFAULT_EXIT_LAYERS = (2, 4, 6, 8, 10)
+
+# 종료 기준 엔트로피 (nats, 2클래스 최대값은 ln 2 ≈ 0.693)
+DEFAULT_EXIT_ENTROPY = 0.2
+
+
+def default_exits_path(model_name: str, cache_dir: str) -> str:
+    """
+    종료 분류기 파일 기본 경로
+
+    로컬 모델 디렉토리(fine-tuned 모델)면 그 안, 아니면 캐시 디렉토리의 exits.pt
+    """
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, EXITS_FILENAME)
+    return os.path.join(cache_dir, EXITS_FILENAME)
+
+
+def prediction_entropy(logits: torch.Tensor) -> torch.Tensor:
+    """로짓별 예측 엔트로피 [batch]"""
+    log_probs = torch.log_softmax(logits.float(), dim=-1)
+    return -(log_probs.exp() * log_probs).sum(dim=-1)
+
+
+class ExitClassifier(torch.nn.Module):
+    """중간 레이어 분류기 ([CLS] 표현 → pooler → 2클래스)"""
+
+    def __init__(self, hidden_size: int, num_labels: int = 2):
+        super().__init__()
+        self.dense = torch.nn.Linear(hidden_size, hidden_size)
+        self.classifier = torch.nn.Linear(hidden_size, num_labels)
+
+    def forward(self, cls_states: torch.Tensor) -> torch.Tensor:
+        """
+        Args:
+            cls_states: [batch, hidden] ([CLS] 위치의 hidden state)
+        """
+        return self.classifier(torch.tanh(self.dense(cls_states)))
+
+
+def load_exits(path: str, hidden_size: int) -> Dict[int, ExitClassifier]:
+    """
+    exits.pt에서 종료 분류기 로드 (파일이 없으면 빈 딕셔너리)
+
+    파일 형식:
+        {'version': 1, 'hidden_size': 768,
+         'exits': {4: {'dense.weight': ..., 'dense.bias': ..., 'classifier.weight': ..., ...}}}
+
+    Raises:
+        ValueError: 인코더와 hidden_size가 다른 경우
+    """
+    if not os.path.exists(path):
+        return {}
+
+    state = torch.load(path, map_location="cpu", weights_only=True)
+    if state.get("hidden_size") != hidden_size:
+        raise ValueError(
+            f"{path}: hidden_size 불일치 (분류기 {state.get('hidden_size')}, 인코더 {hidden_size})"
+        )
+
+    exits = {}
+    for layer, params in state.get("exits", {}).items():
+        exit_head = ExitClassifier(hidden_size, params["classifier.weight"].shape[0])
+        exit_head.load_state_dict(params)
+        exits[int(layer)] = exit_head
+    return exits
+
+
+def save_exits(path: str, exits: Dict[int, torch.nn.Module], hidden_size: int):
+    """종료 분류기 저장 (같은 모델로 함께 학습한 분류기 묶음이므로 기존 파일을 덮어씀)"""
+    state = {
+        "version": EXITS_FORMAT_VERSION,
+        "hidden_size": hidden_size,
+        "exits": {
+            int(layer): {k: v.detach().cpu() for k, v in exit_head.state_dict().items()}
+            for layer, exit_head in exits.items()
+        },
+    }
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class EarlyExitClassifier(torch.nn.Module):
+    """레이어를 하나씩 실행하며 확신이 충분한 문장은 중간에 종료하는 분류기"""
+
+    def __init__(self,
+                 model: torch.nn.Module,
+                 exits: Dict[int, torch.nn.Module],
+                 entropy_threshold: float = DEFAULT_EXIT_ENTROPY):
+        super().__init__()
+        self.model = model
+        self.encoder = getattr(model, model.base_model_prefix)
+        self.exits = torch.nn.ModuleDict({str(layer): head for layer, head in exits.items()})
+        self.entropy_threshold = entropy_threshold
+
+    @classmethod
+    def from_sequence_classifier(cls,
+                                 model,
+                                 exits_path: str,
+                                 entropy_threshold: float = DEFAULT_EXIT_ENTROPY) -> "EarlyExitClassifier":
+        """
+        BertForSequenceClassification에서 생성
+
+        인코더와 최종 classifier는 원본 모델과 가중치를 공유하므로 메모리는 분류기만큼만 늘어난다.
+        """
+        exits = load_exits(exits_path, model.config.hidden_size)
+        dtype = next(model.parameters()).dtype
+        for exit_head in exits.values():
+            exit_head.to(dtype=dtype)
+        return cls(model, exits, entropy_threshold)
+
+    @property
+    def num_layers(self) -> int:
+        return len(self.encoder.encoder.layer)
+
+    @property
+    def exit_layers(self) -> List[int]:
+        return sorted(int(layer) for layer in self.exits.keys())
+
+    def forward(self,
+                input_ids: torch.Tensor,
+                attention_mask: torch.Tensor,
+                token_type_ids: Optional[torch.Tensor] = None) -> Tuple[torch.Tensor, List[int]]:
+        """
+        Returns:
+            (logits [batch, 2], 문장별 종료 레이어 리스트 (1부터, 끝까지 가면 num_layers))
+        """
+        batch_size = input_ids.size(0)
+        hidden = self.encoder.embeddings(input_ids=input_ids, token_type_ids=token_type_ids)
+        mask = self.encoder.get_extended_attention_mask(attention_mask, input_ids.shape)
+
+        logits = hidden.new_zeros(batch_size, self.model.config.num_labels)
+        exit_layers = [self.num_layers] * batch_size
+        active = torch.arange(batch_size, device=input_ids.device)  # 아직 진행 중인 문장 번호
+
+        for layer_num, layer in enumerate(self.encoder.encoder.layer, start=1):
+            outputs = layer(hidden, attention_mask=mask)
+            hidden = outputs[0] if isinstance(outputs, tuple) else outputs
+
+            key = str(layer_num)
+            if layer_num == self.num_layers or key not in self.exits or self.entropy_threshold <= 0:
+                continue
+
+            exit_logits = self.exits[key](hidden[:, 0])
+            done = prediction_entropy(exit_logits) < self.entropy_threshold
+            if not done.any():
+                continue
+
+            logits[active[done]] = exit_logits[done]
+            for index in active[done].tolist():
+                exit_layers[index] = layer_num
+
+            keep = ~done
+            if not keep.any():
+                return logits, exit_layers
+            active, hidden, mask = active[keep], hidden[keep], mask[keep]
+
+        logits[active] = self.model.classifier(self.encoder.pooler(hidden))
+        return logits, exit_layers
+
+
+def collect_exit_states(model,
+                        tokenizer,
+                        texts: Sequence[str],
+                        layers: Sequence[int],
+                        batch_size: int = 16,
+                        max_length: int = 300,
+                        device: str = "cpu") -> Tuple[Dict[int, torch.Tensor], torch.Tensor]:
+    """
+    레이어별 [CLS] 표현과 최종 로짓을 한 번에 계산
+
+    인코더는 학습하지 않으므로 이 값만 있으면 분류기 학습/평가를 인코더 없이 반복할 수 있다.
+
+    Returns:
+        ({레이어: [N, hidden]}, 최종 로짓 [N, 2])
+    """
+    states = {layer: [] for layer in layers}
+    final_logits = []
+
+    model.eval()
+    with torch.no_grad():
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(
+                [str(text) for text in texts[i:i + batch_size]],
+                return_tensors="pt",
+                max_length=max_length,
+                padding=True,
+                truncation=True
+            )
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+            outputs = model(**inputs, output_hidden_states=True)
+            # hidden_states[0]은 임베딩, hidden_states[n]은 n번째 레이어 출력
+            for layer in layers:
+                states[layer].append(outputs.hidden_states[layer][:, 0].float().cpu())
+            final_logits.append(outputs.logits.float().cpu())
+
+    return {layer: torch.cat(chunks) for layer, chunks in states.items()}, torch.cat(final_logits)
+
+
+def train_exits(states: Dict[int, torch.Tensor],
+                labels: Sequence[int],
+                epochs: int = 30,
+                learning_rate: float = 1e-3,
+                batch_size: int = 16,
+                seed: int = 42) -> Dict[int, ExitClassifier]:
+    """
+    캐시한 [CLS] 표현으로 레이어별 종료 분류기 학습 (교차 엔트로피)
+
+    Args:
+        states: collect_exit_states의 레이어별 표현
+        labels: 정답 (0=정상, 1=부적절)
+    """
+    torch.manual_seed(seed)
+    targets = torch.as_tensor(labels, dtype=torch.long)
+
+    exits = {}
+    for layer, features in states.items():
+        exit_head = ExitClassifier(features.size(1))
+        optimizer = torch.optim.AdamW(exit_head.parameters(), lr=learning_rate)
+        exit_head.train()
+        for _ in range(epochs):
+            order = torch.randperm(len(targets))
+            for i in range(0, len(order), batch_size):
+                batch = order[i:i + batch_size]
+                loss = torch.nn.functional.cross_entropy(exit_head(features[batch]), targets[batch])
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+        exit_head.eval()
+        exits[layer] = exit_head
+    return exits
+
+
+def evaluate_exits(exits: Dict[int, ExitClassifier],
+                   states: Dict[int, torch.Tensor],
+                   final_logits: torch.Tensor,
+                   labels: Sequence[int],
+                   num_layers: int,
+                   thresholds: Sequence[float] = (0.05, 0.1, 0.2, 0.3, 0.4)) -> List[Dict[str, float]]:
+    """
+    엔트로피 기준별 정확도와 평균 종료 레이어 (캐시한 표현으로 계산, 인코더 실행 없음)
+
+    Returns:
+        [{'threshold', 'accuracy', 'avg_exit_layer', 'layer_ratio'}, ...]
+        layer_ratio는 평균 실행 레이어 / 전체 레이어 (인코더 비용 비율)
+    """
+    targets = torch.as_tensor(labels, dtype=torch.long)
+    with torch.no_grad():
+        exit_logits = {layer: exits[layer](states[layer]) for layer in sorted(exits)}
+        exit_entropy = {layer: prediction_entropy(logits) for layer, logits in exit_logits.items()}
+
+    report = []
+    for threshold in thresholds:
+        preds = final_logits.argmax(dim=-1).clone()
+        layers_used = torch.full((len(targets),), num_layers, dtype=torch.float)
+        pending = torch.ones(len(targets), dtype=torch.bool)
+        for layer in sorted(exit_logits):
+            done = pending & (exit_entropy[layer] < threshold)
+            preds[done] = exit_logits[layer][done].argmax(dim=-1)
+            layers_used[done] = layer
+            pending &= ~done
+
+        avg_layer = layers_used.mean().item()
+        report.append({
+            "threshold": threshold,
+            "accuracy": (preds == targets).float().mean().item(),
+            "avg_exit_layer": avg_layer,
+            "layer_ratio": avg_layer / num_layers,
+        })
+    return report
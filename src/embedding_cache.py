@@ -0,0 +1,182 @@
+"""
+인코더 임베딩 디스크 캐시
+고정된 KcBERT 인코더의 pooled output을 텍스트별로 한 번만 계산해 memmap 파일로 저장
+
+- 분류 헤드만 학습할 때(finetune_issue_cases.py --fast-train) 인코더를 다시 실행하지 않음
+- 캐시 위치는 모델 가중치(경로/크기/수정시각), revision, max_length마다 다름 (모델이 바뀌면 새 캐시)
+- 텍스트 단위 캐시이므로 학습 데이터에 케이스를 추가하면 새 텍스트만 계산
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .metrics import CACHE_REQUESTS
+
+
+DEFAULT_EMBEDDING_CACHE_DIR = "./models/cache/embeddings"
+
+EMBEDDINGS_FILENAME = "embeddings.f32"
+INDEX_FILENAME = "index.json"
+
+# 로컬 모델 지문에 포함할 파일 (가중치와 설정)
+WEIGHT_SUFFIXES = (".safetensors", ".bin", "config.json")
+
+
+def text_key(text: str) -> str:
+    """텍스트 캐시 키"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_fingerprint(model_name: str, revision: Optional[str] = None, max_length: int = 300) -> str:
+    """
+    모델 지문
+
+    로컬 디렉토리는 가중치 파일의 크기/수정시각을 포함하므로 다시 fine-tuning하면 지문이 바뀐다.
+    """
+    parts = [model_name, str(revision), str(max_length)]
+    if os.path.isdir(model_name):
+        parts[0] = os.path.abspath(model_name)
+        for filename in sorted(os.listdir(model_name)):
+            if filename.endswith(WEIGHT_SUFFIXES):
+                stat = os.stat(os.path.join(model_name, filename))
+                parts.extend([filename, str(stat.st_size), str(int(stat.st_mtime))])
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingCache:
+    """
+    텍스트 → 임베딩 디스크 캐시 (모델 지문별 디렉토리)
+
+    embeddings.f32는 float32 행을 이어 붙인 파일이고, index.json이 텍스트 키 → 행 번호를 가진다.
+    새 임베딩은 파일 끝에 추가하고 인덱스는 임시 파일에 쓴 뒤 교체한다.
+    """
+
+    def __init__(self, cache_dir: str, fingerprint: str, hidden_size: int):
+        self.directory = os.path.join(cache_dir, fingerprint)
+        self.hidden_size = hidden_size
+        self.embeddings_path = os.path.join(self.directory, EMBEDDINGS_FILENAME)
+        self.index_path = os.path.join(self.directory, INDEX_FILENAME)
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        """인덱스 로드 (없거나 파일과 맞지 않으면 빈 캐시로 시작)"""
+        if not os.path.exists(self.index_path) or not os.path.exists(self.embeddings_path):
+            return {}
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  임베딩 캐시 인덱스 로드 실패, 다시 생성합니다: {e}")
+            return {}
+
+        rows = os.path.getsize(self.embeddings_path) // (4 * self.hidden_size)
+        if state.get("hidden_size") != self.hidden_size or state.get("count", 0) > rows:
+            return {}
+        return state.get("rows", {})
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def missing(self, texts: Sequence[str]) -> List[int]:
+        """캐시에 없는 텍스트 번호 (중복 텍스트는 처음 것만)"""
+        seen = set()
+        missing = []
+        for i, text in enumerate(texts):
+            key = text_key(text)
+            if key not in self.index and key not in seen:
+                seen.add(key)
+                missing.append(i)
+        return missing
+
+    def add(self, texts: Sequence[str], embeddings: np.ndarray):
+        """임베딩 추가 (파일 끝에 이어 쓰기)"""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.shape != (len(texts), self.hidden_size):
+            raise ValueError(
+                f"임베딩 shape 불일치: {embeddings.shape} (기대값 ({len(texts)}, {self.hidden_size}))"
+            )
+
+        os.makedirs(self.directory, exist_ok=True)
+        start = len(self.index)
+        with open(self.embeddings_path, 'ab') as f:
+            # 인덱스보다 파일이 길면(이전 실행이 중간에 종료) 인덱스 기준으로 잘라서 이어 씀
+            f.truncate(start * 4 * self.hidden_size)
+            embeddings.tofile(f)
+        for offset, text in enumerate(texts):
+            self.index[text_key(text)] = start + offset
+
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"hidden_size": self.hidden_size, "count": len(self.index), "rows": self.index}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        임베딩 [N, hidden] (모든 텍스트가 캐시에 있어야 함)
+
+        memmap에서 필요한 행만 읽어 복사한다.
+        """
+        if not texts:
+            return np.zeros((0, self.hidden_size), dtype=np.float32)
+
+        rows = [self.index[text_key(text)] for text in texts]
+        table = np.memmap(self.embeddings_path, dtype=np.float32, mode='r',
+                          shape=(len(self.index), self.hidden_size))
+        return np.asarray(table[rows])
+
+    def get_or_compute(self,
+                       texts: Sequence[str],
+                       encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        캐시에 없는 텍스트만 encode_fn으로 계산해 추가한 뒤 전체 임베딩 반환
+
+        Args:
+            texts: 텍스트 리스트
+            encode_fn: 텍스트 리스트 → 임베딩 [n, hidden]
+        """
+        missing = self.missing(texts)
+        hits = len(texts) - len(missing)
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache="embeddings", result="hit")
+        if missing:
+            CACHE_REQUESTS.inc(len(missing), cache="embeddings", result="miss")
+            new_texts = [texts[i] for i in missing]
+            self.add(new_texts, encode_fn(new_texts))
+        return self.get(texts)
+
+
+def pooled_encoder(model, tokenizer, max_length: int = 300, batch_size: int = 16,
+                   device: Optional[str] = None) -> Callable[[List[str]], np.ndarray]:
+    """
+    분류 모델의 인코더 pooled output을 계산하는 함수 생성 (get_or_compute의 encode_fn)
+
+    BertForSequenceClassification의 classifier 입력과 같은 값이므로,
+    이 임베딩으로 학습한 Linear는 모델 classifier에 그대로 넣을 수 있다.
+    """
+    import torch
+
+    encoder = getattr(model, model.base_model_prefix)
+    device = device or next(model.parameters()).device
+
+    def encode(texts: List[str]) -> np.ndarray:
+        encoder.eval()
+        outputs = []
+        with torch.no_grad():
+            for i in range(0, len(texts), batch_size):
+                inputs = tokenizer(
+                    texts[i:i + batch_size],
+                    return_tensors="pt",
+                    max_length=max_length,
+                    padding=True,
+                    truncation=True
+                )
+                inputs = {k: v.to(device) for k, v in inputs.items()}
+                outputs.append(encoder(**inputs).pooler_output.float().cpu().numpy())
+        return np.concatenate(outputs)
+
+    return encode
@@ -0,0 +1,76 @@
+"""
+샘플 통화(data/samples/test_*.txt) 정답과 비교 지표
+비교 스크립트(compare_kcbert_vs_sllm.py, compare_cascade.py, evaluate_finetuned_model.py)가 공유
+"""
+
+from typing import Dict, Any
+
+
+# 각 테스트 케이스의 예상 결과 (ground truth)
+GROUND_TRUTH = {
+    "test_01_normal_service.txt": {"label": "정상", "score": 0.1, "category": "없음"},
+    "test_02_strong_complaint.txt": {"label": "경계선", "score": 0.4, "category": "불만"},
+    "test_03_explicit_profanity.txt": {"label": "부적절", "score": 0.95, "category": "욕설"},
+    "test_04_insult_no_swear.txt": {"label": "부적절", "score": 0.85, "category": "모욕"},
+    "test_05_direct_threat.txt": {"label": "부적절", "score": 0.90, "category": "위협"},
+    "test_06_sexual_harassment_direct.txt": {"label": "부적절", "score": 0.95, "category": "성희롱"},
+    "test_07_sexual_harassment_subtle.txt": {"label": "부적절", "score": 0.75, "category": "성희롱"},
+    "test_08_sarcastic_insult.txt": {"label": "부적절", "score": 0.70, "category": "모욕"},
+    "test_09_borderline_angry.txt": {"label": "경계선", "score": 0.45, "category": "불만"},
+    "test_10_borderline_frustrated.txt": {"label": "경계선", "score": 0.50, "category": "불만"},
+    "test_11_threat_legal.txt": {"label": "경계선", "score": 0.55, "category": "위협"},
+    "test_12_mixed_profanity_threat.txt": {"label": "부적절", "score": 0.98, "category": "복합"},
+    "test_13_profanity_sexual.txt": {"label": "부적절", "score": 0.98, "category": "복합"},
+    "test_14_polite_complaint.txt": {"label": "정상", "score": 0.2, "category": "없음"},
+    "test_15_urgent_request.txt": {"label": "정상", "score": 0.1, "category": "없음"},
+    "test_16_passive_aggressive.txt": {"label": "부적절", "score": 0.65, "category": "모욕"},
+    "test_17_mild_insult.txt": {"label": "부적절", "score": 0.60, "category": "모욕"},
+    "test_18_explicit_threat.txt": {"label": "부적절", "score": 0.95, "category": "위협"},
+    "test_19_emotional_outburst.txt": {"label": "경계선", "score": 0.50, "category": "불만"},
+    "test_20_appreciation.txt": {"label": "정상", "score": 0.0, "category": "없음"},
+}
+
+
+def classify_result(score: float, threshold: float = 0.5) -> str:
+    """점수로 레이블 분류"""
+    if score < 0.3:
+        return "정상"
+    elif score < 0.6:
+        return "경계선"
+    else:
+        return "부적절"
+
+
+def calculate_accuracy(predictions: Dict[str, Dict[str, Any]],
+                       ground_truth: Dict[str, Dict[str, Any]] = GROUND_TRUTH) -> float:
+    """정확도 계산 (%)"""
+    correct = 0
+    total = len(predictions)
+
+    for filename, pred in predictions.items():
+        if filename not in ground_truth:
+            continue
+
+        gt = ground_truth[filename]
+        pred_label = classify_result(pred['score'])
+
+        if pred_label == gt['label']:
+            correct += 1
+
+    return (correct / total * 100) if total > 0 else 0
+
+
+def calculate_score_error(predictions: Dict[str, Dict[str, Any]],
+                          ground_truth: Dict[str, Dict[str, Any]] = GROUND_TRUTH) -> float:
+    """평균 점수 오차 계산 (MAE)"""
+    errors = []
+
+    for filename, pred in predictions.items():
+        if filename not in ground_truth:
+            continue
+
+        gt = ground_truth[filename]
+        error = abs(pred['score'] - gt['score'])
+        errors.append(error)
+
+    return sum(errors) / len(errors) if errors else 0
@@ -0,0 +1,182 @@
+"""
+한글 정규화 모듈
+변형 표기(ㅅ1발, 씨@발, 시 발)를 같은 형태로 맞춰 사전 매칭에 사용
+
+- 완성형 음절을 초성/중성/종성 자모로 분해 (초성과 종성은 서로 다른 문자로 구분)
+- 음절 사이에 끼워 넣은 기호 제거, 모양이 비슷한 문자 치환 (ㅅ1→시)
+- fold=True일 때만 된소리/비슷한 모음 접기(ㅆ→ㅅ, ㅔ→ㅐ)와 한 글자씩 띄어 쓴 공백 제거
+  (게 새 → 개새, 박 → 빡처럼 일반 문장이 욕설과 같아지므로 사전 항목이 선택한 경우에만 사용)
+- 정규화된 문자마다 원문 위치를 기록해 매칭 결과를 원문 구간으로 되돌림
+"""
+
+import unicodedata
+from typing import List, Tuple
+
+
+# 완성형 한글 음절 범위와 분해 상수
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28
+
+# 조합형 자모 시작 코드 (초성 U+1100, 중성 U+1161, 종성 U+11A8)
+CHOSEONG_BASE = 0x1100
+JUNGSEONG_BASE = 0x1161
+JONGSEONG_BASE = 0x11A7  # 종성 인덱스 0은 받침 없음
+
+# 호환 자모(ㄱ, ㅏ 등 단독 입력) → 조합형 초성/중성
+_COMPAT_CONSONANTS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_COMPAT_VOWELS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+COMPAT_TO_CHOSEONG = {ch: chr(CHOSEONG_BASE + i) for i, ch in enumerate(_COMPAT_CONSONANTS)}
+COMPAT_TO_JUNGSEONG = {ch: chr(JUNGSEONG_BASE + i) for i, ch in enumerate(_COMPAT_VOWELS)}
+
+# 된소리/비슷한 모음 접기 (fold=True)
+JAMO_FOLDS = {
+    "\u1101": "\u1100",  # ㄲ → ㄱ (초성)
+    "\u1104": "\u1103",  # ㄸ → ㄷ
+    "\u1108": "\u1107",  # ㅃ → ㅂ
+    "\u110A": "\u1109",  # ㅆ → ㅅ
+    "\u110D": "\u110C",  # ㅉ → ㅈ
+    "\u11A9": "\u11A8",  # ㄲ → ㄱ (종성)
+    "\u11BB": "\u11BA",  # ㅆ → ㅅ (종성)
+    "\u1166": "\u1162",  # ㅔ → ㅐ
+    "\u1168": "\u1164",  # ㅖ → ㅒ
+}
+
+# 단독 자음 뒤에서 모음 ㅣ로 읽히는 문자 (ㅅ1발, ㅅl발)
+VOWEL_I_LOOKALIKES = set("1li|!")
+
+
+def is_syllable(ch: str) -> bool:
+    """완성형 한글 음절인지"""
+    return SYLLABLE_BASE <= ord(ch) <= SYLLABLE_LAST
+
+
+def decompose(ch: str) -> str:
+    """완성형 음절을 조합형 자모로 분해 (음절이 아니면 그대로)"""
+    if not is_syllable(ch):
+        return ch
+
+    code = ord(ch) - SYLLABLE_BASE
+    cho, rest = divmod(code, JUNGSEONG_COUNT * JONGSEONG_COUNT)
+    jung, jong = divmod(rest, JONGSEONG_COUNT)
+
+    jamo = chr(CHOSEONG_BASE + cho) + chr(JUNGSEONG_BASE + jung)
+    if jong:
+        jamo += chr(JONGSEONG_BASE + jong)
+    return jamo
+
+
+# 문자 종류
+_SPACE = 0
+_NOISE = 1
+_HANGUL = 2
+_OTHER = 3
+
+# 문자별 정규화 결과 캐시 (문자 → (종류, 정규화 문자열, 접은 문자열))
+_char_cache = {}
+_CHAR_CACHE_LIMIT = 65536
+
+
+def _classify(ch: str) -> Tuple[int, str, str]:
+    """문자 하나의 종류와 정규화 결과 (자모 분해, 소문자 변환)와 접은 결과"""
+    if ch.isspace():
+        return _SPACE, " ", " "
+
+    if is_syllable(ch):
+        jamo = decompose(ch)
+    elif ch in COMPAT_TO_CHOSEONG:
+        jamo = COMPAT_TO_CHOSEONG[ch]
+    elif ch in COMPAT_TO_JUNGSEONG:
+        jamo = COMPAT_TO_JUNGSEONG[ch]
+    else:
+        # 음절 사이에 끼워 넣는 기호/제어 문자 (문장부호, 특수문자, 제로폭 문자 등)
+        if unicodedata.category(ch)[0] in "PSC":
+            return _NOISE, "", ""
+        lowered = ch.lower()
+        mapped = lowered if len(lowered) == 1 else ch
+        return _OTHER, mapped, mapped
+
+    return _HANGUL, jamo, "".join(JAMO_FOLDS.get(j, j) for j in jamo)
+
+
+def normalize(text: str, fold: bool = False,
+              collapse_spaces: bool = False) -> Tuple[str, List[int]]:
+    """
+    매칭용 정규화
+
+    - 기호 제거, 연속 공백은 하나로
+    - 단독 자음 뒤의 1/l/i/|/!는 모음 ㅣ로 (ㅅ1발 → 시발)
+    - fold이면 된소리/비슷한 모음 접기 (씨발 → 시발, 게 → 개)
+    - collapse_spaces이면 양쪽 어절이 모두 한글 한 글자일 때만 공백 제거
+      ("시 발" → "시발", "언니 미안해"는 그대로)
+
+    Args:
+        text: 원문
+        fold: 된소리/비슷한 모음 접기 여부
+        collapse_spaces: 한 글자씩 띄어 쓴 음절 사이 공백 제거 여부
+            (사전 항목은 공백을 의도적으로 넣은 경우가 있으므로 False로 정규화)
+
+    Returns:
+        (정규화 문자열, 정규화 문자별 원문 위치 리스트)
+    """
+    cache = _char_cache
+
+    # 어절: [정규화 조각 리스트, 원문 위치 리스트, 앞 공백 위치, 한글 한 글자 여부]
+    words = []
+    pieces: List[str] = []
+    positions: List[int] = []
+    hangul_count = 0
+    space_pos = -1
+    prev_consonant = False
+
+    for i, ch in enumerate(text):
+        info = cache.get(ch)
+        if info is None:
+            info = _classify(ch)
+            if len(cache) < _CHAR_CACHE_LIMIT:
+                cache[ch] = info
+        kind, mapped, folded = info
+        if fold:
+            mapped = folded
+
+        if prev_consonant and ch.lower() in VOWEL_I_LOOKALIKES:
+            kind, mapped = _HANGUL, COMPAT_TO_JUNGSEONG["ㅣ"]
+        prev_consonant = ch in COMPAT_TO_CHOSEONG
+
+        if kind == _NOISE:
+            continue
+        if kind == _SPACE:
+            if pieces:
+                words.append((pieces, positions, space_pos, hangul_count == len(pieces) == 1))
+                pieces, positions, hangul_count = [], [], 0
+                space_pos = i
+            continue
+
+        pieces.append(mapped)
+        positions.append(i)
+        if kind == _HANGUL:
+            hangul_count += 1
+
+    if pieces:
+        words.append((pieces, positions, space_pos, hangul_count == len(pieces) == 1))
+
+    normalized: List[str] = []
+    offsets: List[int] = []
+    prev_single = False
+    for k, (pieces, positions, space_pos, single) in enumerate(words):
+        if k > 0 and not (collapse_spaces and prev_single and single):
+            normalized.append(" ")
+            offsets.append(space_pos)
+        prev_single = single
+
+        for mapped, pos in zip(pieces, positions):
+            normalized.append(mapped)
+            offsets.extend([pos] * len(mapped))
+
+    return "".join(normalized), offsets
+
+
+def to_original_span(offsets: List[int], start: int, end: int) -> Tuple[int, int]:
+    """정규화 문자열 구간 [start, end)를 원문 구간으로 변환"""
+    return offsets[start], offsets[end - 1] + 1
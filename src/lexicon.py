@@ -0,0 +1,460 @@
+"""
+규칙 사전(lexicon) 모듈
+data/lexicon/*.yaml의 단계별(tier) 사전을 하나의 매칭 구조로 컴파일하고 모든 감지기가 공유
+
+- 일반 단어는 Aho-Corasick 오토마톤 하나로 모든 단계를 한 번에 탐색
+- 일반 단어와 텍스트는 한글 정규화(src/hangul.py) 후 비교하여 기호 삽입 표기도 매칭
+- 'fold' 목록의 항목만 된소리/모음 접기와 한 글자 띄어쓰기 제거를 적용 (씨발 ← 시 발, ㅆㅂ)
+- 're:' 접두사 항목은 정규식으로 미리 컴파일
+- 파일이 바뀌면 새 사전을 컴파일한 뒤 참조를 한 번에 교체 (프로세스 재시작 불필요)
+"""
+
+import os
+import re
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .hangul import COMPAT_TO_CHOSEONG, COMPAT_TO_JUNGSEONG, is_syllable
+from .hangul import normalize as normalize_hangul
+
+
+# 작업 디렉토리와 관계없이 저장소의 data/lexicon을 기본값으로 사용
+DEFAULT_LEXICON_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "lexicon")
+)
+
+# 사전 디렉토리 재지정 환경변수
+LEXICON_DIR_ENV_VAR = "KCBERT_LEXICON_DIR"
+
+# 정규식 항목 접두사
+REGEX_PREFIX = "re:"
+
+# 파일 변경 확인 최소 간격 (초)
+DEFAULT_CHECK_INTERVAL = 2.0
+
+# 접기(fold) 항목의 최소 한글 글자 수 (빡 ← 박처럼 한 글자는 일반 단어와 겹침)
+MIN_FOLD_SYLLABLES = 2
+
+
+def _hangul_length(entry: str) -> int:
+    """한글 음절/단독 자모 개수"""
+    return sum(1 for ch in entry
+               if is_syllable(ch) or ch in COMPAT_TO_CHOSEONG or ch in COMPAT_TO_JUNGSEONG)
+
+
+def _on_char_boundary(offsets: List[int], start: int, end: int) -> bool:
+    """정규화 텍스트의 [start, end)가 원문 문자 경계에서 시작하고 끝나는지"""
+    if start > 0 and offsets[start] == offsets[start - 1]:
+        return False
+    return end == len(offsets) or offsets[end] != offsets[end - 1]
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 다중 문자열 탐색 오토마톤
+
+    단어 수와 관계없이 텍스트를 한 번만 훑어서 모든 출현 위치를 찾는다.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for term in terms:
+            self._add(term)
+        self._build_failure_links()
+
+        self._lengths = [len(term) for term in self.terms]
+        # 실패 링크를 따라간 결과를 노드별로 캐시 (한 번 본 문자는 dict 조회 한 번으로 전이)
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _add(self, term: str):
+        if not term:
+            return
+
+        node = 0
+        for ch in term:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+
+        self._output[node].append(len(self.terms))
+        self.terms.append(term)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _next(self, node: int, ch: str) -> int:
+        state = node
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        next_node = self._goto[state].get(ch, 0)
+        self._delta[node][ch] = next_node
+        return next_node
+
+    def iter_matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """(단어 번호, 시작, 끝) 리스트 (겹치는 출현 포함)"""
+        delta = self._delta
+        output = self._output
+        lengths = self._lengths
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            next_node = delta[node].get(ch)
+            if next_node is None:
+                next_node = self._next(node, ch)
+            node = next_node
+            if output[node]:
+                for term_id in output[node]:
+                    found.append((term_id, i + 1 - lengths[term_id], i + 1))
+        return found
+
+
+class LexiconScan:
+    """
+    텍스트 하나에 대한 사전 탐색 결과
+
+    matches[tier][entry] = [(start, end, matched_text), ...]  (원문 기준 위치)
+    """
+
+    def __init__(self, text: str, matches: Dict[str, Dict[str, List[Tuple[int, int, str]]]]):
+        self.text = text
+        self.matches = matches
+
+    def has_any(self, tier: str) -> bool:
+        """해당 단계 항목이 하나라도 있는지"""
+        return bool(self.matches.get(tier))
+
+    def entries(self, tier: str) -> Set[str]:
+        """출현한 항목 (서로 다른 항목 집합)"""
+        return set(self.matches.get(tier, {}))
+
+    def matched_texts(self, tier: str) -> List[str]:
+        """출현한 원문 문자열 (항목별 re.findall과 같은 개수)"""
+        found = []
+        for spans in self.matches.get(tier, {}).values():
+            found.extend(matched for _, _, matched in spans)
+        return found
+
+    def spans(self, tier: Optional[str] = None) -> List[Dict[str, Any]]:
+        """출현 위치 목록 (원문 기준, 시작 위치 순)"""
+        tiers = [tier] if tier else list(self.matches)
+        result = [
+            {"tier": t, "entry": entry, "start": start, "end": end, "text": matched}
+            for t in tiers
+            for entry, spans in self.matches.get(t, {}).items()
+            for start, end, matched in spans
+        ]
+        return sorted(result, key=lambda m: (m["start"], m["end"]))
+
+
+class CompiledLexicon:
+    """컴파일된 사전 (불변, 교체 단위)"""
+
+    def __init__(self, name: str, tiers: Dict[str, List[str]],
+                 context: Optional[Dict[str, List[str]]] = None,
+                 version: str = "",
+                 normalize: bool = True,
+                 fold: Iterable[str] = ()):
+        self.name = name
+        self.tiers = {tier: list(entries) for tier, entries in tiers.items()}
+        self.context = {key: list(values) for key, values in (context or {}).items()}
+        self.version = version
+        self.normalize = normalize
+        self.fold = set(fold) if normalize else set()
+
+        all_entries = {entry for entries in self.tiers.values() for entry in entries}
+        for entry in sorted(self.fold):
+            if entry not in all_entries:
+                raise ValueError(f"fold 항목 '{entry}'이(가) 어느 단계에도 없습니다.")
+            if entry.startswith(REGEX_PREFIX):
+                raise ValueError(f"fold 항목 '{entry}'은(는) 정규식일 수 없습니다.")
+            if _hangul_length(entry) < MIN_FOLD_SYLLABLES:
+                raise ValueError(f"fold 항목 '{entry}'은(는) 한글 {MIN_FOLD_SYLLABLES}글자 이상이어야 합니다.")
+
+        # 일반 항목과 접기 항목은 정규화 방식이 달라 오토마톤을 따로 만든다
+        plain_terms: List[str] = []
+        fold_terms: List[str] = []
+        plain_owners: List[List[Tuple[str, str]]] = []
+        fold_owners: List[List[Tuple[str, str]]] = []
+        plain_index: Dict[str, int] = {}
+        fold_index: Dict[str, int] = {}
+        self._regexes: List[Tuple[str, str, "re.Pattern"]] = []
+
+        for tier, entries in self.tiers.items():
+            for entry in entries:
+                if entry.startswith(REGEX_PREFIX):
+                    pattern = re.compile(entry[len(REGEX_PREFIX):], re.IGNORECASE)
+                    self._regexes.append((tier, entry, pattern))
+                    continue
+
+                folded = entry in self.fold
+                term = self._normalize_term(entry, folded)
+                if not term:
+                    continue
+                terms, owners_list, index = (
+                    (fold_terms, fold_owners, fold_index) if folded
+                    else (plain_terms, plain_owners, plain_index)
+                )
+                if term not in index:
+                    index[term] = len(terms)
+                    terms.append(term)
+                    owners_list.append([])
+                owners = owners_list[index[term]]
+                # 정규화 후 같은 단어(씨발/시발)는 단계마다 한 번만 센다
+                if all(owner_tier != tier for owner_tier, _ in owners):
+                    owners.append((tier, entry))
+
+        self._passes = [(False, AhoCorasick(plain_terms), plain_owners)]
+        if fold_terms:
+            self._passes.append((True, AhoCorasick(fold_terms), fold_owners))
+
+    def _normalize_term(self, entry: str, fold: bool = False) -> str:
+        # 사전 항목의 공백은 의도적인 경우가 있으므로 그대로 둔다
+        if self.normalize:
+            return normalize_hangul(entry, fold=fold)[0]
+        return entry.lower()
+
+    def _normalize_text(self, text: str, fold: bool = False) -> Tuple[str, List[int]]:
+        if self.normalize:
+            return normalize_hangul(text, fold=fold, collapse_spaces=fold)
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # 소문자 변환으로 길이가 바뀌는 특수 문자는 위치 보존을 위해 그대로 둠
+            lowered = text
+        return lowered, list(range(len(text)))
+
+    def scan(self, text: str) -> LexiconScan:
+        """
+        모든 단계 항목을 한 번에 탐색
+
+        같은 항목의 출현은 re.findall처럼 겹치지 않게 센다.
+        일반 단어는 정규화된 텍스트에서 찾고 위치는 원문 기준으로 되돌린다.
+        음절의 일부 자모만 걸치는 매칭(꺼져 → 꺼졌)은 버린다.
+        접기 항목이 있으면 접은 텍스트를 한 번 더 훑는다.
+        """
+        matches: Dict[str, Dict[str, List[Tuple[int, int, str]]]] = {}
+
+        for fold, automaton, owners in self._passes:
+            if not automaton.terms:
+                continue
+            normalized, offsets = self._normalize_text(text, fold)
+            last_end: Dict[Tuple[str, str], int] = {}
+
+            for term_id, start, end in automaton.iter_matches(normalized):
+                if not _on_char_boundary(offsets, start, end):
+                    continue
+                for tier, entry in owners[term_id]:
+                    key = (tier, entry)
+                    if start < last_end.get(key, 0):
+                        continue
+                    last_end[key] = end
+                    orig_start, orig_end = offsets[start], offsets[end - 1] + 1
+                    matches.setdefault(tier, {}).setdefault(entry, []).append(
+                        (orig_start, orig_end, text[orig_start:orig_end])
+                    )
+
+        for tier, entry, pattern in self._regexes:
+            spans = [(m.start(), m.end(), m.group(0)) for m in pattern.finditer(text)]
+            if spans:
+                matches.setdefault(tier, {})[entry] = spans
+
+        return LexiconScan(text, matches)
+
+    def term_count(self) -> int:
+        return sum(len(entries) for entries in self.tiers.values())
+
+
+def _load_yaml(path: str) -> Dict[str, Any]:
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: YAML 형식 오류 ({e})")
+
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: 최상위는 딕셔너리여야 합니다.")
+    return data
+
+
+def compile_lexicon_file(path: str) -> CompiledLexicon:
+    """
+    사전 파일 컴파일
+
+    파일 형식:
+        name: abusive
+        version: 1
+        normalize: true   # 선택, 한글 정규화 매칭 (기본 true)
+        tiers:
+          severe: [씨발, ...]
+          moderate: [...]
+        fold: [씨발, ...] # 선택, 된소리/모음 접기와 한 글자 띄어쓰기 제거를 적용할 항목
+        context:          # 선택
+          미친: [미친놈, ...]
+
+    Raises:
+        ValueError: 형식 오류 또는 잘못된 정규식
+    """
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+
+    data = _load_yaml(path)
+    tiers = data.get("tiers")
+    if not isinstance(tiers, dict) or not tiers:
+        raise ValueError(f"{path}: 'tiers' 항목이 없습니다.")
+
+    for tier, entries in tiers.items():
+        if not isinstance(entries, list) or not all(isinstance(e, str) for e in entries):
+            raise ValueError(f"{path}: '{tier}' 단계는 문자열 리스트여야 합니다.")
+
+    fold = data.get("fold") or []
+    if not isinstance(fold, list) or not all(isinstance(e, str) for e in fold):
+        raise ValueError(f"{path}: 'fold'는 문자열 리스트여야 합니다.")
+
+    name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+    version = f"{data.get('version', 0)}-{digest}"
+
+    try:
+        return CompiledLexicon(name, tiers, data.get("context"), version,
+                               normalize=bool(data.get("normalize", True)),
+                               fold=fold)
+    except re.error as e:
+        raise ValueError(f"{path}: 잘못된 정규식 ({e})")
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+class Lexicon:
+    """
+    파일 기반 사전 (자동 갱신)
+
+    current()는 항상 완전히 컴파일된 사전을 반환한다. 갱신 중 오류가 나면
+    이전 사전을 그대로 사용한다.
+    """
+
+    def __init__(self, path: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = os.path.getmtime(path)
+        self._compiled = compile_lexicon_file(path)
+        self._last_check = time.monotonic()
+
+    @property
+    def version(self) -> str:
+        return self._compiled.version
+
+    def current(self) -> CompiledLexicon:
+        """현재 사전 (check_interval마다 파일 변경 확인)"""
+        if self.check_interval is not None and \
+                time.monotonic() - self._last_check >= self.check_interval:
+            self.reload_if_changed()
+        return self._compiled
+
+    def reload_if_changed(self) -> bool:
+        """파일이 바뀌었으면 다시 컴파일 (바뀐 경우 True)"""
+        self._last_check = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+        return self.reload(mtime)
+
+    def reload(self, mtime: Optional[float] = None) -> bool:
+        """
+        강제로 다시 컴파일
+
+        새 사전을 모두 만든 뒤 참조만 교체하므로, 탐색 중인 다른 스레드는
+        이전 사전으로 끝까지 처리한다.
+        """
+        with self._lock:
+            try:
+                compiled = compile_lexicon_file(self.path)
+            except (OSError, ValueError) as e:
+                # 같은 파일로 반복 경고하지 않도록 수정 시간은 기록 (다시 저장하면 재시도)
+                if mtime is not None:
+                    self._mtime = mtime
+                print(f"⚠️  사전 갱신 실패 ({self.path}), 이전 사전 유지: {e}")
+                return False
+
+            self._compiled = compiled
+            self._mtime = mtime if mtime is not None else os.path.getmtime(self.path)
+
+        print(f"🔄 사전 갱신: {compiled.name} v{compiled.version} ({compiled.term_count()}개 항목)")
+        return True
+
+    def scan(self, text: str) -> LexiconScan:
+        return self.current().scan(text)
+
+
+_registry: Dict[str, Lexicon] = {}
+_registry_lock = threading.Lock()
+
+
+def get_lexicon_dir(lexicon_dir: Optional[str] = None) -> str:
+    """사전 디렉토리 (인자 > 환경변수 > 기본값)"""
+    return lexicon_dir or os.environ.get(LEXICON_DIR_ENV_VAR) or DEFAULT_LEXICON_DIR
+
+
+def get_lexicon(name: str, lexicon_dir: Optional[str] = None) -> Lexicon:
+    """
+    공유 사전 반환 (같은 파일은 프로세스 전체에서 하나만 컴파일)
+
+    Args:
+        name: 사전 이름 (<lexicon_dir>/<name>.yaml)
+        lexicon_dir: 사전 디렉토리
+
+    Raises:
+        FileNotFoundError: 사전 파일이 없는 경우
+    """
+    path = os.path.abspath(os.path.join(get_lexicon_dir(lexicon_dir), f"{name}.yaml"))
+
+    with _registry_lock:
+        lexicon = _registry.get(path)
+        if lexicon is None:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"사전 파일을 찾을 수 없습니다: {path}")
+            lexicon = _registry[path] = Lexicon(path)
+        return lexicon
+
+
+def reload_lexicons() -> Dict[str, bool]:
+    """로드된 모든 사전의 변경 여부를 즉시 확인 (사전 경로 → 갱신 여부)"""
+    with _registry_lock:
+        lexicons = list(_registry.values())
+    return {lexicon.path: lexicon.reload_if_changed() for lexicon in lexicons}
+
+
+def get_lexicon_versions() -> Dict[str, str]:
+    """로드된 사전 이름 → 버전"""
+    with _registry_lock:
+        lexicons = list(_registry.values())
+    return {lexicon.current().name: lexicon.version for lexicon in lexicons}
@@ -0,0 +1,371 @@
+"""
+운영 메트릭 모듈
+Prometheus 텍스트 형식(exposition format)의 Counter/Gauge/Histogram 레지스트리와 HTTP 엔드포인트
+
+외부 의존성 없이 동작하며, 감지기/배치 처리/모델 로더가 기본 레지스트리(REGISTRY)에 기록한다.
+    from src.metrics import start_metrics_server
+    start_metrics_server(9100)   # http://127.0.0.1:9100/metrics
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+
+# 지연시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 배치 채움 비율 버킷 (실제 건수 / 배치 크기)
+RATIO_BUCKETS = (0.125, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+def _format_value(value: float) -> str:
+    """Prometheus 숫자 표기"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """레이블 값 이스케이프 (역슬래시, 따옴표, 줄바꿈)"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    """{name="value",...} 문자열"""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """메트릭 공통 (레이블별 값 관리)"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: 레이블이 일치하지 않습니다 "
+                f"(필요: {self.labelnames}, 입력: {tuple(labels)})"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """HELP/TYPE 헤더를 포함한 텍스트"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counter는 감소할 수 없습니다.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """증감 가능한 값 (함수를 등록하면 수집 시점에 호출)"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """수집 시점에 값을 계산할 함수 등록"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = fn
+
+    def get(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try:
+                items[key] = float(fn())
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items.items()
+        ]
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "counts": [0] * len(self.buckets), "count": 0, "sum": 0.0
+                }
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state["counts"][i] += 1
+            state["count"] += 1
+            state["sum"] += value
+
+    def get_count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state["count"] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, dict(state, counts=list(state["counts"])))
+                     for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for upper, count in zip(self.buckets, state["counts"]):
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(upper)))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {state['count']}")
+            base = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{base} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 레지스트리 (같은 이름은 같은 객체 반환)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str,
+                       labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name}은(는) 이미 {metric.metric_type}로 등록되어 있습니다.")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """전체 메트릭 텍스트 (Prometheus exposition format)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# 기본 레지스트리와 공통 메트릭
+REGISTRY = MetricsRegistry()
+
+PREDICTIONS = REGISTRY.counter(
+    "kcbert_predictions_total", "처리한 텍스트 수", ("detector", "result"))
+PREDICT_LATENCY = REGISTRY.histogram(
+    "kcbert_predict_latency_seconds", "predict/predict_batch 1회 처리 시간",
+    ("detector", "mode"))
+BATCH_SIZE = REGISTRY.histogram(
+    "kcbert_batch_size", "한 번의 forward로 처리한 건수", ("detector",),
+    buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_FILL_RATIO = REGISTRY.histogram(
+    "kcbert_batch_fill_ratio", "배치 채움 비율 (실제 건수 / batch_size)", ("detector",),
+    buckets=RATIO_BUCKETS)
+STAGE_LATENCY = REGISTRY.histogram(
+    "kcbert_stage_latency_seconds", "단계별 처리 시간 (profile_stages=True일 때)",
+    ("detector", "stage"))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "kcbert_queue_depth", "처리 대기 중인 항목 수", ("pipeline",))
+PIPELINE_ITEMS = REGISTRY.counter(
+    "kcbert_pipeline_items_total", "배치 파이프라인 처리 결과", ("pipeline", "status"))
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    "kcbert_model_load_seconds", "마지막 모델 로딩 시간", ("model", "component"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "kcbert_cache_requests_total", "캐시 조회 결과", ("cache", "result"))
+CONTEXTS_BUSY = REGISTRY.gauge(
+    "kcbert_sllm_contexts_busy", "사용 중인 sLLM 컨텍스트 수", ("model",))
+ESCALATIONS = REGISTRY.counter(
+    "kcbert_cascade_escalations_total", "캐스케이드 sLLM 재검증 수", ("prefilter",))
+RULE_DECISIONS = REGISTRY.counter(
+    "kcbert_rule_decisions_total", "규칙만으로 판정해 모델 추론을 생략한 수", ("detector",))
+EXIT_LAYER = REGISTRY.histogram(
+    "kcbert_exit_layer", "조기 종료 시 문장별 실행한 인코더 레이어 수", ("detector",),
+    buckets=tuple(range(1, 13)))
+MODEL_REFS = REGISTRY.gauge(
+    "kcbert_model_refs", "공유 모델을 사용 중인 감지기 수", ("model",))
+
+
+def _process_rss_bytes() -> float:
+    """현재 프로세스 RSS (byte)"""
+    from .benchmark import get_rss_mb
+    return get_rss_mb() * 1024 ** 2
+
+
+REGISTRY.gauge(
+    "process_resident_memory_bytes", "프로세스 RSS (byte)"
+).set_function(_process_rss_bytes)
+
+
+def observe_predictions(detector: str,
+                        results: List[Dict[str, Any]],
+                        elapsed: float,
+                        batch_size: Optional[int] = None,
+                        mode: Optional[str] = None):
+    """
+    감지기 호출 1회 기록
+
+    Args:
+        detector: 감지기 이름 (클래스명)
+        results: 결과 리스트 (is_abusive 기준으로 집계)
+        elapsed: 처리 시간 (초)
+        batch_size: 배치 크기 (None이면 단건 호출)
+        mode: 지연시간 레이블 (기본: single/batch)
+    """
+    mode = mode or ("single" if batch_size is None else "batch")
+    PREDICT_LATENCY.observe(elapsed, detector=detector, mode=mode)
+
+    abusive = sum(1 for r in results if r.get("is_abusive"))
+    if abusive:
+        PREDICTIONS.inc(abusive, detector=detector, result="abusive")
+    if len(results) - abusive:
+        PREDICTIONS.inc(len(results) - abusive, detector=detector, result="normal")
+
+    # 규칙만으로 판정한 결과는 forward 배치에 포함되지 않음
+    rule_decided = sum(1 for r in results if r.get("decided_by") == "rules")
+    if rule_decided:
+        RULE_DECISIONS.inc(rule_decided, detector=detector)
+
+    for r in results:
+        if r.get("exit_layer") is not None:
+            EXIT_LAYER.observe(r["exit_layer"], detector=detector)
+
+    forwarded = len(results) - rule_decided
+    if forwarded:
+        BATCH_SIZE.observe(forwarded, detector=detector)
+        if batch_size:
+            BATCH_FILL_RATIO.observe(forwarded / batch_size, detector=detector)
+
+
+def observe_stage_timings(detector: str, timings_ms: Dict[str, float]):
+    """단계별 시간(ms) 기록"""
+    for stage, value_ms in timings_ms.items():
+        STAGE_LATENCY.observe(value_ms / 1000, detector=detector, stage=stage)
+
+
+def start_metrics_server(port: int = 9100,
+                         host: str = "127.0.0.1",
+                         registry: MetricsRegistry = REGISTRY):
+    """
+    메트릭 HTTP 서버를 데몬 스레드로 시작
+
+    Args:
+        port: 포트 (0이면 임의 포트, server.server_port로 확인)
+        host: 바인드 주소 (기본값은 로컬 전용)
+        registry: 노출할 레지스트리
+
+    Returns:
+        HTTP 서버 (server.shutdown()으로 종료)
+    """
+    # http.server는 import 비용이 커서 서버를 켤 때만 로드
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """/metrics 요청 처리"""
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 스크레이프마다 접근 로그를 출력하지 않음
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+
+    print(f"📈 메트릭 엔드포인트: http://{host}:{server.server_port}/metrics (PID {os.getpid()})")
+    return server
@@ -3,26 +3,49 @@ KcBERT 모델 로더 모듈
 """
 
 import os
+import time
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from typing import Tuple
+from typing import Tuple, Optional
+from .thread_tuning import apply_host_profile
+from .metrics import MODEL_LOAD_SECONDS
+from .serving_bundle import is_serving_bundle, read_manifest
 
 
 class ModelLoader:
     """KcBERT 모델 및 토크나이저 로더"""
     
+    # 실행 백엔드 (공유 모델 레지스트리 키에 사용)
+    backend = "pytorch"
+    
     def __init__(self, 
                  model_name: str = "beomi/kcbert-base",
                  cache_dir: str = "./models/kcbert",
-                 device: str = None):
+                 device: str = None,
+                 host_profile: Optional[str] = None,
+                 revision: Optional[str] = None,
+                 dtype: Optional[str] = None):
         """
         Args:
-            model_name: Hugging Face 모델명
+            model_name: Hugging Face 모델명, 로컬 모델 디렉토리 또는 서빙 번들 디렉토리
+                (export_serving_bundle.py, 번들이면 revision/dtype은 무시)
             cache_dir: 모델 캐시 디렉토리
             device: 실행 디바이스 ('cuda', 'cpu', None=자동감지)
+            host_profile: 호스트 스레드 프로필 경로
+                (None=환경변수 KCBERT_HOST_PROFILE 또는 기본 경로, 'none'=적용 안함)
+            revision: Hugging Face 브랜치/태그/커밋 (None=기본 브랜치)
+            dtype: 가중치 dtype ('float32', 'float16', 'bfloat16', None=float32)
         """
         self.model_name = model_name
         self.cache_dir = cache_dir
+        self.revision = revision
+        self.dtype = dtype
+        
+        if dtype is not None and not isinstance(getattr(torch, dtype, None), torch.dtype):
+            raise ValueError(f"지원하지 않는 dtype: {dtype}")
+        
+        # 서빙 번들 (manifest.json이 있는 디렉토리)
+        self.bundle = read_manifest(model_name) if is_serving_bundle(model_name) else None
         
         # 디바이스 설정
         if device is None:
@@ -30,6 +53,15 @@ class ModelLoader:
         else:
             self.device = device
         
+        # int8 양자화/ONNX 번들은 CPU에서만 실행
+        if self.bundle is not None and self.bundle["format"] != "fp32" and self.device != "cpu":
+            print(f"   ⚠️  {self.bundle['format']} 번들은 CPU에서 실행합니다")
+            self.device = "cpu"
+        
+        # CPU 실행 시 tune_threads.py로 측정한 호스트별 스레드 설정 적용
+        if self.device == "cpu":
+            apply_host_profile(host_profile)
+        
         # 캐시 디렉토리 생성
         os.makedirs(self.cache_dir, exist_ok=True)
         
@@ -45,10 +77,14 @@ class ModelLoader:
         """
         if self.tokenizer is None:
             print(f"📥 토크나이저 로딩 중: {self.model_name}")
+            start_time = time.time()
             self.tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name,
-                cache_dir=self.cache_dir
+                cache_dir=self.cache_dir,
+                revision=self.revision
             )
+            MODEL_LOAD_SECONDS.set(time.time() - start_time,
+                                   model=self.model_name, component="tokenizer")
             print(f"✓ 토크나이저 로딩 완료")
         
         return self.tokenizer
@@ -60,9 +96,13 @@ class ModelLoader:
         Returns:
             KcBERT 모델
         """
+        if self.model is None and self.bundle is not None:
+            self._load_bundle_model()
+        
         if self.model is None:
             print(f"📥 모델 로딩 중: {self.model_name}")
             print(f"   디바이스: {self.device}")
+            start_time = time.time()
             
             # KcBERT는 기본적으로 사전학습만 된 상태
             # 실제로는 욕설 감지용으로 fine-tuning된 모델이 필요하지만,
@@ -75,7 +115,8 @@ class ModelLoader:
                 # KcBERT의 설정을 로드
                 config = BertConfig.from_pretrained(
                     self.model_name,
-                    cache_dir=self.cache_dir
+                    cache_dir=self.cache_dir,
+                    revision=self.revision
                 )
                 
                 # 분류 레이어 추가
@@ -86,6 +127,8 @@ class ModelLoader:
                     self.model_name,
                     config=config,
                     cache_dir=self.cache_dir,
+                    revision=self.revision,
+                    torch_dtype=getattr(torch, self.dtype) if self.dtype else None,
                     ignore_mismatched_sizes=True  # 크기 불일치 무시
                 )
                 
@@ -98,11 +141,32 @@ class ModelLoader:
             
             self.model.to(self.device)
             self.model.eval()
+            MODEL_LOAD_SECONDS.set(time.time() - start_time,
+                                   model=self.model_name, component="model")
             
             print(f"✓ 모델 로딩 완료")
         
         return self.model
     
+    def _load_bundle_model(self):
+        """서빙 번들 모델 로드 (fp32/int8/onnx, src/serving_bundle.py)"""
+        from .serving_bundle import load_bundle_model
+        
+        print(f"📦 서빙 번들 로딩 중: {self.model_name} ({self.bundle['format']})")
+        print(f"   디바이스: {self.device}")
+        start_time = time.time()
+        
+        self.model = load_bundle_model(self.model_name)
+        self.model.to(self.device)
+        MODEL_LOAD_SECONDS.set(time.time() - start_time,
+                               model=self.model_name, component="model")
+        
+        versions = self.bundle.get("lexicon_versions") or {}
+        if versions:
+            print("   번들 생성 시 사전 버전: "
+                  + ", ".join(f"{name} v{version}" for name, version in versions.items()))
+        print(f"✓ 모델 로딩 완료")
+    
     def load(self) -> Tuple[AutoTokenizer, AutoModelForSequenceClassification]:
         """
         토크나이저와 모델 동시 로드
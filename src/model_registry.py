@@ -0,0 +1,138 @@
+"""
+공유 모델 레지스트리
+같은 가중치를 쓰는 감지기끼리 토크나이저/모델을 한 번만 로드해 공유
+
+- 키: (모델명 또는 경로, revision, dtype, backend, device)
+- 감지기가 acquire하면 참조 수 +1, close()로 release하면 -1
+- 참조 수가 0이 되면 레지스트리에서 빼고 메모리 해제
+- 메모리는 감지기 객체 수가 아니라 서로 다른 모델 수에 비례
+"""
+
+import gc
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+from .metrics import MODEL_REFS
+
+
+class ModelHandle:
+    """공유 모델 참조 (감지기는 tokenizer/model/device만 사용)"""
+
+    def __init__(self, key: Tuple, tokenizer: Any, model: Any, device: str):
+        self.key = key
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        self.refcount = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.key[0]
+
+
+class ModelRegistry:
+    """참조 수 기반 모델 레지스트리 (스레드 안전)"""
+
+    def __init__(self):
+        self._handles: Dict[Tuple, ModelHandle] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(loader) -> Tuple:
+        """
+        ModelLoader 설정으로 공유 키 생성
+
+        로컬 디렉토리는 절대 경로로 바꿔 ./models/x와 models/x를 같은 모델로 본다.
+        cache_dir는 같은 가중치의 저장 위치일 뿐이므로 키에 넣지 않는다.
+        """
+        name = loader.model_name
+        if os.path.isdir(name):
+            name = os.path.abspath(name)
+        return (name, loader.revision, loader.dtype, loader.backend, loader.device)
+
+    def acquire(self, loader) -> ModelHandle:
+        """
+        모델 참조 획득 (처음이면 loader로 로드)
+
+        로드 중에도 잠금을 유지하므로 같은 모델을 동시에 요청해도 한 번만 로드된다.
+        로드한 모델은 레지스트리가 소유하고 loader의 tokenizer/model 캐시는 비운다.
+
+        Args:
+            loader: 로드할 모델 설정이 담긴 ModelLoader (아직 로드 전이어도 됨)
+        """
+        key = self.make_key(loader)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                tokenizer, model = loader.load()
+                # 참조는 핸들만 가지도록 loader 캐시를 비움 (release 시 실제로 해제되도록)
+                loader.tokenizer = None
+                loader.model = None
+                handle = ModelHandle(key, tokenizer, model, loader.get_device())
+                self._handles[key] = handle
+            else:
+                print(f"♻️  로드된 모델 공유: {handle.model_name} (참조 {handle.refcount + 1}개)")
+
+            handle.refcount += 1
+            MODEL_REFS.set(handle.refcount, model=handle.model_name)
+            return handle
+
+    def release(self, handle: ModelHandle):
+        """
+        모델 참조 반납 (마지막 참조면 레지스트리에서 제거하고 메모리 해제)
+
+        acquire 1회당 release 1회 (감지기는 close()에서 한 번만 호출), 이미 제거된 핸들은 무시한다.
+        """
+        with self._lock:
+            if self._handles.get(handle.key) is not handle or handle.refcount <= 0:
+                return
+
+            handle.refcount -= 1
+            MODEL_REFS.set(handle.refcount, model=handle.model_name)
+            if handle.refcount > 0:
+                return
+
+            del self._handles[handle.key]
+            device = handle.device
+            handle.tokenizer = None
+            handle.model = None
+
+        gc.collect()
+        if str(device).startswith("cuda"):
+            import torch
+            torch.cuda.empty_cache()
+        print(f"🧹 모델 메모리 해제: {handle.model_name}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """로드된 모델별 참조 수"""
+        with self._lock:
+            return [
+                {
+                    "model": key[0],
+                    "revision": key[1],
+                    "dtype": key[2],
+                    "backend": key[3],
+                    "device": key[4],
+                    "refcount": handle.refcount,
+                }
+                for key, handle in self._handles.items()
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._handles)
+
+
+# 프로세스 전역 레지스트리
+REGISTRY = ModelRegistry()
+
+
+def acquire_model(loader) -> ModelHandle:
+    """전역 레지스트리에서 모델 참조 획득"""
+    return REGISTRY.acquire(loader)
+
+
+def release_model(handle: ModelHandle):
+    """전역 레지스트리에 모델 참조 반납"""
+    REGISTRY.release(handle)
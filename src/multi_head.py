@@ -0,0 +1,140 @@
+"""
+멀티 헤드 분류 모듈
+KcBERT 인코더를 한 번만 실행하고 pooled output을 여러 카테고리 헤드
+(욕설/폭언, 성희롱, 협박, 모욕)에 공유
+
+- 욕설/폭언 헤드는 기존 분류 모델의 classifier를 그대로 사용 (기존 점수와 동일)
+- 나머지 헤드는 heads.pt에서 로드 (헤드 하나 = Linear(hidden, 2), 약 1.5K 파라미터)
+- 헤드를 추가해도 인코더는 한 번만 실행되므로 추론 비용은 행렬곱 한 번 수준
+"""
+
+import os
+import torch
+from typing import Dict, List, Optional
+
+
+# 지원 카테고리 (결과의 head_scores 키)
+HEADS = ("abuse", "harassment", "threat", "insult")
+
+# 결과 categories에 표시할 이름
+HEAD_LABELS = {
+    "abuse": "욕설/폭언",
+    "harassment": "성희롱",
+    "threat": "협박",
+    "insult": "모욕",
+}
+
+# 기존 classifier를 사용하는 헤드
+BASE_HEAD = "abuse"
+
+HEADS_FILENAME = "heads.pt"
+HEADS_FORMAT_VERSION = 1
+
+
+def default_heads_path(model_name: str, cache_dir: str) -> str:
+    """
+    헤드 파일 기본 경로
+
+    로컬 모델 디렉토리(fine-tuned 모델)면 그 안, 아니면 캐시 디렉토리의 heads.pt
+    """
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, HEADS_FILENAME)
+    return os.path.join(cache_dir, HEADS_FILENAME)
+
+
+def load_heads(path: str, hidden_size: int) -> Dict[str, torch.nn.Linear]:
+    """
+    heads.pt에서 헤드 로드 (파일이 없으면 빈 딕셔너리)
+
+    파일 형식:
+        {'version': 1, 'hidden_size': 768,
+         'heads': {'harassment': {'weight': Tensor[2, 768], 'bias': Tensor[2]}, ...}}
+
+    Raises:
+        ValueError: 인코더와 hidden_size가 다른 경우
+    """
+    if not os.path.exists(path):
+        return {}
+
+    state = torch.load(path, map_location="cpu", weights_only=True)
+    if state.get("hidden_size") != hidden_size:
+        raise ValueError(
+            f"{path}: hidden_size 불일치 (헤드 {state.get('hidden_size')}, 인코더 {hidden_size})"
+        )
+
+    heads = {}
+    for name, params in state.get("heads", {}).items():
+        out_features, in_features = params["weight"].shape
+        layer = torch.nn.Linear(in_features, out_features)
+        layer.load_state_dict(params)
+        heads[name] = layer
+    return heads
+
+
+def save_heads(path: str,
+               heads: Dict[str, torch.nn.Module],
+               hidden_size: int,
+               merge: bool = True):
+    """
+    헤드 저장 (기존 파일의 다른 헤드는 유지)
+
+    Args:
+        path: heads.pt 경로
+        heads: 헤드 이름 → Linear
+        hidden_size: 인코더 hidden size
+        merge: 기존 파일의 헤드와 합칠지 여부
+    """
+    state = {"version": HEADS_FORMAT_VERSION, "hidden_size": hidden_size, "heads": {}}
+    if merge and os.path.exists(path):
+        existing = torch.load(path, map_location="cpu", weights_only=True)
+        if existing.get("hidden_size") == hidden_size:
+            state["heads"].update(existing.get("heads", {}))
+
+    for name, layer in heads.items():
+        state["heads"][name] = {k: v.detach().cpu() for k, v in layer.state_dict().items()}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class MultiHeadClassifier(torch.nn.Module):
+    """인코더 1회 실행 + 카테고리별 분류 헤드"""
+
+    def __init__(self, encoder: torch.nn.Module, heads: Dict[str, torch.nn.Module]):
+        super().__init__()
+        self.encoder = encoder
+        self.heads = torch.nn.ModuleDict(heads)
+
+    @classmethod
+    def from_sequence_classifier(cls, model, heads_path: Optional[str] = None) -> "MultiHeadClassifier":
+        """
+        BertForSequenceClassification에서 생성
+
+        인코더와 classifier(욕설/폭언 헤드)는 원본 모델과 가중치를 공유하므로 메모리가 늘지 않는다.
+        heads.pt에 abuse 헤드가 있어도 원본 classifier를 우선한다.
+        """
+        encoder = getattr(model, model.base_model_prefix)
+        heads = {BASE_HEAD: model.classifier}
+
+        if heads_path:
+            for name, layer in load_heads(heads_path, model.config.hidden_size).items():
+                if name == BASE_HEAD:
+                    print(f"   ⚠️  {heads_path}의 '{BASE_HEAD}' 헤드는 무시 (모델 classifier 사용)")
+                    continue
+                heads[name] = layer
+
+        return cls(encoder, heads)
+
+    @property
+    def head_names(self) -> List[str]:
+        return list(self.heads.keys())
+
+    def forward(self, **inputs) -> Dict[str, torch.Tensor]:
+        """
+        Returns:
+            헤드 이름 → logits [batch, 2]
+        """
+        pooled = self.encoder(**inputs).pooler_output
+        return {name: head(pooled) for name, head in self.heads.items()}
@@ -0,0 +1,159 @@
+"""
+추론 프로파일링 모듈
+torch.profiler로 N회 추론을 감싸 연산자별 CPU 시간/메모리를 측정하고
+Chrome trace와 상위 연산자 요약을 저장
+
+규칙/전처리/결과 구성 같은 순수 Python 구간은 감지기의 단계별 타이머(profile_stages)로
+측정하며, 프로파일링 중에는 같은 구간이 trace에도 'stage::<이름>'으로 표시된다.
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any
+
+from .timing import TimingAggregator, format_timing_summary, set_stage_hook
+
+
+DEFAULT_PROFILE_DIR = "./data/results/profiles"
+
+
+def profile_calls(fn: Callable[[int], Any],
+                  n_calls: int = 10,
+                  detector=None,
+                  name: str = "profile",
+                  output_dir: str = DEFAULT_PROFILE_DIR,
+                  row_limit: int = 20,
+                  record_shapes: bool = True,
+                  profile_memory: bool = True,
+                  with_stack: bool = False) -> Dict[str, Any]:
+    """
+    추론 함수를 N회 실행하며 프로파일링
+
+    Args:
+        fn: 호출 번호(0부터)를 받아 추론 1회를 수행하는 함수
+        n_calls: 프로파일링할 호출 수
+        detector: 단계별 시간을 함께 수집할 감지기 (profile_stages 속성이 있는 경우)
+        name: 출력 파일 이름 접두사
+        output_dir: 출력 디렉토리
+        row_limit: 상위 연산자 표 행 수
+        record_shapes: 연산자 입력 shape 기록
+        profile_memory: 연산자별 메모리 할당 기록
+        with_stack: Python 호출 스택 기록 (오버헤드 큼)
+
+    Returns:
+        {'trace_path', 'summary_path', 'top_ops', 'stages', 'total_time', 'n_calls'}
+    """
+    try:
+        import torch
+        from torch.profiler import profile, record_function, ProfilerActivity
+    except ImportError:
+        raise ImportError(
+            "torch가 설치되지 않았습니다.\n"
+            "설치: pip install -r requirements.txt"
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    trace_path = os.path.join(output_dir, f"{name}_{timestamp}.trace.json")
+    summary_path = os.path.join(output_dir, f"{name}_{timestamp}.txt")
+
+    # 단계별 시간은 프로파일링 구간만 따로 모은다
+    has_stages = detector is not None and hasattr(detector, "profile_stages")
+    if has_stages:
+        saved_flag = detector.profile_stages
+        saved_stats = detector.timing_stats
+        detector.profile_stages = True
+        detector.timing_stats = TimingAggregator()
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    print(f"\n🔬 프로파일링 시작: {n_calls}회 호출 (PID {os.getpid()})")
+    print(f"   💡 Python 스택 샘플링: py-spy record -o {name}.svg --pid {os.getpid()}")
+
+    set_stage_hook(record_function)
+    start_time = time.perf_counter()
+    try:
+        with profile(activities=activities,
+                     record_shapes=record_shapes,
+                     profile_memory=profile_memory,
+                     with_stack=with_stack) as prof:
+            for i in range(n_calls):
+                with record_function(f"call::{i}"):
+                    fn(i)
+    finally:
+        set_stage_hook(None)
+        total_time = time.perf_counter() - start_time
+        stages = detector.timing_stats.summary() if has_stages else {}
+        if has_stages:
+            detector.profile_stages = saved_flag
+            detector.timing_stats = saved_stats
+
+    prof.export_chrome_trace(trace_path)
+
+    sort_key = "self_cuda_time_total" if len(activities) > 1 else "self_cpu_time_total"
+    top_ops = prof.key_averages().table(sort_by=sort_key, row_limit=row_limit)
+    memory_ops = ""
+    if profile_memory:
+        memory_ops = prof.key_averages().table(
+            sort_by="self_cpu_memory_usage", row_limit=min(row_limit, 10)
+        )
+
+    stage_table = format_timing_summary(stages) if stages else "  (단계별 시간 없음)"
+
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write(f"# {name} - {n_calls}회, 총 {total_time:.3f}초\n\n")
+        f.write("## 상위 연산자 (self CPU 시간)\n")
+        f.write(top_ops + "\n")
+        if memory_ops:
+            f.write("## 상위 연산자 (메모리)\n")
+            f.write(memory_ops + "\n")
+        f.write("## Python 단계별 시간\n")
+        f.write(stage_table + "\n")
+
+    print()
+    print("=" * 70)
+    print(f"🔬 프로파일링 결과 ({n_calls}회, 총 {total_time:.3f}초, "
+          f"호출당 {total_time / max(n_calls, 1) * 1000:.2f}ms)")
+    print("=" * 70)
+    print(top_ops)
+    print("📋 Python 단계별 시간")
+    print(stage_table)
+    print()
+    print(f"💾 Chrome trace: {trace_path}  (chrome://tracing 또는 https://ui.perfetto.dev)")
+    print(f"💾 요약: {summary_path}")
+    print()
+
+    return {
+        "trace_path": trace_path,
+        "summary_path": summary_path,
+        "top_ops": top_ops,
+        "stages": stages,
+        "total_time": total_time,
+        "n_calls": n_calls,
+    }
+
+
+def add_profile_argument(parser, default_calls: int = 10):
+    """
+    스크립트 공통 --profile / --profile-dir 인자 추가
+
+    --profile만 주면 default_calls회, --profile N이면 N회 프로파일링한다.
+    """
+    parser.add_argument(
+        '--profile',
+        type=int,
+        nargs='?',
+        const=default_calls,
+        default=None,
+        metavar='N',
+        help=f'추론 N회를 torch.profiler로 프로파일링 (N 생략 시 {default_calls}회)'
+    )
+    parser.add_argument(
+        '--profile-dir',
+        type=str,
+        default=DEFAULT_PROFILE_DIR,
+        help='프로파일 결과 저장 디렉토리'
+    )
@@ -0,0 +1,385 @@
+"""
+서빙 번들 모듈
+학습 체크포인트(가장 좋은 체크포인트)를 서빙용 디렉토리 하나로 묶고, ModelLoader가 바로 로드
+
+번들 구성:
+    manifest.json       형식, 원본 체크포인트, 파일 해시, 사전 버전, 벤치마크 결과
+    config.json         모델 설정
+    토크나이저 파일
+    모델 파일           fp32/int8: model.safetensors / onnx: model.onnx
+    lexicon/*.yaml      번들을 만들 때의 규칙 사전 (lexicon_dir로 지정하면 같은 사전으로 서빙)
+    exits.pt, heads.pt  원본에 있으면 복사 (fp32/int8만 사용 가능)
+
+- fp32: 학습 상태(optimizer, 체크포인트)를 뺀 가중치만
+- int8: fp32 가중치를 저장하고 로드할 때 Linear 레이어를 동적 양자화 (CPU 전용, torch만 필요)
+  (양자화된 state_dict는 weights_only로 읽을 수 없어 pickle 로드가 필요하므로 저장하지 않음)
+- onnx: ONNX Runtime으로 실행 (pip install -r requirements_onnx.txt)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+BUNDLE_FORMATS = ("fp32", "int8", "onnx")
+
+MODEL_FILES = {
+    "fp32": "model.safetensors",
+    "int8": "model.safetensors",
+    "onnx": "model.onnx",
+}
+
+# 원본 모델 디렉토리에서 함께 복사할 부가 파일 (조기 종료 분류기, 멀티 헤드)
+EXTRA_FILES = ("exits.pt", "heads.pt")
+
+# 번들에 포함할 규칙 사전
+LEXICON_NAMES = ("abusive", "harassment")
+
+
+def is_serving_bundle(path: str) -> bool:
+    """서빙 번들 디렉토리인지 확인"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILENAME))
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """번들 manifest.json 로드"""
+    with open(os.path.join(path, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(path: str, manifest: Dict[str, Any]):
+    tmp_path = os.path.join(path, MANIFEST_FILENAME + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILENAME))
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_bundle_files(path: str, manifest: Dict[str, Any], filenames: List[str]):
+    """
+    manifest에 기록된 SHA-256과 번들 파일 비교
+
+    Raises:
+        ValueError: 기록이 없거나 해시가 다른 경우 (번들 생성 후 파일이 바뀜)
+    """
+    recorded = manifest.get("files") or {}
+    for filename in filenames:
+        expected = recorded.get(filename)
+        if expected is None:
+            raise ValueError(f"manifest에 {filename} 해시가 없습니다: {path}")
+        actual = _file_sha256(os.path.join(path, filename))
+        if actual != expected:
+            raise ValueError(
+                f"번들 파일 해시가 manifest와 다릅니다: {os.path.join(path, filename)} "
+                f"(기록 {expected[:12]}, 실제 {actual[:12]})"
+            )
+
+
+def resolve_best_checkpoint(path: str) -> Tuple[str, Optional[float]]:
+    """
+    가장 좋은 체크포인트 찾기
+
+    Trainer 출력 디렉토리면 마지막 checkpoint-*/trainer_state.json의 best_model_checkpoint를,
+    없으면 디렉토리 자체를 사용한다 (load_best_model_at_end로 저장한 최종 모델).
+
+    Returns:
+        (체크포인트 경로, best_metric 또는 None)
+    """
+    states = sorted(
+        glob.glob(os.path.join(path, "checkpoint-*", "trainer_state.json")),
+        key=lambda p: int(os.path.basename(os.path.dirname(p)).split("-")[-1])
+    )
+    if states:
+        with open(states[-1], 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        best = state.get("best_model_checkpoint")
+        if best:
+            # 다른 위치에서 학습한 경우 체크포인트 이름만 사용
+            best_path = best if os.path.isdir(best) else os.path.join(path, os.path.basename(best))
+            if os.path.isdir(best_path):
+                return best_path, state.get("best_metric")
+
+    return path, None
+
+
+def _quantize_int8(model):
+    """Linear 레이어 int8 동적 양자화"""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _export_onnx(model, tokenizer, path: str, max_length: int):
+    """ONNX 내보내기 (배치/길이 동적 축)"""
+    import torch
+
+    sample = tokenizer(["서빙 번들 내보내기"], return_tensors="pt",
+                       max_length=max_length, padding="max_length", truncation=True)
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+
+class OnnxSequenceClassifier:
+    """
+    ONNX Runtime 세션을 BertForSequenceClassification처럼 호출하는 래퍼
+
+    감지기의 model(**inputs).logits 호출과 .to()/.eval()만 지원한다
+    (조기 종료/멀티 헤드처럼 모델 내부 모듈이 필요한 기능은 사용할 수 없음).
+    """
+
+    def __init__(self, path: str, config, threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "onnxruntime이 설치되지 않았습니다.\n"
+                "설치: pip install -r requirements_onnx.txt"
+            )
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.config = config
+
+    def __call__(self, **inputs):
+        import torch
+        from types import SimpleNamespace
+
+        feed = {
+            name: value.cpu().numpy().astype("int64")
+            for name, value in inputs.items() if name in self.input_names
+        }
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+def load_bundle_model(path: str):
+    """
+    번들 모델 로드 (ModelLoader.load_model에서 사용)
+
+    모델 파일과 설정은 manifest의 SHA-256과 같을 때만 로드한다.
+
+    Returns:
+        BertForSequenceClassification (fp32/int8, CPU) 또는 OnnxSequenceClassifier
+
+    Raises:
+        ValueError: 파일 해시가 manifest와 다르거나 지원하지 않는 형식
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    manifest = read_manifest(path)
+    bundle_format = manifest["format"]
+    model_path = os.path.join(path, manifest["model_file"])
+    if manifest["model_file"] != MODEL_FILES.get(bundle_format):
+        raise ValueError(
+            f"이전 형식의 번들입니다 ({manifest['model_file']}): {path}\n"
+            "export_serving_bundle.py로 다시 만드세요."
+        )
+    verify_bundle_files(path, manifest, [manifest["model_file"], "config.json"])
+
+    if bundle_format == "fp32":
+        model = AutoModelForSequenceClassification.from_pretrained(path)
+    elif bundle_format == "int8":
+        # 동적 양자화는 결정적이므로 export 시 벤치마크한 모델과 같은 가중치가 된다
+        model = _quantize_int8(AutoModelForSequenceClassification.from_pretrained(path).eval())
+    elif bundle_format == "onnx":
+        model = OnnxSequenceClassifier(model_path, AutoConfig.from_pretrained(path),
+                                       threads=torch.get_num_threads())
+    else:
+        raise ValueError(f"지원하지 않는 번들 형식: {bundle_format}")
+
+    return model.eval()
+
+
+def _sample_texts(samples_dir: str = "data/samples", limit: int = 32) -> List[str]:
+    """벤치마크/일치율용 텍스트 (샘플 통화 파일)"""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(samples_dir, "*.txt")))[:limit]:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read().strip()
+        if text:
+            texts.append(text)
+    return texts or ["안녕하세요. 배송 문의드립니다."]
+
+
+def benchmark_bundle(bundle_dir: str,
+                     source_dir: str,
+                     texts: List[str],
+                     batch_sizes: Tuple[int, ...] = (1, 8),
+                     repeat: int = 10) -> Dict[str, Any]:
+    """
+    번들과 원본 체크포인트를 같은 감지기 경로(AbusiveDetector.predict_batch)로 비교
+
+    Returns:
+        {'batch_sizes': {bs: {'source', 'bundle', 'speedup'}}, 'agreement': {...}}
+    """
+    from .benchmark import run_point
+    from .detector import AbusiveDetector
+
+    report: Dict[str, Any] = {"batch_sizes": {}}
+    scores = {}
+    for name, model_dir in (("source", source_dir), ("bundle", bundle_dir)):
+        with AbusiveDetector(model_name=model_dir) as detector:
+            detector.load_model()
+            scores[name] = [r["model_score"] for r in detector.predict_batch(texts, batch_size=8)]
+            for batch_size in batch_sizes:
+                point = run_point(detector.predict_batch, texts, batch_size, repeat=repeat)
+                report["batch_sizes"].setdefault(str(batch_size), {})[name] = {
+                    "per_item_p50_ms": point["per_item_p50_ms"],
+                    "throughput_items_per_sec": point["throughput_items_per_sec"],
+                    "peak_rss_mb": point["peak_rss_mb"],
+                }
+
+    for points in report["batch_sizes"].values():
+        points["speedup"] = points["source"]["per_item_p50_ms"] / max(points["bundle"]["per_item_p50_ms"], 1e-9)
+
+    diffs = [abs(a - b) for a, b in zip(scores["source"], scores["bundle"])]
+    report["agreement"] = {
+        "texts": len(texts),
+        "max_score_diff": max(diffs),
+        "mean_score_diff": sum(diffs) / len(diffs),
+        "label_agreement": sum((a >= 0.5) == (b >= 0.5) for a, b in zip(scores["source"], scores["bundle"]))
+                           / len(texts),
+    }
+    return report
+
+
+def export_bundle(checkpoint: str,
+                  output_dir: str,
+                  bundle_format: str = "int8",
+                  max_length: int = 300,
+                  lexicon_dir: Optional[str] = None,
+                  benchmark: bool = True,
+                  samples_dir: str = "data/samples") -> Dict[str, Any]:
+    """
+    체크포인트 → 서빙 번들
+
+    임시 디렉토리에 모두 만든 뒤 이름을 바꾸므로 중간에 실패해도 기존 번들은 그대로 남는다.
+
+    Args:
+        checkpoint: fine-tuning 출력 디렉토리 또는 체크포인트 디렉토리 (가장 좋은 체크포인트 사용)
+        output_dir: 번들 디렉토리
+        bundle_format: 'fp32', 'int8', 'onnx'
+        max_length: 서빙 최대 토큰 길이 (manifest에 기록)
+        lexicon_dir: 포함할 규칙 사전 디렉토리 (기본: data/lexicon)
+        benchmark: 원본 대비 지연시간/처리량/점수 일치율 측정 여부
+        samples_dir: 벤치마크 텍스트 디렉토리
+
+    Returns:
+        manifest 딕셔너리
+    """
+    if bundle_format not in BUNDLE_FORMATS:
+        raise ValueError(f"지원하지 않는 번들 형식: {bundle_format} ({', '.join(BUNDLE_FORMATS)})")
+
+    import torch
+    import transformers
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from .benchmark import get_git_revision
+    from .lexicon import get_lexicon, get_lexicon_dir
+
+    source, best_metric = resolve_best_checkpoint(checkpoint)
+    print(f"📦 서빙 번들 생성: {source} → {output_dir} ({bundle_format})")
+
+    # Trainer 체크포인트에는 토크나이저가 없을 수 있으므로 출력 디렉토리의 토크나이저 사용
+    has_tokenizer = os.path.exists(os.path.join(source, "tokenizer_config.json"))
+    tokenizer = AutoTokenizer.from_pretrained(source if has_tokenizer else checkpoint)
+    model = AutoModelForSequenceClassification.from_pretrained(source).eval()
+
+    tmp_dir = os.path.normpath(output_dir) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    tokenizer.save_pretrained(tmp_dir)
+    model_file = MODEL_FILES[bundle_format]
+    if bundle_format in ("fp32", "int8"):
+        model.save_pretrained(tmp_dir, safe_serialization=True)
+    else:
+        model.config.save_pretrained(tmp_dir)
+        _export_onnx(model, tokenizer, os.path.join(tmp_dir, model_file), max_length)
+
+    for filename in EXTRA_FILES:
+        extra_path = os.path.join(source, filename)
+        if not os.path.exists(extra_path):
+            extra_path = os.path.join(checkpoint, filename)
+        if os.path.exists(extra_path) and bundle_format != "onnx":
+            shutil.copy2(extra_path, tmp_dir)
+
+    # 규칙 사전 (버전과 파일을 함께 보관)
+    lexicon_versions = {}
+    os.makedirs(os.path.join(tmp_dir, "lexicon"))
+    for name in LEXICON_NAMES:
+        try:
+            lexicon = get_lexicon(name, lexicon_dir)
+        except FileNotFoundError:
+            continue
+        lexicon_versions[name] = lexicon.version
+        shutil.copy2(lexicon.path, os.path.join(tmp_dir, "lexicon"))
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "format": bundle_format,
+        "model_file": model_file,
+        "source_checkpoint": os.path.abspath(source),
+        "best_metric": best_metric,
+        "max_length": max_length,
+        "lexicon_dir": get_lexicon_dir(lexicon_dir),
+        "lexicon_versions": lexicon_versions,
+        "git_revision": get_git_revision(),
+        "torch_version": torch.__version__,
+        "transformers_version": transformers.__version__,
+        "files": {
+            os.path.relpath(path, tmp_dir).replace(os.sep, "/"): _file_sha256(path)
+            for path in sorted(glob.glob(os.path.join(tmp_dir, "**", "*"), recursive=True))
+            if os.path.isfile(path)
+        },
+        "benchmark": None,
+    }
+    _write_manifest(tmp_dir, manifest)
+
+    if benchmark:
+        print("⏱️  원본 대비 벤치마크...")
+        # 원본은 토크나이저까지 있는 디렉토리로 로드 (load_best_model_at_end면 최종 모델 = 가장 좋은 체크포인트)
+        manifest["benchmark"] = benchmark_bundle(
+            tmp_dir, source if has_tokenizer else checkpoint, _sample_texts(samples_dir)
+        )
+        _write_manifest(tmp_dir, manifest)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    print(f"✅ 서빙 번들 저장: {output_dir}")
+    return manifest
@@ -0,0 +1,194 @@
+"""
+CPU 스레드 설정 모듈
+호스트별 최적 intra/inter-op 스레드 수 프로필 저장/적용
+"""
+
+import os
+import json
+import platform
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+DEFAULT_PROFILE_PATH = "./models/host_profiles.json"
+
+# 프로필 경로 재지정 환경변수 ('none'이면 프로필 적용 안함)
+PROFILE_ENV_VAR = "KCBERT_HOST_PROFILE"
+
+_applied_profile = None
+
+
+def get_host_id() -> str:
+    """
+    호스트 식별자
+
+    같은 장비군이라도 CPU 모델/코어 수가 다르면 최적값이 다르므로 함께 포함한다.
+    """
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    return f"{platform.node()}|{cpu}|{os.cpu_count()}"
+
+
+def get_profile_path(profile_path: Optional[str] = None) -> Optional[str]:
+    """적용할 프로필 파일 경로 (인자 > 환경변수 > 기본값, 비활성화 시 None)"""
+    path = profile_path or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE_PATH
+    if path.lower() == "none":
+        return None
+    return path
+
+
+def load_profiles(profile_path: str) -> Dict[str, Any]:
+    """전체 호스트 프로필 로드 (파일이 없으면 빈 딕셔너리)"""
+    if not os.path.exists(profile_path):
+        return {}
+
+    with open(profile_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_host_profile(profile_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """현재 호스트의 프로필 로드 (없으면 None)"""
+    path = get_profile_path(profile_path)
+    if path is None:
+        return None
+
+    try:
+        profiles = load_profiles(path)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️  호스트 프로필을 읽을 수 없습니다: {e}")
+        return None
+
+    return profiles.get(get_host_id())
+
+
+def save_host_profile(profile: Dict[str, Any], profile_path: str = DEFAULT_PROFILE_PATH):
+    """
+    현재 호스트 프로필 저장 (다른 호스트 항목은 유지)
+
+    여러 장비가 같은 파일을 공유할 수 있도록 호스트 ID별로 저장한다.
+    """
+    profiles = load_profiles(profile_path)
+    profile = dict(profile)
+    profile["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    profiles[get_host_id()] = profile
+
+    os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+    tmp_path = profile_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, profile_path)
+
+
+def apply_thread_settings(intra_op_threads: Optional[int] = None,
+                          inter_op_threads: Optional[int] = None) -> Dict[str, Any]:
+    """
+    PyTorch 스레드 수 설정
+
+    inter-op 스레드 수는 병렬 작업이 한 번이라도 실행된 뒤에는 바꿀 수 없으므로
+    실패하면 경고만 출력하고 현재 값을 유지한다.
+
+    Returns:
+        실제 적용된 {'intra_op_threads', 'inter_op_threads'}
+    """
+    import torch
+
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            print("   ⚠️  inter-op 스레드 수는 이미 초기화되어 변경할 수 없습니다.")
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+
+    return {
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+    }
+
+
+def apply_host_profile(profile_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    현재 호스트 프로필 적용 (프로세스당 한 번)
+
+    Returns:
+        적용된 프로필 (없으면 None)
+    """
+    global _applied_profile
+
+    if _applied_profile is not None:
+        return _applied_profile
+
+    profile = load_host_profile(profile_path)
+    if profile is None:
+        return None
+
+    applied = apply_thread_settings(
+        profile.get("intra_op_threads"),
+        profile.get("inter_op_threads")
+    )
+    print(f"🧵 호스트 프로필 적용: intra-op {applied['intra_op_threads']}, "
+          f"inter-op {applied['inter_op_threads']}")
+
+    _applied_profile = profile
+    return profile
+
+
+def pareto_frontier(points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    지연시간(p50, 낮을수록 좋음) / 처리량(높을수록 좋음) 파레토 프론티어
+
+    Args:
+        points: {'latency_ms': {'p50_ms': ...}, 'throughput_items_per_sec': ...} 리스트
+
+    Returns:
+        다른 점에 지배되지 않는 점 리스트 (p50 오름차순)
+    """
+    frontier = []
+    for p in points:
+        p_lat = p["latency_ms"]["p50_ms"]
+        p_tps = p["throughput_items_per_sec"]
+        dominated = any(
+            q["latency_ms"]["p50_ms"] <= p_lat
+            and q["throughput_items_per_sec"] >= p_tps
+            and (q["latency_ms"]["p50_ms"] < p_lat or q["throughput_items_per_sec"] > p_tps)
+            for q in points
+        )
+        if not dominated:
+            frontier.append(p)
+
+    return sorted(frontier, key=lambda p: p["latency_ms"]["p50_ms"])
+
+
+def select_best(points: List[Dict[str, Any]],
+                objective: str = "throughput",
+                max_p95_ms: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    목적에 맞는 최적 설정 선택
+
+    Args:
+        points: 측정 결과 리스트
+        objective: 'throughput' (처리량 최대) 또는 'latency' (p50 최소)
+        max_p95_ms: p95 지연시간 상한 (초과하는 설정 제외)
+
+    Returns:
+        최적 측정 결과 (조건을 만족하는 점이 없으면 None)
+    """
+    candidates = pareto_frontier(points)
+    if max_p95_ms is not None:
+        candidates = [p for p in candidates if p["latency_ms"]["p95_ms"] <= max_p95_ms]
+
+    if not candidates:
+        return None
+
+    if objective == "latency":
+        return min(candidates, key=lambda p: p["latency_ms"]["p50_ms"])
+    return max(candidates, key=lambda p: p["throughput_items_per_sec"])
@@ -0,0 +1,235 @@
+"""
+단계별 처리 시간 측정 모듈
+전처리/토큰화/추론/후처리/규칙/성희롱 단계 시간을 호출 단위로 측정하고 히스토그램으로 누적
+"""
+
+import bisect
+import threading
+from time import perf_counter
+from typing import Dict, Any, List, Optional
+
+
+# 측정 단계 (결과의 timings 키 순서)
+STAGES = ("preprocess", "tokenize", "forward", "postprocess", "rules", "harassment")
+
+# 히스토그램 버킷 상한 (ms)
+DEFAULT_BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000
+)
+
+
+# 단계 구간을 외부 프로파일러에도 표시하기 위한 훅 (예: torch.profiler.record_function)
+_stage_hook = None
+
+
+def set_stage_hook(hook) -> None:
+    """
+    단계 측정 시 함께 진입할 컨텍스트 팩토리 설정 (None이면 해제)
+
+    Args:
+        hook: 단계 이름을 받아 컨텍스트 매니저를 반환하는 함수
+    """
+    global _stage_hook
+    _stage_hook = hook
+
+
+class _StageContext:
+    """with 블록 시간을 StageTimer에 누적"""
+
+    __slots__ = ("_timer", "_name", "_start", "_hooked")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self._timer = timer
+        self._name = name
+        self._start = 0.0
+        self._hooked = None
+
+    def __enter__(self):
+        if _stage_hook is not None:
+            self._hooked = _stage_hook(f"stage::{self._name}")
+            self._hooked.__enter__()
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._timer.add(self._name, perf_counter() - self._start)
+        if self._hooked is not None:
+            self._hooked.__exit__(exc_type, exc_val, exc_tb)
+            self._hooked = None
+        return False
+
+
+class _NullContext:
+    """아무것도 하지 않는 with 블록 (측정 꺼짐)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+class StageTimer:
+    """
+    한 번의 호출에 대한 단계별 시간 측정
+
+    사용 예:
+        timer = StageTimer()
+        with timer.stage("tokenize"):
+            ...
+        timer.as_dict()  # {'tokenize': 1.23}  (ms)
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def stage(self, name: str) -> _StageContext:
+        """단계 측정 컨텍스트"""
+        return _StageContext(self, name)
+
+    def add(self, name: str, seconds: float):
+        """단계 시간 누적 (초)"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_dict(self, divisor: int = 1) -> Dict[str, float]:
+        """
+        단계별 시간 (ms)
+
+        Args:
+            divisor: 배치 처리 시 건당 시간으로 환산할 건수
+        """
+        return {name: seconds * 1000 / divisor for name, seconds in self.stages.items()}
+
+
+class NullStageTimer:
+    """
+    측정이 꺼졌을 때 사용하는 타이머
+
+    모든 호출이 공유 객체를 반환하므로 추가 비용이 거의 없다.
+    """
+
+    enabled = False
+    stages: Dict[str, float] = {}
+
+    def stage(self, name: str) -> _NullContext:
+        return _NULL_CONTEXT
+
+    def add(self, name: str, seconds: float):
+        pass
+
+    def as_dict(self, divisor: int = 1) -> Dict[str, float]:
+        return {}
+
+
+NULL_TIMER = NullStageTimer()
+
+
+class StageHistogram:
+    """고정 버킷 지연시간 히스토그램 (ms)"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        # 마지막 칸은 +Inf 버킷
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        """측정값 추가"""
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """
+        버킷 기준 백분위수 추정 (버킷 내 선형 보간)
+
+        Args:
+            q: 0.0 ~ 1.0
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count == 0:
+                continue
+            if cumulative + bucket_count >= rank:
+                lower = self.buckets_ms[i - 1] if i > 0 else 0.0
+                upper = self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """요약 통계"""
+        return {
+            "count": self.count,
+            "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {
+                **{f"le_{b}": c for b, c in zip(self.buckets_ms, self.counts)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class TimingAggregator:
+    """단계별 히스토그램 누적 (스레드 안전)"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings_ms: Dict[str, float]):
+        """한 호출의 단계별 시간(ms) 추가"""
+        with self._lock:
+            for name, value in timings_ms.items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = StageHistogram(self.buckets_ms)
+                histogram.observe(value)
+
+    def summary(self, stages: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """단계별 요약 통계 (STAGES 순서)"""
+        with self._lock:
+            names = stages or sorted(
+                self.histograms,
+                key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)
+            )
+            return {
+                name: self.histograms[name].snapshot()
+                for name in names if name in self.histograms
+            }
+
+    def reset(self):
+        """누적값 초기화"""
+        with self._lock:
+            self.histograms.clear()
+
+
+def format_timing_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """단계별 요약 통계를 표 형태 문자열로 변환"""
+    lines = [f"  {'단계':<12} {'호출':>7} {'평균':>9} {'p50':>9} {'p95':>9} {'p99':>9}"]
+    for name, stats in summary.items():
+        lines.append(
+            f"  {name:<12} {stats['count']:>7} "
+            f"{stats['mean_ms']:>7.2f}ms {stats['p50_ms']:>7.2f}ms "
+            f"{stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms"
+        )
+    return "\n".join(lines)
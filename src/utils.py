@@ -56,6 +56,10 @@ def format_result_text(result: Dict[str, Any]) -> str:
         f"📈 신뢰도: {result['confidence']:.4f}",
         f"🎚️  임계값: {result['threshold']:.2f}",
         f"⏱️  처리 시간: {result['processing_time']:.3f}초",
+    ]
+    if 'exit_layer' in result:
+        lines.append(f"🚪 종료 레이어: {result['exit_layer']}")
+    lines += [
         "",
         "=" * 60,
     ]
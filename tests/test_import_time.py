@@ -0,0 +1,119 @@
+"""
+import 시간 예산 테스트
+
+경량 모듈과 CLI --help가 torch/transformers 없이 빠르게 끝나는지 확인한다.
+각 측정은 모듈 캐시의 영향을 받지 않도록 새 프로세스에서 실행한다.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 무거운 의존성 (이 모듈들이 로드되면 import 비용이 수 초 ~ 수십 초)
+HEAVY_MODULES = ("torch", "transformers", "numpy", "llama_cpp")
+
+# torch 없이 import되어야 하는 모듈
+LIGHT_MODULES = (
+    "src",
+    "src.utils",
+    "src.preprocessor",
+    "src.timing",
+    "src.hangul",
+    "src.lexicon",
+    "src.metrics",
+    "src.ground_truth",
+    "src.model_registry",
+    "src.benchmark",
+    "src.thread_tuning",
+    "src.profiling",
+    "src.detector",
+    "src.detector_improved",
+    "src.detector_multi",
+    "src.detector_sllm",
+    "src.detector_cascade",
+    "src.adapters",
+    "src.detector_lora",
+    "src.serving_bundle",
+)
+
+# 인터프리터 시작 시간을 제외한 import 예산 (초)
+IMPORT_BUDGET_SEC = 0.5
+
+# 인터프리터 시작을 포함한 CLI --help 예산 (초)
+CLI_HELP_BUDGET_SEC = 1.5
+
+
+def run_python(code: str) -> dict:
+    """새 프로세스에서 코드를 실행하고 마지막 줄의 JSON 반환"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    if completed.returncode != 0:
+        raise AssertionError(completed.stderr)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """import 시간 예산"""
+
+    def test_light_modules_do_not_import_heavy_dependencies(self):
+        code = (
+            "import importlib, json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"for name in {LIGHT_MODULES!r}:\n"
+            "    importlib.import_module(name)\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+        )
+        result = run_python(code)
+
+        self.assertEqual(result["heavy"], [])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_SEC)
+
+    def test_lazy_package_exports(self):
+        code = (
+            "import json, sys\n"
+            "import src\n"
+            "before = 'src.detector' in sys.modules\n"
+            "cls = src.AbusiveDetector\n"
+            "print(json.dumps({'before': before, 'name': cls.__name__,\n"
+            "                  'loaded': 'src.detector' in sys.modules,\n"
+            "                  'all': sorted(src.__all__)}))\n"
+        )
+        result = run_python(code)
+
+        self.assertFalse(result["before"])
+        self.assertTrue(result["loaded"])
+        self.assertEqual(result["name"], "AbusiveDetector")
+        self.assertIn("TextPreprocessor", result["all"])
+
+    def test_unknown_attribute_raises(self):
+        import src
+
+        with self.assertRaises(AttributeError):
+            getattr(src, "NoSuchDetector")
+
+    def test_cli_help_is_fast(self):
+        for script in ("main.py", "batch_process.py"):
+            with self.subTest(script=script):
+                start = time.perf_counter()
+                completed = subprocess.run(
+                    [sys.executable, script, "--help"],
+                    cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+                )
+                elapsed = time.perf_counter() - start
+
+                self.assertEqual(completed.returncode, 0, completed.stderr)
+                self.assertLess(elapsed, CLI_HELP_BUDGET_SEC)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+한글 정규화와 규칙 사전 매칭 테스트
+
+변형 표기는 매칭되고, 접기/띄어쓰기 제거로 욕설처럼 보이게 되는 일반 문장은
+매칭되지 않는지 확인한다.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src import hangul
+from src.lexicon import CompiledLexicon, Lexicon, compile_lexicon_file, get_lexicon
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEXICON_DIR = os.path.join(PROJECT_ROOT, "data", "lexicon")
+
+
+def norm(text: str, **kwargs) -> str:
+    return hangul.normalize(text, **kwargs)[0]
+
+
+class TestNormalize(unittest.TestCase):
+    """hangul.normalize"""
+
+    def test_removes_inserted_symbols(self):
+        self.assertEqual(norm("씨@발"), norm("씨발"))
+        self.assertEqual(norm("시.발"), norm("시발"))
+
+    def test_vowel_i_lookalike_after_lone_consonant(self):
+        self.assertEqual(norm("ㅅ1발"), norm("시발"))
+        self.assertEqual(norm("ㅅl발"), norm("시발"))
+
+    def test_no_folding_by_default(self):
+        self.assertNotEqual(norm("씨발"), norm("시발"))
+        self.assertNotEqual(norm("게"), norm("개"))
+        self.assertNotEqual(norm("박"), norm("빡"))
+
+    def test_fold(self):
+        self.assertEqual(norm("씨발", fold=True), norm("시발", fold=True))
+        self.assertEqual(norm("ㅆㅂ", fold=True), norm("ㅅㅂ", fold=True))
+        self.assertEqual(norm("게", fold=True), norm("개", fold=True))
+
+    def test_collapse_spaces_only_between_single_syllables(self):
+        self.assertEqual(norm("시 발", collapse_spaces=True), norm("시발"))
+        self.assertEqual(norm("언니 미안해", collapse_spaces=True), norm("언니 미안해"))
+        self.assertEqual(norm("시 발", collapse_spaces=False), norm("시 발"))
+
+    def test_offsets_point_to_original_text(self):
+        text = "야 씨@발"
+        normalized, offsets = hangul.normalize(text)
+        self.assertEqual(len(normalized), len(offsets))
+        start = normalized.index(norm("씨발"))
+        self.assertEqual(hangul.to_original_span(offsets, start, len(normalized)), (2, 5))
+
+
+class TestLexiconScan(unittest.TestCase):
+    """CompiledLexicon.scan (data/lexicon 사전 기준)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.abusive = compile_lexicon_file(os.path.join(LEXICON_DIR, "abusive.yaml"))
+        cls.harassment = compile_lexicon_file(os.path.join(LEXICON_DIR, "harassment.yaml"))
+
+    def test_obfuscated_forms_match(self):
+        cases = {
+            "야 이 씨발": "씨발",
+            "씨@발 진짜": "씨발",
+            "시 발 놈아": "씨발",
+            "ㅅ1발": "씨발",
+            "ㅆㅂ": "ㅅㅂ",
+            "병 신": "병신",
+            "개 새 끼": "개새끼",
+            "게새끼": "개새끼",
+        }
+        for text, entry in cases.items():
+            with self.subTest(text=text):
+                self.assertIn(entry, self.abusive.scan(text).entries("severe"))
+
+    def test_matched_text_is_original_span(self):
+        scan = self.abusive.scan("야 씨@발")
+        self.assertEqual(scan.matched_texts("severe"), ["씨@발"])
+
+    def test_plain_entries_match_whole_syllables(self):
+        self.assertIn("짜증", self.abusive.scan("아 짜증나").entries("moderate"))
+        self.assertIn("빡", self.abusive.scan("진짜 빡치네").entries("moderate"))
+        self.assertIn("꺼져", self.abusive.scan("당장 꺼져").entries("moderate"))
+
+    def test_entry_does_not_match_part_of_syllable(self):
+        # 받침 없는 음절로 끝나는 항목이 받침 붙은 음절에 걸치는 경우
+        cases = {
+            "전원이 꺼졌어요": ("moderate", "꺼져"),
+            "화면이 꺼졌어요": ("basic", "꺼져"),
+            "개샛길로 빠졌네": ("severe", "개새"),
+            "니민 누구": ("severe", "니미"),
+            "답답한 상황이네요": ("whitelist", "답답하"),
+        }
+        for text, (tier, entry) in cases.items():
+            with self.subTest(text=text):
+                self.assertNotIn(entry, self.abusive.scan(text).entries(tier))
+
+    def test_benign_sentences_do_not_match(self):
+        cases = [
+            "이번에 신청하신 게 새 상품이에요",
+            "대박이네요",
+            "박 고객님 안녕하세요",
+            "보증금 자증 서류를 보내주세요",
+            "언니 미안해",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertEqual(self.abusive.scan(text).matches, {})
+
+        self.assertEqual(self.harassment.scan("공무원 고시 준비중").matches, {})
+
+    def test_fold_entry_must_be_long_enough(self):
+        with self.assertRaises(ValueError):
+            CompiledLexicon("t", {"moderate": ["빡"]}, fold=["빡"])
+
+    def test_fold_entry_must_exist(self):
+        with self.assertRaises(ValueError):
+            CompiledLexicon("t", {"moderate": ["짜증"]}, fold=["씨발"])
+
+
+LEXICON_V1 = """name: test
+version: 1
+tiers:
+  severe:
+    - 씨발
+"""
+
+LEXICON_V2 = """name: test
+version: 2
+tiers:
+  severe:
+    - 씨발
+    - 병신
+"""
+
+
+class TestLexiconReload(unittest.TestCase):
+    """Lexicon 자동 갱신"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.yaml")
+        self._write(LEXICON_V1, mtime_offset=0)
+        self.lexicon = Lexicon(self.path, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, content: str, mtime_offset: float):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(content)
+        # 파일 시스템의 수정 시간 해상도와 관계없이 변경으로 인식되도록 지정
+        mtime = 1_700_000_000 + mtime_offset
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reloads_when_mtime_changes(self):
+        old_version = self.lexicon.version
+        self.assertEqual(self.lexicon.scan("병신").matches, {})
+
+        self._write(LEXICON_V2, mtime_offset=10)
+        with redirect_stdout(StringIO()):
+            self.assertIn("병신", self.lexicon.scan("병신").entries("severe"))
+        self.assertNotEqual(self.lexicon.version, old_version)
+        self.assertTrue(self.lexicon.version.startswith("2-"))
+
+    def test_unchanged_file_is_not_recompiled(self):
+        compiled = self.lexicon.current()
+        self.assertFalse(self.lexicon.reload_if_changed())
+        self.assertIs(self.lexicon.current(), compiled)
+
+    def test_invalid_yaml_keeps_previous_version(self):
+        compiled = self.lexicon.current()
+
+        self._write("tiers: [씨발\n", mtime_offset=10)
+        with redirect_stdout(StringIO()) as output:
+            self.assertFalse(self.lexicon.reload_if_changed())
+        self.assertIn("이전 사전 유지", output.getvalue())
+        self.assertIs(self.lexicon.current(), compiled)
+        self.assertIn("씨발", self.lexicon.scan("씨발").entries("severe"))
+
+        # 고쳐서 다시 저장하면 갱신
+        self._write(LEXICON_V2, mtime_offset=20)
+        with redirect_stdout(StringIO()):
+            self.assertTrue(self.lexicon.reload_if_changed())
+        self.assertIn("병신", self.lexicon.scan("병신").entries("severe"))
+
+    def test_default_dir_does_not_depend_on_cwd(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            lexicon = get_lexicon("abusive")
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(lexicon.path, os.path.join(LEXICON_DIR, "abusive.yaml"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+메트릭 엔드포인트 테스트
+
+임의 포트로 서버를 띄우고 /metrics 응답이 레지스트리 내용과 같은지 확인한다.
+"""
+
+import unittest
+import urllib.error
+import urllib.request
+
+from src.metrics import MetricsRegistry, start_metrics_server
+
+
+class TestMetricsServer(unittest.TestCase):
+    """start_metrics_server"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter("test_requests_total", "테스트 요청 수", ("status",)).inc(3, status="ok")
+        self.server = start_metrics_server(0, registry=self.registry)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_metrics(self):
+        with urllib.request.urlopen(f"{self.base_url}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+
+        self.assertEqual(response.status, 200)
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn("# TYPE test_requests_total counter", body)
+        self.assertIn('test_requests_total{status="ok"} 3', body)
+
+    def test_unknown_path_returns_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(f"{self.base_url}/nope", timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+공유 모델 레지스트리 테스트
+
+실제 모델 대신 가짜 loader로 참조 수와 메모리 해제(마지막 참조 소멸)를 확인한다.
+"""
+
+import gc
+import unittest
+import weakref
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.model_registry import ModelRegistry
+
+
+class FakeModel:
+    pass
+
+
+class FakeLoader:
+    """ModelLoader와 같은 속성/캐시 동작만 흉내"""
+
+    def __init__(self, model_name: str = "fake-model"):
+        self.model_name = model_name
+        self.revision = None
+        self.dtype = None
+        self.backend = "pytorch"
+        self.device = "cpu"
+        self.tokenizer = None
+        self.model = None
+        self.load_count = 0
+
+    def load(self):
+        if self.model is None:
+            self.load_count += 1
+            self.tokenizer = FakeModel()
+            self.model = FakeModel()
+        return self.tokenizer, self.model
+
+    def get_device(self) -> str:
+        return self.device
+
+
+class TestModelRegistry(unittest.TestCase):
+    """ModelRegistry.acquire / release"""
+
+    def setUp(self):
+        self.registry = ModelRegistry()
+
+    def test_same_key_loads_once(self):
+        first, second = FakeLoader(), FakeLoader()
+        with redirect_stdout(StringIO()):
+            a = self.registry.acquire(first)
+            b = self.registry.acquire(second)
+        self.assertIs(a, b)
+        self.assertEqual(a.refcount, 2)
+        self.assertEqual((first.load_count, second.load_count), (1, 0))
+
+    def test_loader_does_not_keep_model(self):
+        loader = FakeLoader()
+        with redirect_stdout(StringIO()):
+            self.registry.acquire(loader)
+        self.assertIsNone(loader.model)
+        self.assertIsNone(loader.tokenizer)
+
+    def test_last_release_frees_model(self):
+        loader = FakeLoader()
+        with redirect_stdout(StringIO()):
+            handle = self.registry.acquire(loader)
+            model_ref = weakref.ref(handle.model)
+            self.registry.release(handle)
+        gc.collect()
+
+        self.assertIsNone(model_ref())
+        self.assertEqual(len(self.registry), 0)
+
+    def test_reacquire_after_release_loads_again(self):
+        loader = FakeLoader()
+        with redirect_stdout(StringIO()):
+            handle = self.registry.acquire(loader)
+            self.registry.release(handle)
+            again = self.registry.acquire(loader)
+        self.assertIsNot(again, handle)
+        self.assertEqual(loader.load_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+CPU 스레드 수 튜닝
+intra-op × inter-op 스레드 수 × 배치 크기를 측정하여 지연시간/처리량 파레토 프론티어를 구하고
+최적 설정을 호스트 프로필(models/host_profiles.json)에 저장
+
+inter-op 스레드 수는 프로세스당 한 번만 설정할 수 있으므로 설정 조합마다 별도 프로세스에서 측정합니다.
+"""
+
+import sys
+import os
+import argparse
+import json
+import subprocess
+import warnings
+
+warnings.filterwarnings('ignore')
+os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import logging
+logging.getLogger('transformers').setLevel(logging.ERROR)
+
+from datetime import datetime
+from pathlib import Path
+
+from src.benchmark import (
+    run_point, create_kcbert_detector, get_system_info, get_git_revision
+)
+from src.thread_tuning import (
+    DEFAULT_PROFILE_PATH, PROFILE_ENV_VAR, get_host_id,
+    pareto_frontier, select_best, save_host_profile
+)
+
+
+# 워커 프로세스 결과 줄 식별자 (모델 로딩 로그와 구분)
+RESULT_MARKER = "__TUNE_RESULT__"
+
+
+def parse_int_list(value):
+    """'1,4,8' → [1, 4, 8]"""
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def default_intra_candidates():
+    """기본 intra-op 후보: 1, 2, 4, ... 및 논리 코어 수"""
+    cores = os.cpu_count() or 1
+    candidates = []
+    n = 1
+    while n < cores:
+        candidates.append(n)
+        n *= 2
+    candidates.append(cores)
+    return candidates
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(
+        description="CPU 스레드 수 튜닝 (호스트 프로필 생성)"
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='improved',
+        choices=['kcbert', 'improved', 'multi', 'multihead', 'earlyexit'],
+        help='측정할 감지기'
+    )
+    parser.add_argument(
+        '--intra',
+        type=parse_int_list,
+        default=None,
+        help='intra-op 스레드 수 후보 (미지정 시 1,2,4,...,코어 수)'
+    )
+    parser.add_argument(
+        '--inter',
+        type=parse_int_list,
+        default=[1, 2],
+        help='inter-op 스레드 수 후보'
+    )
+    parser.add_argument(
+        '--batch-sizes',
+        type=parse_int_list,
+        default=[1, 4, 8, 16],
+        help='배치 크기 후보'
+    )
+    parser.add_argument(
+        '--seq-len',
+        type=int,
+        default=128,
+        help='측정 시퀀스 길이 (최대 300)'
+    )
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=3,
+        help='측정 지점별 워밍업 횟수'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=10,
+        help='측정 지점별 반복 횟수'
+    )
+    parser.add_argument(
+        '--objective',
+        type=str,
+        default='throughput',
+        choices=['throughput', 'latency'],
+        help='최적 설정 선택 기준'
+    )
+    parser.add_argument(
+        '--max-p95-ms',
+        type=float,
+        default=None,
+        help='p95 지연시간 상한 (ms, 초과하는 설정 제외)'
+    )
+    parser.add_argument(
+        '--profile-path',
+        type=str,
+        default=DEFAULT_PROFILE_PATH,
+        help='호스트 프로필 저장 경로'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='측정만 하고 프로필은 저장하지 않음'
+    )
+    # 내부용: 한 (intra, inter) 조합 측정 워커
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.seq_len > 300:
+        parser.error("KcBERT 최대 시퀀스 길이는 300입니다.")
+    if args.intra is None:
+        args.intra = default_intra_candidates()
+
+    return args
+
+
+def load_sample_texts():
+    """측정 입력 텍스트 (data/samples)"""
+    texts = []
+    for file_path in sorted(Path("data/samples").glob("*.txt")):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            texts.append(f.read().strip())
+    return texts
+
+
+def run_worker(args):
+    """
+    워커 모드: 주어진 스레드 설정 하나로 모든 배치 크기 측정
+
+    모델 로딩 전에 스레드 수를 설정해야 inter-op 설정이 적용된다.
+    """
+    from src.thread_tuning import apply_thread_settings
+
+    applied = apply_thread_settings(args.intra[0], args.inter[0])
+
+    detector = create_kcbert_detector(args.backend)
+    detector.load_model()
+    detector.max_length = args.seq_len
+
+    texts = load_sample_texts()
+    points = []
+    for batch_size in args.batch_sizes:
+        point = run_point(
+            lambda batch: detector.predict_batch(batch, batch_size=batch_size),
+            texts, batch_size,
+            warmup=args.warmup, repeat=args.repeat
+        )
+        point.update({
+            "backend": args.backend,
+            "batch_size": batch_size,
+            "seq_len": args.seq_len,
+            "intra_op_threads": applied["intra_op_threads"],
+            "inter_op_threads": applied["inter_op_threads"],
+        })
+        points.append(point)
+
+    print(RESULT_MARKER + json.dumps(points))
+
+
+def measure_config(args, intra, inter):
+    """하위 프로세스에서 (intra, inter) 조합 측정"""
+    cmd = [
+        sys.executable, os.path.abspath(__file__), '--worker',
+        '--backend', args.backend,
+        '--intra', str(intra),
+        '--inter', str(inter),
+        '--batch-sizes', ','.join(str(b) for b in args.batch_sizes),
+        '--seq-len', str(args.seq_len),
+        '--warmup', str(args.warmup),
+        '--repeat', str(args.repeat),
+    ]
+
+    # 측정 중에는 기존 호스트 프로필이 적용되지 않도록 비활성화
+    env = dict(os.environ)
+    env[PROFILE_ENV_VAR] = "none"
+    env["OMP_NUM_THREADS"] = str(intra)
+
+    completed = subprocess.run(cmd, capture_output=True, text=True,
+                               encoding='utf-8', env=env)
+
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+
+    print(f"  ❌ intra={intra} inter={inter} 측정 실패")
+    if completed.stderr:
+        print(completed.stderr.strip().splitlines()[-1])
+    return []
+
+
+def print_point(point, mark=" "):
+    """측정 지점 한 줄 출력"""
+    latency = point['latency_ms']
+    print(f"  {mark} intra={point['intra_op_threads']:<3} inter={point['inter_op_threads']:<2} "
+          f"bs={point['batch_size']:<3} │ "
+          f"p50 {latency['p50_ms']:8.2f}ms  p95 {latency['p95_ms']:8.2f}ms │ "
+          f"{point['throughput_items_per_sec']:8.2f}건/초")
+
+
+def tune(args):
+    """스레드 수 튜닝 실행"""
+    print("\n" + "=" * 70)
+    print("🧵 CPU 스레드 수 튜닝")
+    print("=" * 70 + "\n")
+
+    host_id = get_host_id()
+    print(f"🖥️  호스트: {host_id}")
+    print(f"📋 intra-op 후보: {args.intra}")
+    print(f"📋 inter-op 후보: {args.inter}")
+    print(f"📋 배치 크기: {args.batch_sizes}, 시퀀스 길이: {args.seq_len}")
+    print(f"🎯 선택 기준: {args.objective}"
+          + (f" (p95 ≤ {args.max_p95_ms}ms)" if args.max_p95_ms else ""))
+    print("─" * 70)
+
+    points = []
+    for intra in args.intra:
+        for inter in args.inter:
+            print(f"\n⏱️  intra={intra}, inter={inter} 측정 중...")
+            for point in measure_config(args, intra, inter):
+                points.append(point)
+                print_point(point)
+
+    if not points:
+        print("\n❌ 측정 결과가 없습니다.")
+        return None
+
+    frontier = pareto_frontier(points)
+    best = select_best(points, args.objective, args.max_p95_ms)
+
+    print()
+    print("=" * 70)
+    print("📈 파레토 프론티어 (p50 ↓ / 처리량 ↑)")
+    print("=" * 70)
+    for point in frontier:
+        print_point(point, "★" if point is best else " ")
+    print()
+
+    report = {
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "git_revision": get_git_revision(),
+        "host_id": host_id,
+        "system_info": get_system_info(),
+        "config": {
+            "backend": args.backend,
+            "intra": args.intra,
+            "inter": args.inter,
+            "batch_sizes": args.batch_sizes,
+            "seq_len": args.seq_len,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "objective": args.objective,
+            "max_p95_ms": args.max_p95_ms,
+        },
+        "results": points,
+        "frontier": frontier,
+        "best": best,
+    }
+
+    os.makedirs("data/results", exist_ok=True)
+    output_path = f"data/results/thread_sweep_{report['timestamp']}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"💾 측정 결과 저장: {output_path}")
+
+    if best is None:
+        print("⚠️  p95 상한을 만족하는 설정이 없어 프로필을 저장하지 않습니다.")
+        return report
+
+    print(f"🏆 최적 설정: intra-op {best['intra_op_threads']}, "
+          f"inter-op {best['inter_op_threads']}, 배치 {best['batch_size']} "
+          f"({best['throughput_items_per_sec']:.2f}건/초, "
+          f"p50 {best['latency_ms']['p50_ms']:.2f}ms)")
+
+    if args.dry_run:
+        print("ℹ️  --dry-run: 프로필을 저장하지 않습니다.")
+        return report
+
+    save_host_profile({
+        "intra_op_threads": best["intra_op_threads"],
+        "inter_op_threads": best["inter_op_threads"],
+        "batch_size": best["batch_size"],
+        "objective": args.objective,
+        "backend": args.backend,
+        "seq_len": args.seq_len,
+        "p50_ms": best["latency_ms"]["p50_ms"],
+        "p95_ms": best["latency_ms"]["p95_ms"],
+        "throughput_items_per_sec": best["throughput_items_per_sec"],
+        "frontier": [
+            {
+                "intra_op_threads": p["intra_op_threads"],
+                "inter_op_threads": p["inter_op_threads"],
+                "batch_size": p["batch_size"],
+                "p50_ms": p["latency_ms"]["p50_ms"],
+                "throughput_items_per_sec": p["throughput_items_per_sec"],
+            }
+            for p in frontier
+        ],
+    }, args.profile_path)
+    print(f"💾 호스트 프로필 저장: {args.profile_path}")
+    print("   → 다음 실행부터 ModelLoader가 자동으로 적용합니다.")
+    print()
+
+    return report
+
+
+if __name__ == "__main__":
+    try:
+        cli_args = parse_args()
+        if cli_args.worker:
+            run_worker(cli_args)
+        else:
+            tune(cli_args)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  사용자에 의해 중단되었습니다.")
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()